@@ -1,19 +1,50 @@
 import networkx as nx
+import numpy as np
 import tools
-import time
+import csrgraph
+import pagerank
+import personalized
+import bowtie
+import sampling
+import ranking
+from urltrie import UrlTrie
+import edgestore
+from csrgraph import CSRGraph, Components
+from edgestore import EdgeStore
+from idmap import IdMap
+from instrument import Instrument, ConsoleSink, JsonSink
+from checkpoint import Checkpoints
+from reachability import ReachabilityOracle
+from graphcache import GraphCache, content_hash
+from degrees import DegreeStats
 from heapq import heappush, heappop
 from itertools import count
+import argparse
 import os.path
 
+# the stages of Analyzer.run in order, with the stages each of them needs. The ranking and sites
+# stages are not run by default.
+STAGES = ('pagerank', 'ranking', 'sites', 'scc', 'bow-tie', 'write')
+DEFAULT_STAGES = ('pagerank', 'scc', 'bow-tie', 'write')
+STAGE_NEEDS = {'pagerank': (), 'ranking': ('pagerank',), 'sites': (), 'scc': (), 'bow-tie': ('scc',),
+               'write': ('pagerank', 'bow-tie')}
+# the stages which need every edge in memory at once, so the disk engine cannot run them
+IN_MEMORY_STAGES = ('ranking', 'sites')
+
 
 class Analyzer():
 
-    def yield_scc(self, graph):
+    oracle = None
+
+    def yield_scc(self, graph, report=None):
         '''
         Yields all strongly connected components from @param graph
         :param graph:
-        :return strongly connected components:
+        :param report: called with the number of visited nodes and the total (csr engine)
+        :return strongly connected components (Components for a CSRGraph):
         '''
+        if isinstance(graph, CSRGraph):
+            return csrgraph.component_labels(graph, report)
         return [node for node in nx.strongly_connected_components(graph)]
 
     def yield_gscc(self, scc):
@@ -22,86 +53,157 @@ class Analyzer():
         :param scc:
         :return giant component:
         '''
+        if isinstance(scc, Components):
+            return scc.members(scc.giant())
         gscc = max(scc, key=lambda x:len(x))
         scc.remove(gscc)
         return gscc
 
-    def generate_pagerank(self, graph, amount):
+    def generate_pagerank(self, graph, amount, tol=1.0e-6, report=None, previous=None, save=None):
         '''
         Generates a list of tuples of nodes and their pagerank sorted on pagerank
         :param graph:
+        :param amount:
+        :param tol: convergence tolerance of the power iteration (csr engine)
+        :param report: called with the iteration and its residual (csr engine)
+        :param previous: file with the pagerank of an earlier crawl to start from incrementally (csr engine)
+        :param save: file to store the full pagerank in, for a later incremental run (csr engine)
         :return a list of tuples of nodes and their pagerank:
         '''
+        if isinstance(graph, CSRGraph):
+            scores = self.pagerank_scores(graph, tol, report, previous, save)
+            return [(node, scores[node]) for node in pagerank.top_k(scores, amount).tolist()]
         pr = nx.pagerank(graph, alpha=0.9)
         return sorted(pr.items(), key=lambda x:x[1], reverse=True)[0:amount]
 
-    def generate_in_out(self, graph, scc, gscc, interval, print):
+    def pagerank_scores(self, graph, tol=1.0e-6, report=None, previous=None, save=None):
         '''
-        Generates the in and out sets of @param graph, the strongly connected components which make up these sets.
+        Calculates the pagerank of every node of a CSRGraph (or EdgeStore), see generate_pagerank
         :param graph:
-        :param scc:
+        :param tol:
+        :param report:
+        :param previous: not supported for an EdgeStore
+        :param save: not supported for an EdgeStore
+        :return the array of pagerank values:
+        '''
+        if isinstance(graph, EdgeStore):
+            return edgestore.stream_pagerank(graph, alpha=0.9, tol=tol, report=report)[0]
+        if previous and os.path.isfile(previous):
+            scores, residuals = pagerank.incremental_pagerank(graph, pagerank.load_scores(previous), alpha=0.9,
+                                                              tol=tol, report=report)
+        else:
+            scores, residuals = pagerank.pagerank(graph, alpha=0.9, tol=tol, report=report)
+        if save:
+            pagerank.save_scores(save, graph, scores)
+        return scores
+
+    def pagerank_preview(self, graph, method='monte-carlo', walks=1, epsilon=1.0e-3, seed=0):
+        '''
+        Approximates the pagerank of every node, much faster than generate_pagerank, see
+        pagerank.approximate_pagerank
+        :param graph: a CSRGraph (or EdgeStore), a networkx graph is converted first
+        :param method: one of pagerank.APPROXIMATIONS
+        :param walks: walks per node (monte-carlo), more is more accurate
+        :param epsilon: residual per node left unpushed (push), less is more accurate
+        :param seed: of the walks
+        :return the graph, the array of approximate pagerank values and the array of their error estimates:
+        '''
+        if not isinstance(graph, CSRGraph):
+            graph = CSRGraph.from_networkx(graph)[0]
+        scores, errors = pagerank.approximate_pagerank(graph, alpha=0.9, method=method, walks=walks, epsilon=epsilon,
+                                                       seed=seed)
+        return graph, scores, errors
+
+    def generate_personalized_pagerank(self, graph, urls, prefixes, amount, processes=None):
+        '''
+        Generates the PageRank personalized on the pages below every url prefix, e.g. one per faculty
+        :param graph:
+        :param urls: the dictionary of tools.load_urls
+        :param prefixes: list of url prefixes
+        :param amount:
+        :param processes: number of worker processes (csr engine), defaults to the number of cores
+        :return a dictionary of every prefix with a pagerank list like generate_pagerank, prefixes without pages are left out:
+        '''
+        seeds = {}
+        for prefix in prefixes:
+            nodes = [node for node, url in urls.items() if url.startswith(prefix)]
+            if isinstance(graph, CSRGraph):
+                nodes = np.array([int(node) for node in nodes], dtype=np.int64)
+                position = np.minimum(np.searchsorted(graph.node_ids, nodes), max(graph.number_of_nodes() - 1, 0))
+                nodes = position[graph.node_ids[position] == nodes] if graph.number_of_nodes() else []
+            else:
+                nodes = [node for node in nodes if node in graph]
+            if len(nodes):
+                seeds[prefix] = nodes
+        if isinstance(graph, CSRGraph):
+            tops = personalized.batch_personalized_pagerank(graph, list(seeds.values()), amount, alpha=0.9,
+                                                            processes=processes)
+            return dict((prefix, [(graph.label(node), score) for node, score in zip(best.tolist(), scores.tolist())])
+                        for prefix, (best, scores) in zip(seeds, tops))
+        result = {}
+        for prefix, nodes in seeds.items():
+            pr = nx.pagerank(graph, alpha=0.9, personalization=dict((node, 1.0) for node in nodes))
+            result[prefix] = sorted(pr.items(), key=lambda x:x[1], reverse=True)[0:amount]
+        return result
+
+    def generate_rankings(self, graph, scores=None):
+        '''
+        Calculates every metric of ranking.metrics for all nodes and compares each pair of them
+        :param graph: a CSRGraph, a networkx graph is converted first
+        :param scores: the pagerank of every node if already calculated
+        :return the graph, a dict from metric to the array of its values and the correlation report:
+        '''
+        if not isinstance(graph, CSRGraph):
+            graph = CSRGraph.from_networkx(graph)[0]
+        metrics = ranking.metrics(graph, alpha=0.9, scores=scores)
+        return graph, metrics, ranking.correlations(metrics)
+
+    def generate_sites(self, graph, ids, depth):
+        '''
+        Collapses the graph to the graph between its hosts (depth 1) or directories and calculates
+        the PageRank of every group, weighted by the number of links between the groups
+        :param graph: a CSRGraph
+        :param ids: the IdMap of the nodes of graph
+        :param depth:
+        :return the urltrie.Quotient and the list of tuples of its groups and their pagerank sorted on pagerank:
+        '''
+        quotient = UrlTrie.from_ids(ids).collapse(graph, depth)
+        scores = pagerank.pagerank(quotient.graph, alpha=0.9, weights=quotient.weights)[0]
+        return quotient, [(group, scores[group]) for group in pagerank.top_k(scores, len(quotient)).tolist()]
+
+    def generate_bow_tie(self, graph, scc, gscc, report=None):
+        '''
+        Generates the in, out, tendrils, tubes and disconnected sets of @param graph in linear time,
+        from one condensation of the strongly connected components.
+        :param graph:
+        :param scc: the strongly connected components without the giant component, or Components (unused for an EdgeStore)
         :param gscc:
-        :param interval:
-        :return inset, outset, inscc's, outscc's:
+        :param report: called with the progress of the searches, see bowtie.classify_core
+        :return inset, outset, tendrils, tubes, disconnected set:
         '''
-        inc, outc, incsubsets, outcsubsets = set(), set(), [], []
-        gscc_node = next(iter(gscc))
-        sccsize = len(scc)
-        for index, c in enumerate(scc):
-            if print:
-                tools.print_process('Generating in & out sets: ', index, sccsize, interval)
-            c_node = next(iter(c))
-            if self.can_reach(graph, c_node, gscc_node):
-                inc = inc.union(c)
-                incsubsets.append(c)
-                scc.remove(c)
-            elif self.can_reach(graph, gscc_node, c_node):
-                outc = outc.union(c)
-                outcsubsets.append(c)
-                scc.remove(c)
-        return inc, incsubsets, outc, outcsubsets
-
-    def generate_tend_tun_disc(self, graph, incsubsets, outcsubsets, scc, interval, print):
+        nodes, kinds = self.generate_bow_tie_kinds(graph, scc, gscc, report)
+        if isinstance(graph, CSRGraph):
+            return [set(nodes[kinds == kind].tolist())
+                    for kind in (bowtie.IN, bowtie.OUT, bowtie.TENDRIL, bowtie.TUBE, bowtie.DISCONNECTED)]
+        sets = [set() for _ in range(bowtie.DISCONNECTED + 1)]
+        for node, kind in zip(nodes, kinds.tolist()):
+            sets[kind].add(node)
+        return sets[bowtie.IN], sets[bowtie.OUT], sets[bowtie.TENDRIL], sets[bowtie.TUBE], sets[bowtie.DISCONNECTED]
+
+    def generate_bow_tie_kinds(self, graph, scc, gscc, report=None):
         '''
-        Generates the tendrils, tubes and disconnected sets of @param graph and the strongly connected components which make up these sets.
+        Classifies every node of @param graph like generate_bow_tie, without building sets
         :param graph:
-        :param incsubsets:
-        :param outcsubsets:
-        :param scc
-        :param interval:
-        :return inset, outset, inscc's, outscc's:
+        :param scc: the strongly connected components without the giant component, or Components (unused for an EdgeStore)
+        :param gscc:
+        :param report: see generate_bow_tie
+        :return the nodes and, parallel to it, their bow-tie set (see bowtie):
         '''
-        tenc, tubec, disc = set(), set(), set()
-        sccsize = len(scc)
-        for index, c in enumerate(scc):
-            c_node = next(iter(c))
-            if print:
-                tools.print_process('Generating tendrils & tube & disconnected sets: ', index, sccsize, interval)
-            found = False
-            for inc in incsubsets:
-                in_node = next(iter(inc))
-                if self.can_reach(graph, in_node, c_node):
-                    for outc in outcsubsets:
-                        out_node = next(iter(outc))
-                        if self.can_reach(graph, c_node, out_node):
-                            tubec = tubec.union(c)
-                            found = True
-                            break
-                    if not found:
-                        tenc = tenc.union(c)
-                        found = True
-                if found:
-                    break
-            if not found:
-                for outc in outcsubsets:
-                    out_node = next(iter(outc))
-                    if self.can_reach(graph, c_node, out_node):
-                        tenc = tenc.union(c)
-                        found = True
-                        break
-                if not found:
-                    disc = disc.union(c)
-        return tenc, tubec, disc
+        if isinstance(graph, EdgeStore):
+            return np.arange(graph.number_of_nodes()), edgestore.bow_tie(graph, gscc, report)
+        if isinstance(scc, Components):
+            return bowtie.classify(graph, scc, scc.giant(), report)
+        return bowtie.classify(graph, scc + [gscc], len(scc), report)
 
     # Returns whether a path between the source and the target exists in the provided graph
     def path_exists_bi_dijkstra(self, G, source, target, weight = 'weight'):
@@ -123,9 +225,9 @@ class Analyzer():
         push(fringe[1], (0, next(c), target))
         # neighs for extracting correct neighbor information
         if G.is_directed():
-            neighs = [G.successors_iter, G.predecessors_iter]
+            neighs = [G.successors, G.predecessors]
         else:
-            neighs = [G.neighbors_iter, G.neighbors_iter]
+            neighs = [G.neighbors, G.neighbors]
         # variables to hold shortest discovered path
         # finaldist = 1e30000
         finalpath = []
@@ -173,9 +275,15 @@ class Analyzer():
                             finalpath = paths[0][w] + revpath[1:]
         return False
 
+    # Returns the reachability oracle of the graph, it is kept (with its memo) between calls
+    def reachability(self, graph):
+        if self.oracle is None or self.oracle.source_graph is not graph:
+            self.oracle = ReachabilityOracle(graph)
+        return self.oracle
+
     # Returns whether the start node can reach the stop node via any path in the graph
     def can_reach(self, graph, start, stop):
-        return self.path_exists_bi_dijkstra(graph, start, stop)
+        return self.reachability(graph).can_reach(start, stop)
 
     def my_print(self, pp, *txt):
         if pp:
@@ -183,84 +291,325 @@ class Analyzer():
                 print(tx),
             print(txt[-1])
 
-    # Calculates the PageRank and Bow-Tie structure using the second method for trimming
-    def run(self, source, dest, treshold, pp):
-        total_time = time.time()
-        start_time = time.time()
-        self.my_print(pp, 'Verifying required files..')
-        # Check for existence source and whether it can write to destination
-        if not os.path.isfile(source):
-            raise IOError("Source file not found: " + source)
-        if os.path.isfile(dest) and not os.access(dest, os.W_OK):
-            raise IOError("Cannot write to destination file: " + dest)
-
-        # Check whether source is already splitted into edges.csv and urls.csv
-        # otherwise create those files
-        indegrees_invalid = False
-        if not (os.path.isfile("Input/urls.csv") and os.path.isfile("Input/edges.csv")):
-            self.my_print(pp, '> Generating edges.csv and urls.csv from source file: ' + source)
-            tools.split_dot_file(source, "Input/urls.csv", "Input/edges.csv")
-            indegrees_invalid = True
-
-        # Check the in-degrees are already calculated
-        # otherwise create those files
-        if indegrees_invalid or not os.path.isfile("Input/indegrees.csv"):
-            self.my_print(pp, '> Generating indegrees.csv from edges.csv')
-            tools.calculate_indegrees("Input/edges.csv", "Input/indegrees.csv")
-        self.my_print(pp, '> Done (' + str(time.time() - start_time) + ' sec.)')
-
-        # if True, it will only calculate the PageRank
-        only_page_rank = False
-
-        print_interval = 100
-
-        start_time = time.time()
-        self.my_print(pp, 'Loading graph (' + source + ')..')
-        graph = tools.load_graph("Input/edges.csv", treshold)
-        urls = tools.load_urls("Input/urls.csv")
-        indegrees = tools.load_indegrees("Input/indegrees.csv")
-        self.my_print(pp, '> Found: ' + str(nx.number_of_nodes(graph)) + ' nodes')
-        self.my_print(pp, '> Done (' + str(time.time() - start_time) + ' sec.)')
-
-        start_time = time.time()
-        self.my_print(pp, 'Calculating PageRank of all nodes..')
-        pr = self.generate_pagerank(graph, 1000)
-        self.my_print(pp, '> Done (' + str(time.time() - start_time) + ' sec.)')
-
-        start_time = time.time()
-        self.my_print(pp, 'Calculating the strongly connected components..')
-        scc = self.yield_scc(graph)
-        self.my_print(pp, '> Found: ' + str(len(scc)) + ' scc\'s')
-        self.my_print(pp, '> Avg nodes per scc: ' + str(nx.number_of_nodes(graph) / float(len(scc))))
-        self.my_print(pp, '> Done (' + str(time.time() - start_time) + ' sec.)')
-
-        start_time = time.time()
-        self.my_print(pp, 'Calculating the huge strongly connected component..')
-        gscc = self.yield_gscc(scc)
-        self.my_print(pp, '> Length: ' + str(len(gscc)) + ' nodes')
-        self.my_print(pp, '> Done (' + str(time.time() - start_time) + ' sec.)')
-
-        if not only_page_rank:
-
-            start_time = time.time()
-            self.my_print(pp, 'Calculating the In- and Out-sets of the graph..')
-            inc, incsubsets, outc, outcsubsets = self.generate_in_out(graph, scc, gscc, print_interval, pp)
-            self.my_print(pp, '> Found: ' + str(len(inc)) + ' In-set(s) and ' + str(len(outc)) + ' Out-set(s)')
-            self.my_print(pp, '> Done (' + str(time.time() - start_time) + ' sec.)')
-
-            start_time = time.time()
-            self.my_print(pp, 'Calculating the Tendrils-, Tubes- and Disconnected-sets of the graph..')
-            tenc, tubec, disc = self.generate_tend_tun_disc(graph, incsubsets, outcsubsets, scc, print_interval, pp)
-            self.my_print(pp, '> Found: ' + str(len(tenc)) + ' Tendrils-set(s), '
-                          + str(len(tubec)) + ' Tube-set(s), ' + str(len(disc)) + ' Disconnected-set(s), ')
-            self.my_print(pp, '> Done (' + str(time.time() - start_time) + ' sec.)')
-
-        start_time = time.time()
-        self.my_print(pp, 'Writing results to destination file (' + dest + ')..')
-        tools.write_results(dest, pr, gscc, inc, outc, tenc, tubec, disc, indegrees, urls, len(graph.nodes()))
-        self.my_print(pp, '> Done (' + str(time.time() - start_time) + ' sec.)')
-        self.my_print(pp, '> Total duration: ' + str(time.time() - total_time) + ' sec.')
-
-an = Analyzer()
-#       the input file            the output file              number of nodes to use    whether to print the status
-an.run('Files/UTwente_graph.dot', 'Output/UTwente_result.csv', 1000,                   True)
+    # Calculates the PageRank and Bow-Tie structure using the second method for trimming,
+    # engine selects the graph representation: 'networkx' or the array-backed 'csr'. The csr engine
+    # stores the full PageRank next to dest, pass that file as previous to update it incrementally
+    # for a new crawl of the same site. With binary the results are also written as columns to
+    # dest with the extension .npz. With sample set to one of the sampling.STRATEGIES the csr engine
+    # runs the whole pipeline on a sample of treshold nodes drawn with seed instead of the whole graph.
+    # The 'disk' engine keeps the edges in memory-mapped files and streams over them in blocks of
+    # about budget bytes, for graphs which do not fit in memory (treshold, previous and sample are
+    # not supported there, nor are the IN_MEMORY_STAGES). stages selects the STAGES to run, the
+    # stages they need are added. The csr and disk engines keep the result of every stage in the
+    # checkpoints directory, keyed on the content of source and the parameters, and reuse them
+    # unless resume is off.
+    def run(self, source, dest, treshold, pp, engine='networkx', previous=None, binary=True, sample=None, seed=0,
+            budget=edgestore.BUDGET, metrics=None, sinks=(), stages=DEFAULT_STAGES,
+            checkpoints="Input/checkpoints", resume=True, site_depth=1, processes=1, preview=None, walks=1,
+            epsilon=1.0e-3):
+        '''
+        :param metrics: file to which the metrics record of the run is appended as a line of JSON
+        :param sinks: extra instrument sinks, e.g. an instrument.CallbackSink
+        :param site_depth: the sites stage groups the nodes on host (1) or directories up to this depth
+        :param processes: number of processes parsing source into the graph cache, None for all cores
+        :param preview: one of pagerank.APPROXIMATIONS to approximate the PageRank instead, it is compared
+                        with the exact PageRank when a checkpoint of that exists
+        :param walks: see pagerank_preview
+        :param epsilon: see pagerank_preview
+        :return the metrics record of the run:
+        '''
+        sinks = list(sinks)
+        if pp:
+            sinks.append(ConsoleSink())
+        if metrics:
+            sinks.append(JsonSink(metrics))
+        run = Instrument(sinks, source=source, engine=engine, treshold=treshold, sample=sample)
+        log = run.message
+        stages = required_stages(stages)
+        unsupported = sorted(stages.intersection(IN_MEMORY_STAGES)) if engine == 'disk' else []
+        if unsupported:
+            raise ValueError('The disk engine cannot run the ' + ', '.join(unsupported)
+                             + ' stage(s), they load every edge into memory; use the csr engine')
+        checkpoints = Checkpoints(checkpoints, resume) if checkpoints and engine != 'networkx' else None
+
+        # Returns the arrays of a stage from its checkpoint, or computes (and stores) them
+        def cached(stage, name, key, function):
+            if checkpoints is None:
+                return function()
+            arrays, resumed = checkpoints.compute(name, key, function)
+            if resumed:
+                stage.count('checkpoints')
+                log('Resumed from the ' + name + ' checkpoint')
+            return arrays
+
+        with run.stage('Verifying required files'):
+            # Check for existence source and whether it can write to destination
+            if not os.path.isfile(source):
+                raise IOError("Source file not found: " + source)
+            if os.path.isfile(dest) and not os.access(dest, os.W_OK):
+                raise IOError("Cannot write to destination file: " + dest)
+
+            # Check whether the binary graph cache still matches the content of source
+            # otherwise parse source again, the csv files generated from the old cache are stale as well
+            cache = GraphCache("Input/cache")
+            data = cache.load(source) if engine != 'disk' else {}
+            if engine == 'disk':
+                log('Opening the edge store (Input/store), it is built when missing or stale')
+                store = edgestore.open_store("Input/store", source, budget)
+                cache = GraphCache("Input/store")
+            elif data is None:
+                log('Parsing source file into the graph cache: ' + source)
+                data = tools.parse_dot_arrays(source, processes)
+                cache.store(source, data)
+                for location in ("Input/urls.csv", "Input/edges.csv", "Input/indegrees.csv"):
+                    if os.path.isfile(location):
+                        os.remove(location)
+
+            # The networkx engine reads edges.csv, urls.csv and indegrees.csv
+            # create those files from the cache when missing
+            if engine == 'networkx':
+                if not (os.path.isfile("Input/urls.csv") and os.path.isfile("Input/edges.csv")):
+                    log('Generating edges.csv and urls.csv from the graph cache')
+                    tools.write_split_files(data, "Input/urls.csv", "Input/edges.csv")
+                if not os.path.isfile("Input/indegrees.csv"):
+                    log('Generating indegrees.csv from the graph cache')
+                    tools.write_indegrees("Input/indegrees.csv", data['indegree_ids'], data['indegree_values'])
+            # every checkpoint key starts from the content of source and the graph parameters
+            graph_key = Checkpoints.key(cache.read_meta()['sha1'], engine, treshold, sample, seed)
+
+        with run.stage('Loading graph (' + source + ')') as stage:
+            if engine == 'csr':
+                def build_graphs():
+                    pr_graph = CSRGraph.from_edges(data['sources'], data['targets'])
+                    if sample:
+                        log('Sampling ' + str(treshold) + ' nodes (' + sample + ', seed ' + str(seed) + ')')
+                        return sampling.sample(pr_graph, sample, max_nodes=treshold, seed=seed).arrays()
+                    # the PageRank is computed on the whole graph, the treshold only limits the bow-tie analysis
+                    graph = CSRGraph.from_edges(*tools.truncate_edges(data['sources'], data['targets'],
+                                                                      data['line_ends'], treshold))
+                    arrays = graph.arrays()
+                    arrays.update(pr_graph.arrays('pr_'))
+                    return arrays
+
+                arrays = cached(stage, 'graph', graph_key, build_graphs)
+                graph = CSRGraph.from_arrays(arrays)
+                pr_graph = CSRGraph.from_arrays(arrays, 'pr_') if 'pr_node_ids' in arrays else graph
+                # from here on nodes are the dense ids of pr_graph, urls and in-degrees are arrays over them
+                ids = IdMap.from_arrays(pr_graph.node_ids, data['url_ids'], data['url_offsets'], data['url_data'])
+                indegree_rank, indegree = tools.dense_indegrees(ids, data['indegree_ids'], data['indegree_values'])
+            elif engine == 'disk':
+                graph = pr_graph = store
+                ids = IdMap.from_arrays(store.node_ids, store.arrays['url_ids'], store.arrays['url_offsets'],
+                                        store.arrays['url_data'])
+                indegree_rank, indegree = tools.dense_indegrees(ids, *edgestore.count_indegrees(store))
+            else:
+                graph = pr_graph = tools.load_graph("Input/edges.csv", treshold)
+                urls = tools.load_urls("Input/urls.csv")
+                indegrees = tools.load_indegrees("Input/indegrees.csv")
+            if engine == 'disk':
+                degrees = DegreeStats.from_graph(store)
+            else:
+                degrees = DegreeStats(data['degree_ids'], data['in_degree'], data['out_degree'])
+            stage.count('nodes', graph.number_of_nodes())
+            stage.count('edges', graph.number_of_edges())
+            log('Found: ' + str(graph.number_of_nodes()) + ' nodes')
+            log('Max in-degree: ' + str(degrees.in_degree.max(initial=0)) + ', max out-degree: '
+                + str(degrees.out_degree.max(initial=0)) + ', nodes without in-links: '
+                + str(degrees.in_histogram[0] if len(degrees.in_histogram) else 0))
+
+        if 'pagerank' in stages:
+            with run.stage('Calculating PageRank of all nodes') as stage:
+                if engine == 'csr' and previous:
+                    log('Starting from the PageRank in: ' + previous)
+
+                # the residual the power iteration stops at, n * tol with the tol of pagerank_scores
+                target, residuals = pr_graph.number_of_nodes() * 1.0e-6, [None]
+
+                def report(iteration, residual):
+                    stage.count('iterations')
+                    log('Iteration ' + str(iteration) + ', residual: ' + str(residual))
+                    # the total follows from how fast the residual shrinks towards the target
+                    stage.progress(iteration, pagerank.estimate_iterations(iteration, residuals[-1], residual, target))
+                    residuals.append(residual)
+
+                if preview:
+                    log('Approximating the PageRank (' + preview + ')')
+                    preview_graph, scores, errors = self.pagerank_preview(pr_graph, preview, walks, epsilon, seed)
+                    best = pagerank.top_k(scores, 1000)
+                    pr = [(preview_graph.node_ids[node] if engine == 'networkx' else node, scores[node])
+                          for node in best.tolist()]
+                    log('Largest error estimate in the top ' + str(len(best)) + ': '
+                        + str(errors[best].max(initial=0.0)))
+                    if engine != 'networkx':
+                        key = Checkpoints.key(graph_key, 'pagerank', previous and os.path.isfile(previous)
+                                              and content_hash(previous))
+                        exact = checkpoints.load('pagerank', key) if checkpoints else None
+                        if exact is not None:
+                            overlap, error = pagerank.agreement(scores, exact['scores'], len(best))
+                            stage.count('top-k agreement', overlap)
+                            log('Agreement with the exact PageRank: ' + str(overlap) + ' of the top '
+                                + str(len(best)) + ', largest error: ' + str(error))
+                        # the stages after this one build on the approximation
+                        key = Checkpoints.key(key, 'preview', preview, walks, epsilon, seed)
+                elif engine == 'networkx':
+                    pr = self.generate_pagerank(pr_graph, 1000, report=report)
+                else:
+                    # an incremental run depends on the previous scores as well
+                    key = Checkpoints.key(graph_key, 'pagerank', previous and os.path.isfile(previous)
+                                          and content_hash(previous))
+                    scores = cached(stage, 'pagerank', key, lambda: {'scores': self.pagerank_scores(
+                        pr_graph, report=report, previous=previous)})['scores']
+                    # saved outside the checkpointed function, so a resumed run writes it as well
+                    if engine == 'csr':
+                        pagerank.save_scores(os.path.splitext(dest)[0] + '_pagerank.npz', pr_graph, scores)
+                    pr = [(node, scores[node]) for node in pagerank.top_k(scores, 1000).tolist()]
+                stage.count('nodes', pr_graph.number_of_nodes())
+                stage.count('edges', pr_graph.number_of_edges())
+
+        if 'ranking' in stages:
+            with run.stage('Calculating and comparing the rankings of all nodes') as stage:
+                if engine == 'networkx':
+                    rank_graph, values, report = self.generate_rankings(pr_graph)
+                else:
+                    def rank():
+                        values = self.generate_rankings(pr_graph, scores)[1]
+                        return dict((name, values[name]) for name in sorted(values))
+
+                    rank_graph = pr_graph
+                    values = cached(stage, 'ranking', Checkpoints.key(key, 'ranking'), rank)
+                    report = ranking.correlations(values)
+                base = os.path.splitext(dest)[0]
+                ranking.write_correlations(base + '_rankings.csv', report)
+                if binary:
+                    np.savez(base + '_metrics.npz', node_ids=rank_graph.node_ids.astype(str), **values)
+                for row in report:
+                    log(row['first'] + ' / ' + row['second'] + ': Kendall tau ' + str(round(row['kendall_tau'], 4))
+                        + ', Spearman ' + str(round(row['spearman'], 4)))
+                stage.count('nodes', rank_graph.number_of_nodes())
+                stage.count('pairs', len(report))
+
+        if 'sites' in stages:
+            with run.stage('Collapsing the graph to its sites (depth ' + str(site_depth) + ')') as stage:
+                if engine == 'networkx':
+                    log('Not supported by the networkx engine')
+                else:
+                    quotient, site_pr = self.generate_sites(pr_graph, ids, site_depth)
+                    tools.write_sites(os.path.splitext(dest)[0] + '_sites.csv', quotient, site_pr)
+                    stage.count('sites', len(quotient))
+                    stage.count('edges', quotient.graph.number_of_edges())
+                    log('Found: ' + str(len(quotient)) + ' sites with ' + str(quotient.graph.number_of_edges())
+                        + ' links between them')
+
+        if 'scc' in stages and engine != 'disk':
+            with run.stage('Calculating the strongly connected components') as stage:
+                if engine == 'networkx':
+                    scc = self.yield_scc(graph)
+                else:
+                    component_key = Checkpoints.key(graph_key, 'scc')
+                    arrays = cached(stage, 'scc', component_key, lambda: vars(self.yield_scc(graph, stage.progress)))
+                    scc = Components(arrays['labels'], arrays['sizes'])
+                stage.count('sccs', len(scc))
+                log('Found: ' + str(len(scc)) + ' scc\'s')
+                log('Avg nodes per scc: ' + str(graph.number_of_nodes() / float(len(scc))))
+
+        if 'scc' in stages:
+            with run.stage('Calculating the huge strongly connected component') as stage:
+                if engine == 'disk':
+                    # all strongly connected components need the whole graph in memory, the huge one is
+                    # found with forward and backward searches instead
+                    scc = None
+                    component_key = Checkpoints.key(graph_key, 'gscc', edgestore.MAX_SEEDS)
+                    found = cached(stage, 'gscc', component_key,
+                                   lambda: dict(zip(('gscc', 'proven'), edgestore.giant_component(graph))))
+                    gscc = found['gscc']
+                    if not found['proven']:
+                        log('Warning: the component found is not proven the largest after '
+                            + str(edgestore.MAX_SEEDS) + ' seeds, the bow-tie may be wrong')
+                else:
+                    gscc = self.yield_gscc(scc)
+                stage.count('nodes', len(gscc))
+                log('Length: ' + str(len(gscc)) + ' nodes')
+
+        if 'bow-tie' in stages:
+            with run.stage('Calculating the bow-tie structure of the graph') as stage:
+                if engine == 'networkx':
+                    inc, outc, tenc, tubec, disc = self.generate_bow_tie(graph, scc, gscc, stage.progress)
+                    counts = [len(c) for c in (inc, outc, tenc, tubec, disc)]
+                else:
+                    def classify():
+                        nodes, graph_kinds = self.generate_bow_tie_kinds(graph, scc, gscc, stage.progress)
+                        # the set of every node of pr_graph, -1 for the nodes outside the bow-tie graph
+                        kinds = np.full(len(ids), -1, dtype=np.int8)
+                        kinds[ids.index(graph.node_ids[nodes])] = graph_kinds
+                        return {'kinds': kinds}
+
+                    # keyed on the components it builds on, the gscc of the disk engine depends on MAX_SEEDS
+                    kinds = cached(stage, 'bow-tie', Checkpoints.key(component_key, 'bow-tie', bowtie.SEARCHES),
+                                   classify)['kinds']
+                    counts = np.bincount(kinds[kinds >= 0], minlength=bowtie.DISCONNECTED + 1)[bowtie.IN:].tolist()
+                stage.count('nodes', graph.number_of_nodes())
+                log('Found: ' + str(counts[0]) + ' In-set(s) and ' + str(counts[1]) + ' Out-set(s)')
+                log('Found: ' + str(counts[2]) + ' Tendrils-set(s), '
+                    + str(counts[3]) + ' Tube-set(s), ' + str(counts[4]) + ' Disconnected-set(s), ')
+
+        if 'write' in stages:
+            with run.stage('Writing results to destination file (' + dest + ')') as stage:
+                if engine == 'networkx':
+                    tools.write_results(dest, pr, gscc, inc, outc, tenc, tubec, disc, indegrees, urls,
+                                        graph.number_of_nodes())
+                    if binary:
+                        tools.write_results_binary(os.path.splitext(dest)[0] + '.npz', pr, gscc, inc, outc, tenc,
+                                                   tubec, disc, indegrees, urls, graph.number_of_nodes())
+                else:
+                    nodes, scores = [node for node, value in pr], [value for node, value in pr]
+                    tools.write_dense_results(dest, nodes, scores, kinds, indegree_rank, indegree, ids)
+                    if binary:
+                        tools.write_dense_results_binary(os.path.splitext(dest)[0] + '.npz', nodes, scores, kinds,
+                                                         indegree_rank, indegree, ids)
+                stage.count('rows', len(pr))
+        return run.finish()
+
+
+# Adds the stages the given stages need, e.g. the bow-tie needs the strongly connected components
+def required_stages(stages):
+    stages = set(stages)
+    for stage in reversed(STAGES):
+        if stage in stages:
+            stages.update(STAGE_NEEDS[stage])
+    return stages
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Calculates the PageRank and bow-tie structure of a crawled .dot graph')
+    parser.add_argument('source', nargs='?', default='Files/UTwente_graph.dot', help='the input file')
+    parser.add_argument('dest', nargs='?', default='Output/UTwente_result.csv', help='the output file')
+    parser.add_argument('--treshold', type=int, help='number of nodes to use, all nodes if omitted')
+    parser.add_argument('--engine', choices=('networkx', 'csr', 'disk'), default='csr', help='the graph engine')
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=list(DEFAULT_STAGES),
+                        help='the stages to run, the stages they need are added')
+    parser.add_argument('--site-depth', type=int, default=1,
+                        help='the sites stage groups on host (1) or directories up to this depth')
+    parser.add_argument('--checkpoints', default='Input/checkpoints', help='directory of the stage checkpoints')
+    parser.add_argument('--fresh', action='store_true', help='compute every stage again instead of resuming')
+    parser.add_argument('--previous', help='PageRank file of an earlier crawl to start from (csr engine)')
+    parser.add_argument('--sample', choices=sorted(sampling.STRATEGIES), help='sample treshold nodes (csr engine)')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the sample')
+    parser.add_argument('--budget', type=int, default=edgestore.BUDGET, help='bytes per edge block (disk engine)')
+    parser.add_argument('--processes', type=int, default=1,
+                        help='number of processes parsing the source file, 0 for all cores')
+    parser.add_argument('--preview', choices=pagerank.APPROXIMATIONS,
+                        help='approximate the PageRank, compared with the exact one if that was checkpointed')
+    parser.add_argument('--walks', type=int, default=1, help='random walks per node (--preview monte-carlo)')
+    parser.add_argument('--epsilon', type=float, default=1.0e-3, help='residual per node left (--preview push)')
+    parser.add_argument('--metrics', help='file to append the metrics of the run to')
+    parser.add_argument('--no-binary', dest='binary', action='store_false', help='do not write the .npz results')
+    parser.add_argument('--quiet', action='store_true', help='do not print the status')
+    args = parser.parse_args()
+    if args.engine == 'disk' and set(args.stages).intersection(IN_MEMORY_STAGES):
+        parser.error('the disk engine does not support --stages ' + ' '.join(IN_MEMORY_STAGES))
+    an = Analyzer()
+    an.run(args.source, args.dest, args.treshold, not args.quiet, engine=args.engine, previous=args.previous,
+           binary=args.binary, sample=args.sample, seed=args.seed, budget=args.budget, metrics=args.metrics,
+           stages=args.stages, checkpoints=args.checkpoints, resume=not args.fresh,
+           site_depth=args.site_depth, processes=args.processes, preview=args.preview, walks=args.walks,
+           epsilon=args.epsilon)
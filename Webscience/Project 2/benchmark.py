@@ -0,0 +1,203 @@
+import argparse
+import json
+import os
+import platform
+import time
+from multiprocessing import Pool
+import numpy as np
+import networkx as nx
+import tools
+import edgestore
+from analyzer import Analyzer
+from csrgraph import CSRGraph
+from degrees import DegreeStats
+from idmap import IdMap
+from instrument import peak_rss
+
+ENGINES = ('networkx', 'csr', 'disk')
+
+
+# Writes a web-like .dot file in the format of the crawler: every node has a url in a directory tree
+# of the site, the out-degrees are power-law (Pareto) distributed and the targets are drawn with
+# power-law popularity, half of them from the directory of the page itself. Some edge lines have
+# no url line and some pages no links, like in a real crawl.
+def generate_dot(location, nodes, seed=0, mean_degree=8, site='http://www.utwente.nl'):
+    rng = np.random.default_rng(seed)
+    depth = rng.integers(0, 5, nodes)
+    folders = rng.integers(0, 4, (nodes, 4))
+    # the directory of a page as one number, pages of the same directory link to each other more
+    directory = np.where(np.arange(4) < depth[:, None], folders + 1, 0) @ (5 ** np.arange(4))
+    out_degree = np.minimum(np.floor(rng.pareto(1.5, nodes) * mean_degree / 2).astype(np.int64), nodes - 1)
+    out_degree[rng.random(nodes) < 0.1] = 0
+    sources = np.repeat(np.arange(nodes), out_degree)
+    popularity = (np.arange(1, nodes + 1) ** -0.9)[rng.permutation(nodes)]
+    targets = rng.choice(nodes, len(sources), p=popularity / popularity.sum())
+    # local links go to a random page of the same directory
+    by_directory = np.argsort(directory, kind='stable')
+    starts = np.searchsorted(directory[by_directory], directory)
+    sizes = np.searchsorted(directory[by_directory], directory, 'right') - starts
+    local = rng.random(len(sources)) < 0.5
+    picks = starts[sources[local]] + (rng.random(local.sum()) * sizes[sources[local]]).astype(np.int64)
+    targets[local] = by_directory[picks]
+    unknown = nodes + np.arange(max(1, nodes // 100))
+    with open(location, 'w', buffering=tools.CHUNK_SIZE) as out_file:
+        out_file.write('digraph G {' + tools.newline)
+        for start in range(0, nodes, tools.ROWS_PER_WRITE):
+            rows = []
+            for node in range(start, min(start + tools.ROWS_PER_WRITE, nodes)):
+                path = ''.join('/d' + str(folder) for folder in folders[node, :depth[node]].tolist())
+                rows.append(str(node) + ' [url="' + site + path + '/index.html"];' + tools.newline)
+            out_file.write(''.join(rows))
+        offsets = np.concatenate(([0], np.cumsum(out_degree)))
+        for start in range(0, nodes, tools.ROWS_PER_WRITE):
+            rows = []
+            for node in range(start, min(start + tools.ROWS_PER_WRITE, nodes)):
+                links = np.unique(targets[offsets[node]:offsets[node + 1]]).tolist()
+                rows.append(' ' + str(node) + ' -> {' + ' '.join(map(str, links)) + '};' + tools.newline)
+            out_file.write(''.join(rows))
+        for node in unknown.tolist():
+            links = rng.choice(nodes, 3).tolist()
+            out_file.write(' ' + str(node) + ' -> {' + ' '.join(map(str, links)) + '};' + tools.newline)
+        out_file.write('}' + tools.newline)
+
+
+class StageTimer():
+    '''
+    Records the wall time, the memory and the throughput of every stage. The peak memory of a process
+    only grows, so every stage gets the peak of the run so far (cumulative_peak_rss_mb) and how much
+    the stage raised it (peak_rss_growth_mb), the memory the stage needed beyond the stages before it.
+    '''
+
+    def __init__(self):
+        self.stages = []
+
+    def run(self, stage, function, *args, **kwargs):
+        '''
+        Runs @param function as @param stage and records it
+        :param stage:
+        :param function:
+        :return the result of the function:
+        '''
+        before = peak_rss()
+        start = time.perf_counter()
+        result = function(*args, **kwargs)
+        seconds, after = time.perf_counter() - start, peak_rss()
+        self.stages.append({'stage': stage, 'seconds': seconds, 'cumulative_peak_rss_mb': after,
+                            'peak_rss_growth_mb': after - before if after is not None else None})
+        return result
+
+    def result(self, nodes, edges):
+        '''
+        :return the run with the throughput (edges per second) of every stage:
+        '''
+        for stage in self.stages:
+            stage['edges_per_second'] = edges / stage['seconds'] if stage['seconds'] > 0 else None
+        return {'nodes': nodes, 'edges': edges, 'stages': self.stages}
+
+
+# Runs every stage of the pipeline for one engine on one .dot file, its files are written next to
+# it. Meant to run in a fresh process so the peak memory belongs to this run only. The disk engine
+# builds its store again every run, so the parse stage never times a store left by an earlier run.
+def run_engine(location, engine):
+    out = os.path.join(os.path.dirname(location), engine)
+    analyzer = Analyzer()
+    timer = StageTimer()
+    if engine == 'networkx':
+        timer.run('parse', tools.split_dot_file, location, out + '_urls.csv', out + '_edges.csv')
+        timer.run('degree', tools.calculate_indegrees, out + '_edges.csv', out + '_indegrees.csv')
+        graph = timer.run('load', tools.load_graph, out + '_edges.csv', None)
+        pr = timer.run('pagerank', analyzer.generate_pagerank, graph, 1000)
+        scc = timer.run('scc', analyzer.yield_scc, graph)
+        gscc = analyzer.yield_gscc(scc)
+        inc, outc, tenc, tubec, disc = timer.run('bow-tie', analyzer.generate_bow_tie, graph, scc, gscc)
+        urls, indegrees = tools.load_urls(out + '_urls.csv'), tools.load_indegrees(out + '_indegrees.csv')
+        timer.run('write', tools.write_results, out + '_result.csv', pr, gscc, inc, outc, tenc, tubec, disc,
+                  indegrees, urls, graph.number_of_nodes())
+        return timer.result(graph.number_of_nodes(), graph.number_of_edges())
+
+    if engine == 'disk':
+        timer.run('parse', edgestore.build_store, out + '_store', location)
+        graph = edgestore.open_store(out + '_store', location)
+        timer.run('degree', DegreeStats.from_graph, graph)
+        indegree_ids, indegree_values = edgestore.count_indegrees(graph)
+        ids = timer.run('load', IdMap.from_arrays, graph.node_ids, graph.arrays['url_ids'],
+                        graph.arrays['url_offsets'], graph.arrays['url_data'])
+    else:
+        data = timer.run('parse', tools.parse_dot_arrays, location)
+        timer.run('degree', DegreeStats.from_edges, data['sources'], data['targets'])
+        indegree_ids, indegree_values = data['indegree_ids'], data['indegree_values']
+        graph = timer.run('load', CSRGraph.from_edges, data['sources'], data['targets'])
+        ids = IdMap.from_arrays(graph.node_ids, data['url_ids'], data['url_offsets'], data['url_data'])
+    pr = timer.run('pagerank', analyzer.generate_pagerank, graph, 1000)
+    if engine == 'disk':
+        scc, gscc = None, timer.run('scc', edgestore.giant_component, graph)[0]
+    else:
+        scc = timer.run('scc', analyzer.yield_scc, graph)
+        gscc = analyzer.yield_gscc(scc)
+    nodes, kinds = timer.run('bow-tie', analyzer.generate_bow_tie_kinds, graph, scc, gscc)
+    indegree_rank, indegree = tools.dense_indegrees(ids, indegree_ids, indegree_values)
+    timer.run('write', tools.write_dense_results, out + '_result.csv', [node for node, value in pr],
+              [value for node, value in pr], kinds, indegree_rank, indegree, ids)
+    return timer.result(graph.number_of_nodes(), graph.number_of_edges())
+
+
+# Generates a graph for every scale and runs every engine on it, each run in its own process.
+# Returns the report: the environment and per run the engine, scale and measured stages.
+def run_benchmark(scales, engines=ENGINES, seed=0, directory='Input/benchmark', report=None):
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    runs = []
+    for scale in scales:
+        location = os.path.join(directory, 'graph_' + str(scale) + '.dot')
+        generate_dot(location, scale, seed)
+        for engine in engines:
+            with Pool(1) as pool:
+                run = pool.apply(run_engine, (location, engine))
+            run.update({'engine': engine, 'scale': scale})
+            runs.append(run)
+            if report:
+                report(run)
+    return {'created': time.strftime('%Y-%m-%dT%H:%M:%S'), 'seed': seed, 'python': platform.python_version(),
+            'numpy': np.__version__, 'networkx': nx.__version__, 'platform': platform.platform(), 'runs': runs}
+
+
+# Compares a report with an earlier one, returns the (engine, scale, stage, old seconds, new seconds)
+# of every stage which got slower by more than tolerance (a fraction)
+def regressions(report, baseline, tolerance=0.25):
+    old = dict(((run['engine'], run['scale'], stage['stage']), stage['seconds'])
+               for run in baseline['runs'] for stage in run['stages'])
+    slower = []
+    for run in report['runs']:
+        for stage in run['stages']:
+            key = (run['engine'], run['scale'], stage['stage'])
+            if key in old and stage['seconds'] > old[key] * (1.0 + tolerance):
+                slower.append(key + (old[key], stage['seconds']))
+    return slower
+
+
+def print_run(run):
+    print(run['engine'] + ', ' + str(run['scale']) + ' nodes, ' + str(run['edges']) + ' edges')
+    for stage in run['stages']:
+        print('> ' + stage['stage'] + ': ' + str(round(stage['seconds'], 4)) + ' sec., peak so far '
+              + str(stage['cumulative_peak_rss_mb'] and round(stage['cumulative_peak_rss_mb'], 1)) + ' MB (+'
+              + str(stage['peak_rss_growth_mb'] and round(stage['peak_rss_growth_mb'], 1)) + ' MB)')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmarks the pipeline on generated web-like graphs')
+    parser.add_argument('--scales', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--engines', nargs='+', choices=ENGINES, default=list(ENGINES))
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--directory', default='Input/benchmark', help='where the generated graphs are written')
+    parser.add_argument('--out', default='Output/benchmark.json', help='the report file')
+    parser.add_argument('--baseline', help='an earlier report to check for regressions')
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    args = parser.parse_args()
+    result = run_benchmark(args.scales, args.engines, args.seed, args.directory, report=print_run)
+    with open(args.out, 'w') as report_file:
+        json.dump(result, report_file, indent=4)
+    if args.baseline:
+        with open(args.baseline, 'r') as baseline_file:
+            for engine, scale, stage, before, after in regressions(result, json.load(baseline_file), args.tolerance):
+                print('Slower: ' + engine + ', ' + str(scale) + ' nodes, ' + stage + ': '
+                      + str(round(before, 4)) + ' -> ' + str(round(after, 4)) + ' sec.')
@@ -0,0 +1,69 @@
+import numpy as np
+from csrgraph import CSRGraph, Components, reach
+
+# the bow-tie set of a node, in the order tools.write_results checks them
+GSCC, IN, OUT, TENDRIL, TUBE, DISCONNECTED = range(6)
+
+
+# the number of searches of classify_core
+SEARCHES = 4
+
+
+# Classifies the components of the condensation DAG, @param giant is the component of the gscc.
+def classify_components(condensed, giant, report=None):
+    core = np.zeros(condensed.number_of_nodes(), dtype=bool)
+    core[giant] = True
+    return classify_core(condensed, core, report=report)
+
+
+# Classifies the nodes of a graph given the gscc as a mask of its nodes, search is the breadth first
+# search to use (see csrgraph.reach). IN and OUT come from one backward and one forward search from
+# the gscc, the tendrils and tubes from one forward search from IN and one backward search from
+# OUT, so all of it is O(V+E). Calls report(done, total) after every level of the searches, every
+# search counts as at most n nodes.
+def classify_core(graph, core, search=reach, report=None):
+    n = graph.number_of_nodes()
+    kinds = np.full(n, DISCONNECTED, dtype=np.int8)
+
+    # reports the nodes reached by the search-th search as progress over all searches
+    def level(search_index):
+        if not report:
+            return None
+        return lambda reached: report(search_index * n + min(reached, n), SEARCHES * n)
+
+    seeds = np.flatnonzero(core)
+    in_set = search(graph, seeds, reverse=True, blocked=core, report=level(0))
+    out_set = search(graph, seeds, blocked=core, report=level(1))
+    # the rest can only be reached from IN or reach OUT without passing the gscc, IN or OUT
+    from_in = search(graph, np.flatnonzero(in_set), blocked=core | out_set, report=level(2))
+    to_out = search(graph, np.flatnonzero(out_set), reverse=True, blocked=core | in_set, report=level(3))
+    if report:
+        report(SEARCHES * n, SEARCHES * n)
+    rest = ~(core | in_set | out_set)
+    kinds[rest & (from_in | to_out)] = TENDRIL
+    kinds[rest & from_in & to_out] = TUBE
+    kinds[in_set] = IN
+    kinds[out_set] = OUT
+    kinds[core] = GSCC
+    return kinds
+
+
+# Classifies every node of @param graph given its strongly connected components, as Components or
+# as a list of node sets, and the gscc component. Returns the nodes and, parallel to it, their
+# bow-tie set. report gets the progress of the searches over the components, see classify_core.
+def classify(graph, components, giant, report=None):
+    if isinstance(components, Components):
+        nodes, labels = np.arange(graph.number_of_nodes()), components.labels
+    elif isinstance(graph, CSRGraph):
+        nodes = np.arange(graph.number_of_nodes())
+        labels = np.empty(len(nodes), dtype=np.int64)
+        for label, component in enumerate(components):
+            labels[np.fromiter(component, dtype=np.int64)] = label
+    else:
+        # networkx graphs are copied once into dense edge arrays
+        graph, index = CSRGraph.from_networkx(graph)
+        nodes = list(graph.node_ids)
+        labels = np.empty(len(nodes), dtype=np.int64)
+        for label, component in enumerate(components):
+            labels[[index[node] for node in component]] = label
+    return nodes, classify_components(graph.condensation(labels, len(components)), giant, report)[labels]
@@ -0,0 +1,83 @@
+import glob
+import hashlib
+import json
+import os
+import numpy as np
+
+
+class Checkpoints():
+    '''
+    On-disk results of the stages of a run, every result is a dict of numpy arrays stored as one
+    .npz file per stage and key. The key is a hash of everything the result depends on: the content
+    hash of the input, the parameters of the stage and the keys of the stages it builds on, so a
+    changed input or parameter never picks up an old result while the results of the unchanged
+    stages before it are reused.
+    '''
+
+    def __init__(self, directory, resume=True):
+        '''
+        :param directory:
+        :param resume: if False every stage is computed again, its checkpoint is still written
+        '''
+        self.directory = directory
+        self.resume = resume
+
+    @staticmethod
+    def key(*parts):
+        '''
+        :param parts: json serializable values, e.g. a content hash, parameters and upstream keys
+        :return the key of the parts:
+        '''
+        return hashlib.sha1(json.dumps(parts, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def path(self, stage, key):
+        return os.path.join(self.directory, stage + '-' + key + '.npz')
+
+    def load(self, stage, key):
+        '''
+        :param stage:
+        :param key:
+        :return the arrays of the checkpoint, or None if there is none:
+        '''
+        try:
+            with np.load(self.path(stage, key), allow_pickle=False) as arrays:
+                return dict((name, arrays[name]) for name in arrays.files)
+        except (IOError, ValueError):
+            return None
+
+    def save(self, stage, key, arrays):
+        '''
+        Writes the checkpoint under a temporary name first, so a crash never leaves half a checkpoint
+        :param stage:
+        :param key:
+        :param arrays: dict of numpy arrays
+        '''
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+        temporary = self.path(stage, key) + '.tmp.npz'
+        np.savez(temporary, **arrays)
+        os.replace(temporary, self.path(stage, key))
+
+    def compute(self, stage, key, function):
+        '''
+        Returns the checkpoint of @param stage, calling @param function to compute and store it when
+        it is missing or resume is off
+        :param stage:
+        :param key:
+        :param function: returns the dict of arrays of the stage
+        :return the arrays and whether they came from a checkpoint:
+        '''
+        arrays = self.load(stage, key) if self.resume else None
+        if arrays is not None:
+            return arrays, True
+        arrays = function()
+        self.save(stage, key, arrays)
+        return arrays, False
+
+    def remove(self, stage=None):
+        '''
+        Removes all checkpoints, or those of one stage
+        :param stage:
+        '''
+        for location in glob.glob(os.path.join(self.directory, (stage or '*') + '-*.npz')):
+            os.remove(location)
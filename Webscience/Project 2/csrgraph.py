@@ -0,0 +1,283 @@
+import numpy as np
+
+# the arrays which make up a CSRGraph, in the order of its constructor
+_ARRAYS = ('node_ids', 'out_offsets', 'out_targets', 'in_offsets', 'in_sources')
+
+
+class CSRGraph():
+    '''
+    Compact directed graph. The forward (successors) and reverse (predecessors) adjacency are kept
+    as int32 offset and index arrays, the nodes are the dense indices 0..n-1 and node_ids maps them
+    back to the node ids of the .dot file.
+    '''
+
+    def __init__(self, node_ids, out_offsets, out_targets, in_offsets, in_sources):
+        self.node_ids = node_ids
+        self.out_offsets = out_offsets
+        self.out_targets = out_targets
+        self.in_offsets = in_offsets
+        self.in_sources = in_sources
+
+    @classmethod
+    def from_edges(cls, sources, targets):
+        '''
+        Builds the graph from two parallel arrays of .dot node ids, duplicate edges are dropped
+        :param sources:
+        :param targets:
+        :return the graph:
+        '''
+        sources, targets = np.asarray(sources, dtype=np.int64), np.asarray(targets, dtype=np.int64)
+        node_ids, dense = np.unique(np.concatenate((sources, targets)), return_inverse=True)
+        return cls.from_dense_edges(dense[:len(sources)], dense[len(sources):], len(node_ids), node_ids)
+
+    @classmethod
+    def from_dense_edges(cls, sources, targets, n, node_ids=None):
+        '''
+        Builds the graph from two parallel arrays of dense nodes in 0..n-1, duplicate edges are dropped
+        :param sources:
+        :param targets:
+        :param n: the number of nodes, nodes without edges included
+        :param node_ids: the .dot id of every node, the dense node itself if omitted
+        :return the graph:
+        '''
+        # sorting the combined keys removes duplicates and orders the edges on source, then target
+        keys = np.unique(np.asarray(sources, dtype=np.int64) * n + targets)
+        src, dst = (keys // n).astype(np.int32), (keys % n).astype(np.int32)
+        order = np.argsort(dst, kind='stable')
+        if node_ids is None:
+            node_ids = np.arange(n)
+        return cls(node_ids, _offsets(src, n), dst, _offsets(dst, n), src[order])
+
+    @classmethod
+    def from_networkx(cls, graph):
+        '''
+        Copies a networkx graph once into the arrays, its nodes become the node_ids
+        :param graph:
+        :return the graph and a dict from networkx node to dense node:
+        '''
+        nodes = list(graph.nodes())
+        index = dict((node, i) for i, node in enumerate(nodes))
+        edges = np.array([(index[u], index[v]) for u, v in graph.edges()], dtype=np.int64).reshape(-1, 2)
+        node_ids = np.empty(len(nodes), dtype=object)
+        node_ids[:] = nodes
+        return cls.from_dense_edges(edges[:, 0], edges[:, 1], len(nodes), node_ids), index
+
+    def number_of_nodes(self):
+        return len(self.node_ids)
+
+    def number_of_edges(self):
+        return len(self.out_targets)
+
+    def __len__(self):
+        return self.number_of_nodes()
+
+    def nodes(self):
+        return range(self.number_of_nodes())
+
+    def is_directed(self):
+        return True
+
+    def successors(self, node):
+        return self.out_targets[self.out_offsets[node]:self.out_offsets[node + 1]]
+
+    def predecessors(self, node):
+        return self.in_sources[self.in_offsets[node]:self.in_offsets[node + 1]]
+
+    def out_degree(self):
+        return np.diff(self.out_offsets)
+
+    def in_degree(self):
+        return np.diff(self.in_offsets)
+
+    def edge_sources(self):
+        '''
+        Expands the offsets to the source node of every edge, parallel to out_targets
+        :return the source array:
+        '''
+        return np.repeat(np.arange(self.number_of_nodes(), dtype=np.int32), self.out_degree())
+
+    def reverse(self):
+        '''
+        :return the graph with every edge reversed, sharing the arrays of this graph:
+        '''
+        return CSRGraph(self.node_ids, self.in_offsets, self.in_sources, self.out_offsets, self.out_targets)
+
+    def label(self, node):
+        return str(self.node_ids[node])
+
+    def labels(self, nodes):
+        '''
+        Translates dense nodes back to the string node ids used by the url and in-degree files
+        :param nodes:
+        :return a set of node ids:
+        '''
+        return set(str(node_id) for node_id in self.node_ids[np.fromiter(nodes, dtype=np.int64)])
+
+    def subgraph(self, nodes):
+        '''
+        Builds the subgraph induced by @param nodes, its nodes keep their order and .dot ids
+        :param nodes: dense nodes of this graph
+        :return the subgraph:
+        '''
+        selected = np.zeros(self.number_of_nodes(), dtype=bool)
+        selected[np.asarray(nodes, dtype=np.int64)] = True
+        renumber = np.cumsum(selected) - 1
+        sources, targets = self.edge_sources(), self.out_targets
+        keep = selected[sources] & selected[targets]
+        return CSRGraph.from_dense_edges(renumber[sources[keep]], renumber[targets[keep]], int(selected.sum()),
+                                         self.node_ids[selected])
+
+    def edge_subgraph(self, edges):
+        '''
+        Builds the subgraph of the given edges and their end points
+        :param edges: positions in out_targets
+        :return the subgraph:
+        '''
+        edges = np.asarray(edges, dtype=np.int64)
+        return CSRGraph.from_edges(self.node_ids[self.edge_sources()[edges]], self.node_ids[self.out_targets[edges]])
+
+    def arrays(self, prefix=''):
+        '''
+        :param prefix: put in front of every name, to store several graphs together
+        :return the arrays of the graph by name, see from_arrays:
+        '''
+        return dict((prefix + name, getattr(self, name)) for name in _ARRAYS)
+
+    @classmethod
+    def from_arrays(cls, arrays, prefix=''):
+        '''
+        Builds the graph from the arrays of arrays(), without copying them
+        :param arrays:
+        :param prefix:
+        :return the graph:
+        '''
+        return cls(*[arrays[prefix + name] for name in _ARRAYS])
+
+    def condensation(self, labels, count):
+        '''
+        Builds the graph between the components of @param labels, edges inside a component are dropped
+        :param labels: the component of every node
+        :param count: the number of components
+        :return the condensed graph, its nodes are the components:
+        '''
+        sources, targets = labels[self.edge_sources()], labels[self.out_targets]
+        between = sources != targets
+        return CSRGraph.from_dense_edges(sources[between], targets[between], count)
+
+
+def _offsets(sorted_nodes, n):
+    offsets = np.zeros(n + 1, dtype=np.int32)
+    np.cumsum(np.bincount(sorted_nodes, minlength=n), out=offsets[1:])
+    return offsets
+
+
+# Returns the concatenated neighbours of all @param nodes from an offset and index array pair
+def expand(offsets, indices, nodes):
+    starts = offsets[nodes].astype(np.int64)
+    lengths = offsets[nodes + 1] - starts
+    total = lengths.sum()
+    if total == 0:
+        return indices[:0]
+    # position of every gathered neighbour = start of its node + rank within that node
+    shift = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+    return indices[shift + np.arange(total)]
+
+
+# Marks every node reachable from @param seeds with a level-synchronous breadth first search,
+# over the predecessors if reverse is set. Nodes marked in blocked are never entered (or returned),
+# but the search does start from blocked seeds. Calls report(reached) with the number of nodes
+# reached so far after every level.
+def reach(graph, seeds, reverse=False, blocked=None, report=None):
+    offsets, indices = (graph.in_offsets, graph.in_sources) if reverse else (graph.out_offsets, graph.out_targets)
+    reached = np.zeros(graph.number_of_nodes(), dtype=bool)
+    if blocked is not None:
+        reached |= blocked
+    frontier = np.unique(np.asarray(seeds, dtype=np.int64))
+    reached[frontier] = True
+    visited = len(frontier)
+    while len(frontier):
+        frontier = expand(offsets, indices, frontier)
+        frontier = np.unique(frontier[~reached[frontier]])
+        reached[frontier] = True
+        visited += len(frontier)
+        if report:
+            report(visited)
+    if blocked is not None:
+        reached &= ~blocked
+    return reached
+
+
+class Components():
+    '''
+    Strongly connected components as the component label of every node plus the size of every
+    component, instead of one set per component.
+    '''
+
+    def __init__(self, labels, sizes):
+        self.labels = labels
+        self.sizes = sizes
+
+    def __len__(self):
+        return len(self.sizes)
+
+    def giant(self):
+        return int(np.argmax(self.sizes))
+
+    def members(self, component):
+        return np.flatnonzero(self.labels == component)
+
+
+# Computes the strongly connected components of the graph with Tarjan's algorithm. The depth first
+# search keeps its own stack of (node, next edge) pairs, so deep graphs cannot hit the recursion limit.
+# Calls report(visited, n) at the roots of the search, about every percent of the nodes visited.
+def component_labels(graph, report=None):
+    n = graph.number_of_nodes()
+    offsets, targets = graph.out_offsets.tolist(), graph.out_targets.tolist()
+    index, low, labels = [-1] * n, [0] * n, [-1] * n
+    on_stack, stack, sizes = bytearray(n), [], []
+    counter = 0
+    step = next_report = max(1, n // 100)
+    for root in range(n):
+        if index[root] != -1:
+            continue
+        if report and counter >= next_report:
+            report(counter, n)
+            next_report = counter + step
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = 1
+        work = [(root, offsets[root])]
+        while work:
+            node, pos = work[-1]
+            end = offsets[node + 1]
+            while pos < end:
+                succ = targets[pos]
+                pos += 1
+                if index[succ] == -1:
+                    # descend, the scan of node continues at pos afterwards
+                    work[-1] = (node, pos)
+                    index[succ] = low[succ] = counter
+                    counter += 1
+                    stack.append(succ)
+                    on_stack[succ] = 1
+                    work.append((succ, offsets[succ]))
+                    break
+                elif on_stack[succ] and index[succ] < low[node]:
+                    low[node] = index[succ]
+            else:
+                work.pop()
+                if work and low[node] < low[work[-1][0]]:
+                    low[work[-1][0]] = low[node]
+                if low[node] == index[node]:
+                    # node is the root of a component, which is on top of the stack
+                    size, member = 0, -1
+                    while member != node:
+                        member = stack.pop()
+                        on_stack[member] = 0
+                        labels[member] = len(sizes)
+                        size += 1
+                    sizes.append(size)
+    if report:
+        report(n, n)
+    return Components(np.array(labels, dtype=np.int32), np.array(sizes, dtype=np.int64))
@@ -0,0 +1,77 @@
+import numpy as np
+
+
+class DegreeStats():
+    '''
+    In- and out-degree of every node with the degree distributions and the degree ranks. All of it
+    is counted with bincount over the integer edge arrays, so it comes for free with parsing or
+    building the graph instead of needing another pass over edges.csv.
+    '''
+
+    def __init__(self, node_ids, in_degree, out_degree):
+        '''
+        :param node_ids: the sorted .dot ids of the nodes
+        :param in_degree: the in-degree of every node, parallel to node_ids
+        :param out_degree: the out-degree of every node, parallel to node_ids
+        '''
+        self.node_ids = node_ids
+        self.in_degree = in_degree
+        self.out_degree = out_degree
+        # number of nodes per degree value
+        self.in_histogram = np.bincount(in_degree)
+        self.out_histogram = np.bincount(out_degree)
+
+    @classmethod
+    def from_edges(cls, sources, targets):
+        '''
+        Counts the degrees of two parallel arrays of .dot node ids, duplicate edges count double
+        :param sources:
+        :param targets:
+        :return the degree statistics:
+        '''
+        node_ids = np.unique(np.concatenate((sources, targets)))
+        n = len(node_ids)
+        return cls(node_ids, np.bincount(np.searchsorted(node_ids, targets), minlength=n),
+                   np.bincount(np.searchsorted(node_ids, sources), minlength=n))
+
+    @classmethod
+    def from_graph(cls, graph):
+        '''
+        Takes the degrees of a CSRGraph straight from its offset arrays
+        :param graph:
+        :return the degree statistics:
+        '''
+        return cls(graph.node_ids, graph.in_degree(), graph.out_degree())
+
+    def index(self, node_id):
+        '''
+        :param node_id: a .dot node id
+        :return the position of the node in the arrays, or -1 if it has no edges:
+        '''
+        position = np.searchsorted(self.node_ids, node_id)
+        return position if position < len(self.node_ids) and self.node_ids[position] == node_id else -1
+
+    def in_rank(self):
+        return rank(self.in_degree)
+
+    def out_rank(self):
+        return rank(self.out_degree)
+
+    def in_distribution(self):
+        return distribution(self.in_histogram)
+
+    def out_distribution(self):
+        return distribution(self.out_histogram)
+
+
+# Ranks the values from high to low, the highest gets rank 1 and ties keep the node order
+def rank(values):
+    ranks = np.empty(len(values), dtype=np.int64)
+    ranks[np.argsort(-np.asarray(values), kind='stable')] = np.arange(1, len(values) + 1)
+    return ranks
+
+
+# Returns the degrees which occur and the number of nodes having them
+def distribution(histogram):
+    degrees = np.flatnonzero(histogram)
+    return degrees, histogram[degrees]
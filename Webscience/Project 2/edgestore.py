@@ -0,0 +1,279 @@
+import os
+from array import array
+import numpy as np
+from numpy.lib.format import open_memmap
+import bowtie
+import tools
+from csrgraph import CSRGraph, expand
+from graphcache import GraphCache
+
+# default memory budget of the edge blocks in bytes
+BUDGET = 1 << 28
+# working memory per edge of a block: the index, the gathered value, the weight and the position
+EDGE_BYTES = 32
+# most seeds giant_component tries before it settles for a component not proven the largest
+MAX_SEEDS = 64
+
+
+# Returns the number of edges handled at once within @param budget bytes
+def block_size(budget):
+    return max(1, int(budget) // EDGE_BYTES)
+
+
+class EdgeStore(CSRGraph):
+    '''
+    CSRGraph for graphs larger than memory. The adjacency is kept on disk as int32 .npy files sorted
+    on source (out_targets) and on target (in_sources) with int64 offset files, and memory-mapped.
+    The streaming functions of this module walk over it in blocks of whole nodes, so the edge data
+    in memory is bounded by the budget; only arrays with one value per node are kept in memory.
+    '''
+
+    def __init__(self, node_ids, out_offsets, out_targets, in_offsets, in_sources, budget=BUDGET, arrays=None):
+        CSRGraph.__init__(self, node_ids, out_offsets, out_targets, in_offsets, in_sources)
+        self.budget = budget
+        # all memory-mapped arrays of the store directory, the urls of the .dot file included
+        self.arrays = arrays or {}
+
+    def blocks(self, offsets):
+        '''
+        Splits the nodes into ranges of about block_size(budget) edges, a node is never split
+        :param offsets: out_offsets or in_offsets
+        :return list of (first node, end node) tuples:
+        '''
+        n, step = self.number_of_nodes(), block_size(self.budget)
+        cuts = np.searchsorted(offsets, np.arange(0, offsets[-1], step), 'right') - 1
+        cuts = np.unique(np.concatenate(([0], cuts, [n])))
+        return list(zip(cuts[:-1].tolist(), cuts[1:].tolist()))
+
+
+# Streams the edges of a .dot file as blocks of two int64 arrays (sources, targets) of .dot ids,
+# every url record is passed to on_url(node id, url bytes) if given
+def edge_blocks(in_loc, size, on_url=None):
+    sources, targets = array('l'), array('l')
+    for kind, first, second in tools.iter_dot_file(in_loc, raw=True):
+        if kind == tools.NODE:
+            if on_url:
+                on_url(first, second)
+            continue
+        sources.append(first)
+        targets.append(second)
+        if len(targets) >= size:
+            yield np.array(sources, dtype=np.int64), np.array(targets, dtype=np.int64)
+            sources, targets = array('l'), array('l')
+    if targets:
+        yield np.array(sources, dtype=np.int64), np.array(targets, dtype=np.int64)
+
+
+# Writes values to their slot of a grouped array: the slots of group key start at offsets[key] +
+# cursor[key] and are taken in order, cursor is advanced
+def _scatter(destination, offsets, cursor, keys, values):
+    order = np.argsort(keys, kind='stable')
+    keys = keys[order]
+    rank = np.arange(len(keys)) - np.searchsorted(keys, keys)
+    destination[offsets[keys] + cursor[keys] + rank] = values[order]
+    cursor += np.bincount(keys, minlength=len(cursor))
+
+
+def _offsets(counts):
+    offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    return offsets
+
+
+# Parses the .dot file @param in_loc into an EdgeStore in @param directory. The edges are read a
+# block at a time: once for the node ids and urls, once to count and once to place every edge at
+# its source. Duplicate edges are then removed per block of sources (like CSRGraph.from_edges) and
+# the reverse adjacency is filled from the forward one.
+def build_store(directory, in_loc, budget=BUDGET):
+    cache = GraphCache(directory)
+    cache.clear()
+    size = block_size(budget)
+    url_ids, url_offsets, url_data = array('l'), array('l', [0]), bytearray()
+
+    def on_url(node, url):
+        url_ids.append(node)
+        url_data.extend(url)
+        url_offsets.append(len(url_data))
+
+    node_ids = np.zeros(0, dtype=np.int64)
+    for sources, targets in edge_blocks(in_loc, size, on_url):
+        node_ids = np.union1d(node_ids, np.concatenate((sources, targets)))
+    n = len(node_ids)
+    counts = np.zeros(n, dtype=np.int64)
+    for sources, targets in edge_blocks(in_loc, size):
+        counts += np.bincount(np.searchsorted(node_ids, sources), minlength=n)
+    raw_offsets = _offsets(counts)
+    raw_location = cache.path('raw_targets.npy')
+    raw = open_memmap(raw_location, mode='w+', dtype=np.int32, shape=(int(raw_offsets[-1]),))
+    cursor = np.zeros(n, dtype=np.int64)
+    for sources, targets in edge_blocks(in_loc, size):
+        _scatter(raw, raw_offsets, cursor, np.searchsorted(node_ids, sources),
+                 np.searchsorted(node_ids, targets).astype(np.int32))
+
+    # sort and deduplicate the targets of every source, compacting the file in place
+    counts[:] = 0
+    written = 0
+    raw_store = EdgeStore(node_ids, raw_offsets, raw, raw_offsets, raw, budget)
+    for first, end in raw_store.blocks(raw_offsets):
+        local = np.repeat(np.arange(end - first, dtype=np.int64), np.diff(raw_offsets[first:end + 1]))
+        keys = np.unique(local * n + raw[raw_offsets[first]:raw_offsets[end]])
+        raw[written:written + len(keys)] = keys % n
+        counts[first:end] = np.bincount(keys // n, minlength=end - first)
+        written += len(keys)
+    out_offsets = _offsets(counts)
+    out_targets = open_memmap(cache.path('out_targets.npy'), mode='w+', dtype=np.int32, shape=(written,))
+    for start in range(0, written, size):
+        out_targets[start:start + size] = raw[start:start + size]
+    del raw, raw_store
+    os.remove(raw_location)
+
+    # the reverse adjacency, sources are visited in order so every target lists them sorted
+    store = EdgeStore(node_ids, out_offsets, out_targets, out_offsets, out_targets, budget)
+    in_counts = np.zeros(n, dtype=np.int64)
+    for start in range(0, written, size):
+        in_counts += np.bincount(out_targets[start:start + size], minlength=n)
+    in_offsets = _offsets(in_counts)
+    in_sources = open_memmap(cache.path('in_sources.npy'), mode='w+', dtype=np.int32, shape=(written,))
+    cursor[:] = 0
+    for first, end in store.blocks(out_offsets):
+        sources = np.repeat(np.arange(first, end, dtype=np.int32), np.diff(out_offsets[first:end + 1]))
+        _scatter(in_sources, in_offsets, cursor, out_targets[out_offsets[first]:out_offsets[end]].astype(np.int64), sources)
+    out_targets.flush()
+    in_sources.flush()
+    del out_targets, in_sources, store
+
+    arrays = {'node_ids': node_ids, 'out_offsets': out_offsets, 'in_offsets': in_offsets,
+              'url_ids': np.array(url_ids, dtype=np.int64), 'url_offsets': np.array(url_offsets, dtype=np.int64),
+              'url_data': np.frombuffer(bytes(url_data), dtype=np.uint8)}
+    for name, values in arrays.items():
+        np.save(cache.path(name + '.npy'), values)
+    cache.commit(in_loc, list(arrays) + ['out_targets', 'in_sources'])
+
+
+# Opens the EdgeStore of @param in_loc in @param directory, building it first when it is missing or stale
+def open_store(directory, in_loc, budget=BUDGET):
+    cache = GraphCache(directory)
+    arrays = cache.load(in_loc)
+    if arrays is None:
+        build_store(directory, in_loc, budget)
+        arrays = cache.load(in_loc)
+    return EdgeStore(np.asarray(arrays['node_ids']), np.asarray(arrays['out_offsets']), arrays['out_targets'],
+                     np.asarray(arrays['in_offsets']), arrays['in_sources'], budget, arrays)
+
+
+# Returns the in-degree arrays of tools.count_indegrees for the store, ties are in node id order
+def count_indegrees(store):
+    in_degree = store.in_degree()
+    order = np.argsort(in_degree, kind='stable')
+    order = order[in_degree[order] > 0]
+    return store.node_ids[order], in_degree[order]
+
+
+# Computes the PageRank of every node of the store like pagerank.pagerank, but every iteration
+# streams over the in-edges one block of target nodes at a time
+def stream_pagerank(store, alpha=0.85, tol=1.0e-6, max_iter=100, report=None):
+    n = store.number_of_nodes()
+    residuals = []
+    if n == 0:
+        return np.zeros(0), residuals
+    out_degree = store.out_degree()
+    dangling = out_degree == 0
+    inverse = np.divide(1.0, out_degree, out=np.zeros(n), where=~dangling)
+    blocks = store.blocks(store.in_offsets)
+    scores = np.full(n, 1.0 / n)
+    for iteration in range(1, max_iter + 1):
+        last = scores
+        weighted = last * inverse
+        scores = np.empty(n)
+        for first, end in blocks:
+            lengths = np.diff(store.in_offsets[first:end + 1])
+            members = np.repeat(np.arange(end - first), lengths)
+            contributions = weighted[store.in_sources[store.in_offsets[first]:store.in_offsets[end]]]
+            scores[first:end] = np.bincount(members, weights=contributions, minlength=end - first)
+        scores *= alpha
+        scores += (alpha * last[dangling].sum() + 1.0 - alpha) / n
+        residuals.append(np.abs(scores - last).sum())
+        if report:
+            report(iteration, residuals[-1])
+        if residuals[-1] < n * tol:
+            break
+    return scores, residuals
+
+
+# Breadth first search like csrgraph.reach, every level is expanded in pieces of the frontier
+# whose edges fit in one block
+def stream_reach(store, seeds, reverse=False, blocked=None, report=None):
+    offsets, indices = (store.in_offsets, store.in_sources) if reverse else (store.out_offsets, store.out_targets)
+    size = block_size(store.budget)
+    reached = np.zeros(store.number_of_nodes(), dtype=bool)
+    if blocked is not None:
+        reached |= blocked
+    frontier = np.unique(np.asarray(seeds, dtype=np.int64))
+    reached[frontier] = True
+    visited = len(frontier)
+    while len(frontier):
+        ends = np.cumsum(offsets[frontier + 1] - offsets[frontier])
+        cuts = np.searchsorted(ends, np.arange(size, ends[-1], size), 'right') if ends[-1] else []
+        found = []
+        for piece in np.split(frontier, cuts):
+            piece = expand(offsets, indices, piece)
+            piece = np.unique(piece[~reached[piece]])
+            reached[piece] = True
+            found.append(piece)
+        frontier = np.concatenate(found)
+        visited += len(frontier)
+        if report:
+            report(visited)
+    if blocked is not None:
+        reached &= ~blocked
+    return reached
+
+
+# Finds the giant strongly connected component without computing all components, by forward-backward
+# searches: the component of a seed is the nodes both reachable from and reaching it, and every other
+# component lies entirely within one of the parts it splits its region into (reached forward only,
+# backward only or neither). Only nodes with in- and out-links can be in a component of more than one
+# node, so once the component found is at least as large as the number of such nodes left in any
+# region, no larger one exists. Seeds are the nodes with the most in- times out-links of the largest
+# region, on a web graph the first one usually settles it. Returns the nodes of the component and
+# whether it is proven the largest within max_seeds seeds.
+def giant_component(store, max_seeds=MAX_SEEDS):
+    n = store.number_of_nodes()
+    if n == 0:
+        return np.zeros(0, dtype=np.int64), True
+    in_degree, out_degree = store.in_degree(), store.out_degree()
+    score = in_degree.astype(np.float64) * out_degree
+    cyclic = (in_degree > 0) & (out_degree > 0)
+    # the region of every node, -1 once its component is known
+    region, regions = np.zeros(n, dtype=np.int64), 1
+    best = np.zeros(0, dtype=np.int64)
+    for tries in range(max_seeds + 1):
+        counts = np.bincount(region[cyclic & (region >= 0)], minlength=regions)
+        largest = int(np.argmax(counts))
+        if len(best) >= max(counts[largest], 1):
+            return best, True
+        if tries == max_seeds:
+            break
+        members = region == largest
+        if not members.any():
+            break
+        start = int(np.argmax(np.where(members, score, -1.0)))
+        # a component within the region is found by searches which stay within the region
+        forward = stream_reach(store, [start], blocked=~members)
+        backward = stream_reach(store, [start], reverse=True, blocked=~members)
+        component = forward & backward
+        if component.sum() > len(best):
+            best = np.flatnonzero(component)
+        region[forward & ~component] = regions
+        region[backward & ~component] = regions + 1
+        region[component] = -1
+        regions += 2
+    return best, False
+
+
+# Classifies every node of the store into its bow-tie set given the nodes of the giant component,
+# report gets the progress of the searches, see bowtie.classify_core
+def bow_tie(store, gscc, report=None):
+    core = np.zeros(store.number_of_nodes(), dtype=bool)
+    core[gscc] = True
+    return bowtie.classify_core(store, core, search=stream_reach, report=report)
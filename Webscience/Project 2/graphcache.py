@@ -0,0 +1,112 @@
+import hashlib
+import json
+import os
+import numpy as np
+
+BLOCK_SIZE = 1 << 24
+
+
+# Returns the sha1 hex digest of the content of a file, read in large blocks
+def content_hash(location):
+    digest = hashlib.sha1()
+    with open(location, 'rb') as in_file:
+        block = in_file.read(BLOCK_SIZE)
+        while block:
+            digest.update(block)
+            block = in_file.read(BLOCK_SIZE)
+    return digest.hexdigest()
+
+
+class GraphCache():
+    '''
+    Binary cache of the parsed source file: every array of tools.parse_dot_arrays is stored as an
+    .npy file which is memory-mapped on load. The cache is keyed on the size, modification time and
+    content hash of the source; a changed size or hash invalidates it. When only the modification
+    time differs the hash decides, so touching the source does not force a re-parse.
+    '''
+
+    version = 2
+    meta_name = 'meta.json'
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def read_meta(self):
+        try:
+            with open(self.path(self.meta_name), 'r') as meta_file:
+                return json.load(meta_file)
+        except (IOError, ValueError):
+            return None
+
+    def is_valid(self, source):
+        '''
+        Checks whether the cache was built from the current content of @param source
+        :param source:
+        :return True or False:
+        '''
+        meta = self.read_meta()
+        if meta is None or meta.get('version') != self.version or meta.get('source') != os.path.abspath(source):
+            return False
+        stat = os.stat(source)
+        if meta['size'] != stat.st_size:
+            return False
+        if meta['mtime'] == stat.st_mtime_ns:
+            return True
+        if meta['sha1'] != content_hash(source):
+            return False
+        # same content, remember the new modification time so the next check is cheap again
+        meta['mtime'] = stat.st_mtime_ns
+        self.write_meta(meta)
+        return True
+
+    def load(self, source):
+        '''
+        Loads the cached arrays of @param source
+        :param source:
+        :return a dict of memory-mapped arrays, or None if the cache is missing or stale:
+        '''
+        if not self.is_valid(source):
+            return None
+        meta = self.read_meta()
+        try:
+            return dict((name, np.load(self.path(name + '.npy'), mmap_mode='r')) for name in meta['arrays'])
+        except (IOError, ValueError):
+            return None
+
+    def store(self, source, arrays):
+        '''
+        Stores @param arrays as the cache of @param source, the meta file is written last so an
+        interrupted store leaves an invalid cache behind
+        :param source:
+        :param arrays: a dict of numpy arrays
+        '''
+        self.clear()
+        for name, values in arrays.items():
+            np.save(self.path(name + '.npy'), np.asarray(values))
+        self.commit(source, arrays)
+
+    def clear(self):
+        '''
+        Invalidates the cache before its arrays are (re)written, creating the directory if needed
+        '''
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+        if os.path.isfile(self.path(self.meta_name)):
+            os.remove(self.path(self.meta_name))
+
+    def commit(self, source, names):
+        '''
+        Marks the arrays @param names, written to the directory as .npy files, as the cache of @param source
+        :param source:
+        :param names:
+        '''
+        stat = os.stat(source)
+        self.write_meta({'version': self.version, 'source': os.path.abspath(source), 'size': stat.st_size,
+                         'mtime': stat.st_mtime_ns, 'sha1': content_hash(source), 'arrays': sorted(names)})
+
+    def write_meta(self, meta):
+        with open(self.path(self.meta_name), 'w') as meta_file:
+            json.dump(meta, meta_file, indent=4)
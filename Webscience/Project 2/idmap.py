@@ -0,0 +1,82 @@
+import numpy as np
+
+
+class IdMap():
+    '''
+    Central map between the dense int32 node ids used by the pipeline (0..n-1, the nodes of a
+    CSRGraph) and the node ids of the .dot file. The url of every dense node is kept in one
+    contiguous utf-8 string table with offsets instead of a dict of str keys.
+    '''
+
+    def __init__(self, node_ids, url_offsets, url_data):
+        '''
+        :param node_ids: the sorted .dot ids, the dense id of a node is its position
+        :param url_offsets: n + 1 offsets of the url of every dense node in url_data
+        :param url_data: the urls as one uint8 array
+        '''
+        self.node_ids = node_ids
+        self.url_offsets = url_offsets
+        self.url_data = url_data
+
+    @classmethod
+    def from_arrays(cls, node_ids, url_ids, url_offsets, url_data):
+        '''
+        Builds the map of the nodes of a graph from the url arrays of tools.parse_dot_arrays, nodes
+        without a url line get an empty url and urls of nodes outside node_ids are dropped
+        :param node_ids: the sorted .dot ids of the graph
+        :param url_ids: the .dot id of every url, in file order
+        :param url_offsets:
+        :param url_data:
+        :return the id map:
+        '''
+        node_ids = np.asarray(node_ids)
+        url_ids, url_offsets = np.asarray(url_ids), np.asarray(url_offsets)
+        # the last url line of a node wins, like the dict of tools.load_urls
+        last = len(url_ids) - 1 - np.unique(url_ids[::-1], return_index=True)[1]
+        position = np.full(len(node_ids), -1, dtype=np.int64)
+        dense = index_of(node_ids, url_ids[last])
+        position[dense[dense >= 0]] = last[dense >= 0]
+        found = position >= 0
+        starts, ends = np.zeros(len(node_ids), dtype=np.int64), np.zeros(len(node_ids), dtype=np.int64)
+        starts[found], ends[found] = url_offsets[position[found]], url_offsets[position[found] + 1]
+        lengths = ends - starts
+        offsets = np.zeros(len(node_ids) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        shift = np.repeat(starts - offsets[:-1], lengths)
+        return cls(node_ids, offsets, np.asarray(url_data)[shift + np.arange(offsets[-1])])
+
+    def __len__(self):
+        return len(self.node_ids)
+
+    def index(self, dot_ids):
+        '''
+        :param dot_ids: an array of .dot node ids
+        :return their dense ids as int32, -1 for unknown ids:
+        '''
+        return index_of(self.node_ids, dot_ids).astype(np.int32)
+
+    def dot_id(self, node):
+        return int(self.node_ids[node])
+
+    def url(self, node):
+        return bytes(self.url_data[self.url_offsets[node]:self.url_offsets[node + 1]]).decode('utf-8')
+
+    def urls(self, nodes):
+        '''
+        :param nodes: dense ids
+        :return the list of their urls:
+        '''
+        # slices of a memoryview decode without copying the whole table first
+        nodes = np.asarray(nodes, dtype=np.int64)
+        data = memoryview(np.ascontiguousarray(self.url_data))
+        return [str(data[start:end], 'utf-8') for start, end in
+                zip(self.url_offsets[nodes].tolist(), self.url_offsets[nodes + 1].tolist())]
+
+
+# Returns the position of every value in the sorted array keys, -1 if it does not occur
+def index_of(keys, values):
+    values = np.asarray(values)
+    if len(keys) == 0:
+        return np.full(len(values), -1, dtype=np.int64)
+    position = np.minimum(np.searchsorted(keys, values), len(keys) - 1)
+    return np.where(keys[position] == values, position, -1)
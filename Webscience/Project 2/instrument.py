@@ -0,0 +1,233 @@
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+# Returns the peak resident set size of this process in MB, None where it cannot be measured
+def peak_rss():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, kilobytes elsewhere
+    return peak / float(1 << 20) if sys.platform == 'darwin' else peak / 1024.0
+
+
+class Stage():
+    '''
+    One timed stage of a run: wall and cpu time, the peak memory of the process at its end and
+    counters of the items it handled (nodes, edges, sccs, queries, ...).
+    '''
+
+    def __init__(self, instrument, name, total=None):
+        self.instrument = instrument
+        self.name = name
+        self.total = total
+        self.done = 0
+        self.counters = {}
+        self.wall = self.cpu = 0.0
+        self.peak_rss_mb = None
+        self.start_wall, self.start_cpu = time.perf_counter(), time.process_time()
+
+    def count(self, counter, amount=1):
+        self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    def progress(self, done, total=None):
+        '''
+        Reports that @param done of the total items of the stage are handled
+        :param done:
+        :param total: changes the total number of items
+        '''
+        self.done = done
+        if total is not None:
+            self.total = total
+        self.instrument.emit('progress', self)
+
+    def elapsed(self):
+        return time.perf_counter() - self.start_wall
+
+    def rate(self):
+        elapsed = self.elapsed()
+        return self.done / elapsed if elapsed > 0 else None
+
+    def eta(self):
+        '''
+        :return the expected seconds left from the rate so far, None if unknown:
+        '''
+        rate = self.rate()
+        if not self.total or not rate:
+            return None
+        return max(self.total - self.done, 0) / rate
+
+    def stop(self):
+        self.wall = time.perf_counter() - self.start_wall
+        self.cpu = time.process_time() - self.start_cpu
+        self.peak_rss_mb = peak_rss()
+
+    def record(self):
+        return {'stage': self.name, 'wall_seconds': self.wall, 'cpu_seconds': self.cpu,
+                'peak_rss_mb': self.peak_rss_mb, 'counters': dict(self.counters)}
+
+
+class Instrument():
+    '''
+    Collects the stages of one run and passes their events to the sinks: 'start' and 'end' of
+    every stage, 'progress' within a stage, 'message' for free text and 'finish' with the record
+    of the whole run.
+    '''
+
+    def __init__(self, sinks=(), **labels):
+        '''
+        :param sinks: objects with the methods of Sink
+        :param labels: extra fields of the run record, e.g. the source and engine
+        '''
+        self.sinks = list(sinks)
+        self.labels = labels
+        self.stages = []
+        self.start_wall, self.start_cpu = time.perf_counter(), time.process_time()
+
+    @contextmanager
+    def stage(self, name, total=None):
+        '''
+        Times the block within the with statement as a stage
+        :param name:
+        :param total: the number of items of the stage if known, for the progress
+        :return the Stage:
+        '''
+        stage = Stage(self, name, total)
+        self.emit('start', stage)
+        try:
+            yield stage
+        finally:
+            stage.stop()
+            self.stages.append(stage)
+            self.emit('end', stage)
+
+    def message(self, text):
+        self.emit('message', text)
+
+    def emit(self, event, item):
+        for sink in self.sinks:
+            getattr(sink, event)(item)
+
+    def record(self):
+        '''
+        :return the metrics record of the run:
+        '''
+        record = dict(self.labels)
+        record.update({'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                       'wall_seconds': time.perf_counter() - self.start_wall,
+                       'cpu_seconds': time.process_time() - self.start_cpu, 'peak_rss_mb': peak_rss(),
+                       'stages': [stage.record() for stage in self.stages]})
+        return record
+
+    def finish(self):
+        record = self.record()
+        self.emit('finish', record)
+        return record
+
+
+class Sink():
+    '''
+    Receives the events of an Instrument, every method does nothing by default
+    '''
+
+    def start(self, stage):
+        pass
+
+    def progress(self, stage):
+        pass
+
+    def end(self, stage):
+        pass
+
+    def message(self, text):
+        pass
+
+    def finish(self, record):
+        pass
+
+
+class ConsoleSink(Sink):
+    '''
+    Prints the stages like Analyzer.my_print did, with the rate and ETA of progress at most every
+    interval seconds
+    '''
+
+    def __init__(self, interval=1.0, out=None):
+        self.interval = interval
+        self.out = out or sys.stdout
+        self.last = 0.0
+
+    def write(self, text):
+        self.out.write(text + '\n')
+
+    def start(self, stage):
+        self.write(stage.name + '..')
+
+    def progress(self, stage):
+        now = time.perf_counter()
+        if now - self.last < self.interval and stage.done != stage.total:
+            return
+        self.last = now
+        text = '> ' + str(stage.done) + ('' if stage.total is None else ' / ' + str(stage.total))
+        rate, eta = stage.rate(), stage.eta()
+        if rate is not None:
+            text += ' (' + str(round(rate, 1)) + ' per sec.'
+            text += ')' if eta is None else ', ' + str(round(eta, 1)) + ' sec. left)'
+        self.write(text)
+
+    def end(self, stage):
+        self.write('> Done (' + str(stage.wall) + ' sec.)')
+
+    def message(self, text):
+        self.write('> ' + text)
+
+    def finish(self, record):
+        self.write('> Total duration: ' + str(record['wall_seconds']) + ' sec.')
+
+
+class JsonSink(Sink):
+    '''
+    Appends the record of every run as one line of JSON to a file, so runs can be compared over time
+    '''
+
+    def __init__(self, location):
+        self.location = location
+
+    def finish(self, record):
+        directory = os.path.dirname(self.location)
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory)
+        with open(self.location, 'a') as metrics_file:
+            metrics_file.write(json.dumps(record) + '\n')
+
+
+class CallbackSink(Sink):
+    '''
+    Calls function(event, item) for every event, item is the Stage, the message or the run record
+    '''
+
+    def __init__(self, function):
+        self.function = function
+
+    def start(self, stage):
+        self.function('start', stage)
+
+    def progress(self, stage):
+        self.function('progress', stage)
+
+    def end(self, stage):
+        self.function('end', stage)
+
+    def message(self, text):
+        self.function('message', text)
+
+    def finish(self, record):
+        self.function('finish', record)
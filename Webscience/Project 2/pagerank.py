@@ -0,0 +1,220 @@
+import numpy as np
+from csrgraph import expand
+
+
+# Computes the PageRank of every node of a CSRGraph by power iteration. Every iteration is one
+# sparse matrix-vector product over the edge arrays, the score of dangling nodes is spread over
+# all nodes. Stops once the L1 change drops below n * tol (like networkx) and calls
+# report(iteration, residual) after every iteration. Starts from the uniform vector unless a start
+# vector is given. With weights (parallel to out_targets, e.g. the link counts of a collapsed graph)
+# a node passes its score on in proportion to the weights of its edges. Returns the scores and the residuals.
+def pagerank(graph, alpha=0.85, tol=1.0e-6, max_iter=100, report=None, start=None, weights=None):
+    n = graph.number_of_nodes()
+    residuals = []
+    if n == 0:
+        return np.zeros(0), residuals
+    sources, targets = graph.edge_sources(), graph.out_targets
+    out_degree = graph.out_degree() if weights is None else np.bincount(sources, weights=weights, minlength=n)
+    dangling = out_degree == 0
+    # inverse out-degree, zero for dangling nodes so they do not contribute to the product
+    inverse = np.divide(1.0, out_degree, out=np.zeros(n), where=~dangling)
+    scores = np.full(n, 1.0 / n) if start is None else start / start.sum()
+    for iteration in range(1, max_iter + 1):
+        last = scores
+        share = (last * inverse)[sources]
+        scores = np.bincount(targets, weights=share if weights is None else share * weights, minlength=n)
+        scores *= alpha
+        scores += (alpha * last[dangling].sum() + 1.0 - alpha) / n
+        residuals.append(np.abs(scores - last).sum())
+        if report:
+            report(iteration, residuals[-1])
+        if residuals[-1] < n * tol:
+            break
+    return scores, residuals
+
+
+# Estimates the total number of iterations of a power iteration from its last two residuals, which
+# shrink about geometrically: the iterations so far plus those needed to get from residual below
+# target at the same rate, at most max_iter. None while the residual does not shrink yet.
+def estimate_iterations(iteration, last, residual, target, max_iter=100):
+    if residual < target:
+        return iteration
+    if not last or not 0 < residual < last:
+        return None
+    left = int(np.ceil(np.log(target / residual) / np.log(residual / last)))
+    return min(iteration + max(left, 1), max_iter)
+
+
+# Returns the nodes with the k highest scores, highest first, using a partial selection
+def top_k(scores, k):
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.zeros(0, dtype=np.int64)
+    best = np.argpartition(-scores, k - 1)[:k]
+    return best[np.argsort(-scores[best], kind='stable')]
+
+
+# Saves the scores of a run together with the edges of its graph (as .dot ids), so a later run on a
+# new crawl can warm-start from them
+def save_scores(location, graph, scores):
+    np.savez(location, node_ids=graph.node_ids, scores=scores,
+             sources=graph.node_ids[graph.edge_sources()], targets=graph.node_ids[graph.out_targets])
+
+
+# Loads the arrays written by save_scores
+def load_scores(location):
+    with np.load(location) as previous:
+        return dict((name, previous[name]) for name in previous.files)
+
+
+# Returns the edges (as .dot ids) which are in only one of the previous run and the graph
+def edge_diff(previous, graph):
+    sources = np.concatenate((previous['sources'], graph.node_ids[graph.edge_sources()]))
+    targets = np.concatenate((previous['targets'], graph.node_ids[graph.out_targets]))
+    base = int(max(sources.max(initial=0), targets.max(initial=0))) + 1
+    keys = sources.astype(np.int64) * base + targets
+    old, new = keys[:len(previous['sources'])], keys[len(previous['sources']):]
+    changed = np.setxor1d(old, new)
+    return changed // base, changed % base
+
+
+# Maps the previous scores onto the nodes of the graph, new nodes start at the uniform score
+def align_scores(previous, graph):
+    n = graph.number_of_nodes()
+    scores = np.full(n, 1.0 / n)
+    position = np.searchsorted(previous['node_ids'], graph.node_ids)
+    position = np.minimum(position, max(len(previous['node_ids']) - 1, 0))
+    known = previous['node_ids'][position] == graph.node_ids if len(previous['node_ids']) else np.zeros(n, dtype=bool)
+    scores[known] = previous['scores'][position[known]]
+    return scores / scores.sum(), known
+
+
+# Recomputes the PageRank of a graph which changed a little since the previous run (see save_scores).
+# The power iteration starts from the previous scores. With local set, only nodes whose inputs
+# changed are recomputed: first the targets and successors of the changed edges and of new nodes,
+# after that the successors of every node which moved more than tol. A change of the uniform
+# (teleport and dangling) share makes one iteration global again.
+def incremental_pagerank(graph, previous, alpha=0.85, tol=1.0e-6, max_iter=100, report=None, local=True):
+    scores, known = align_scores(previous, graph)
+    if not local:
+        return pagerank(graph, alpha=alpha, tol=tol, max_iter=max_iter, report=report, start=scores)
+    n = graph.number_of_nodes()
+    residuals = []
+    if n == 0:
+        return scores, residuals
+    out_degree, in_degree = graph.out_degree(), graph.in_degree()
+    dangling = out_degree == 0
+    inverse = np.divide(1.0, out_degree, out=np.zeros(n), where=~dangling)
+    diff_sources, diff_targets = edge_diff(previous, graph)
+    touched = np.concatenate((diff_sources, diff_targets))
+    touched = np.searchsorted(graph.node_ids, touched[np.isin(touched, graph.node_ids)])
+    seeds = np.union1d(touched, np.flatnonzero(~known))
+    active = np.union1d(seeds, expand(graph.out_offsets, graph.out_targets, seeds))
+    # the uniform share every node received in the previous run
+    previous_dangling = ~np.isin(previous['node_ids'], previous['sources'])
+    uniform = (alpha * previous['scores'][previous_dangling].sum() + 1.0 - alpha) / max(len(previous['node_ids']), 1)
+    for iteration in range(1, max_iter + 1):
+        last_uniform, uniform = uniform, (alpha * scores[dangling].sum() + 1.0 - alpha) / n
+        if abs(uniform - last_uniform) > tol:
+            active = np.arange(n)
+        # in-link sums of the active nodes only
+        members = np.repeat(np.arange(len(active)), in_degree[active])
+        contributions = (scores * inverse)[expand(graph.in_offsets, graph.in_sources, active)]
+        updated = alpha * np.bincount(members, weights=contributions, minlength=len(active)) + uniform
+        delta = np.abs(updated - scores[active])
+        scores[active] = updated
+        residuals.append(delta.sum())
+        if report:
+            report(iteration, residuals[-1])
+        moved = active[delta > tol]
+        if len(moved) == 0:
+            break
+        active = np.unique(expand(graph.out_offsets, graph.out_targets, moved))
+        if len(active) == 0:
+            break
+    return scores / scores.sum(), residuals
+
+
+# the methods of approximate_pagerank
+APPROXIMATIONS = ('monte-carlo', 'push')
+
+
+# Estimates the PageRank with random walks (Monte Carlo, complete path): walks walkers start on every
+# node and every step a walker stops with probability 1 - alpha or follows a random out-link, from a
+# dangling node it jumps to a random node. The share of all visits of a node estimates its PageRank.
+# Returns the estimates and their standard errors, which shrink with 1 / sqrt(walks).
+def monte_carlo_pagerank(graph, alpha=0.85, walks=1, seed=0):
+    n = graph.number_of_nodes()
+    if n == 0:
+        return np.zeros(0), np.zeros(0)
+    rng = np.random.default_rng(seed)
+    out_degree = graph.out_degree()
+    visits = np.zeros(n, dtype=np.int64)
+    positions = np.repeat(np.arange(n, dtype=np.int64), walks)
+    while len(positions):
+        visits += np.bincount(positions, minlength=n)
+        positions = positions[rng.random(len(positions)) < alpha]
+        degree = out_degree[positions]
+        step = rng.integers(0, n, len(positions))
+        linked = degree > 0
+        picks = (rng.random(int(linked.sum())) * degree[linked]).astype(np.int64)
+        step[linked] = graph.out_targets[graph.out_offsets[positions[linked]] + picks]
+        positions = step
+    total = float(visits.sum())
+    # the visits of a node are about Poisson distributed
+    return visits / total, np.sqrt(visits) / total
+
+
+# Approximates the PageRank by forward push: the score still to be handed out (the residual) starts at
+# (1 - alpha) / n on every node, each round the nodes holding at least epsilon / n keep it as score and
+# push alpha times it over their out-links (dangling nodes over all nodes). Returns the scores and a
+# bound on their L1 error: the residual left divided by 1 - alpha.
+def push_pagerank(graph, alpha=0.85, epsilon=1.0e-3, max_iter=100):
+    n = graph.number_of_nodes()
+    if n == 0:
+        return np.zeros(0), 0.0
+    out_degree = graph.out_degree()
+    dangling = out_degree == 0
+    inverse = np.divide(1.0, out_degree, out=np.zeros(n), where=~dangling)
+    scores, residual = np.zeros(n), np.full(n, (1.0 - alpha) / n)
+    sources = None
+    for iteration in range(max_iter):
+        active = np.flatnonzero(residual >= epsilon / n)
+        if len(active) == 0:
+            break
+        push = residual[active]
+        scores[active] += push
+        residual[active] = 0.0
+        if len(active) * 4 > n:
+            # most nodes push, one product over all edges is cheaper than gathering their out-links
+            if sources is None:
+                sources = graph.edge_sources()
+            shares = np.zeros(n)
+            shares[active] = push * inverse[active]
+            residual += alpha * np.bincount(graph.out_targets, weights=shares[sources], minlength=n)
+        else:
+            targets = expand(graph.out_offsets, graph.out_targets, active)
+            residual += alpha * np.bincount(targets, weights=np.repeat(push * inverse[active], out_degree[active]),
+                                            minlength=n)
+        residual += alpha * push[dangling[active]].sum() / n
+    return scores, residual.sum() / (1.0 - alpha)
+
+
+# Approximates the PageRank with one of the APPROXIMATIONS, walks (monte-carlo) and epsilon (push)
+# trade time for accuracy. Returns the scores and the error estimate of every node: the standard
+# error of monte-carlo or the L1 error bound of push.
+def approximate_pagerank(graph, alpha=0.85, method='monte-carlo', walks=1, epsilon=1.0e-3, seed=0):
+    if method == 'monte-carlo':
+        return monte_carlo_pagerank(graph, alpha, walks, seed)
+    if method == 'push':
+        scores, bound = push_pagerank(graph, alpha, epsilon)
+        return scores, np.full(len(scores), bound)
+    raise ValueError('Unknown approximation: ' + str(method) + ', expected one of ' + ', '.join(APPROXIMATIONS))
+
+
+# Compares the top k of approximate scores with those of the exact scores, returns the number of
+# nodes in both top k lists and the largest absolute error on the approximate top k
+def agreement(approximate, exact, k):
+    best = top_k(approximate, k)
+    overlap = len(np.intersect1d(best, top_k(exact, k)))
+    return overlap, float(np.abs(approximate[best] - exact[best]).max(initial=0.0))
@@ -0,0 +1,113 @@
+import os
+from multiprocessing import Pool
+from multiprocessing.shared_memory import SharedMemory
+import numpy as np
+from pagerank import top_k
+
+# most personalization vectors iterated together by one task, bounds the n x columns score matrix
+MAX_COLUMNS = 16
+
+# the graph arrays of a worker, attached to the shared memory of the parent by attach_arrays
+_arrays = {}
+_blocks = []
+
+
+# Builds the arrays the multi-column power iteration needs from a CSRGraph: the in-edges grouped per
+# target, the inverse out-degree (zero for dangling nodes) and the dangling mask
+def iteration_arrays(graph):
+    out_degree = graph.out_degree()
+    dangling = out_degree == 0
+    return {'in_offsets': graph.in_offsets, 'in_sources': graph.in_sources,
+            'inverse': np.divide(1.0, out_degree, out=np.zeros(len(out_degree)), where=~dangling),
+            'dangling': dangling}
+
+
+# Computes personalized PageRank for every column of personalization (an n x c matrix, every column
+# sums to 1) at once. The teleport and the score of dangling nodes go to the personalization of
+# each column, like networkx. The in-link sums of all columns are taken with one reduceat over the
+# in-edges of the nodes with in-links per iteration. Stops once every column changed less than
+# n * tol (L1).
+def personalized_pagerank(arrays, personalization, alpha=0.85, tol=1.0e-6, max_iter=100):
+    in_offsets, in_sources = arrays['in_offsets'], arrays['in_sources']
+    inverse, dangling = arrays['inverse'], arrays['dangling']
+    n = len(inverse)
+    # reduceat only over the nodes with in-links: their starts increase strictly, so every segment
+    # ends where the next one starts and the last one at the end of the in-edges
+    linked = in_offsets[1:] > in_offsets[:-1]
+    starts = in_offsets[:-1][linked]
+    scores = personalization.copy()
+    for iteration in range(max_iter):
+        last = scores
+        scores = np.zeros_like(last)
+        if len(starts):
+            scores[linked] = np.add.reduceat((last * inverse[:, None])[in_sources], starts, axis=0)
+        scores *= alpha
+        scores += (alpha * last[dangling].sum(axis=0) + 1.0 - alpha) * personalization
+        if np.all(np.abs(scores - last).sum(axis=0) < n * tol):
+            break
+    return scores
+
+
+# Turns a set of dense nodes into a personalization column, every seed gets the same weight
+def seed_columns(n, seed_sets):
+    personalization = np.zeros((n, len(seed_sets)))
+    for column, seeds in enumerate(seed_sets):
+        seeds = np.unique(np.asarray(seeds, dtype=np.int64))
+        personalization[seeds, column] = 1.0 / len(seeds)
+    return personalization
+
+
+# Runs one task: the personalized PageRank of a few seed sets, returns the top k of every column
+def rank_seed_sets(seed_sets, k, alpha, tol, max_iter, arrays=None):
+    arrays = _arrays if arrays is None else arrays
+    scores = personalized_pagerank(arrays, seed_columns(len(arrays['inverse']), seed_sets), alpha, tol, max_iter)
+    result = []
+    for column in range(scores.shape[1]):
+        best = top_k(scores[:, column], k)
+        result.append((best, scores[best, column]))
+    return result
+
+
+# Copies the arrays into named shared memory blocks, returns the blocks and a description of them
+def share_arrays(arrays):
+    blocks, layout = [], {}
+    for name, values in arrays.items():
+        values = np.ascontiguousarray(values)
+        block = SharedMemory(create=True, size=max(values.nbytes, 1))
+        np.ndarray(values.shape, dtype=values.dtype, buffer=block.buf)[...] = values
+        blocks.append(block)
+        layout[name] = (block.name, values.shape, values.dtype.str)
+    return blocks, layout
+
+
+# Pool initializer: maps the shared blocks of the parent as numpy arrays without copying them
+def attach_arrays(layout):
+    for name, (block_name, shape, dtype) in layout.items():
+        block = SharedMemory(name=block_name)
+        _blocks.append(block)
+        _arrays[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+
+
+# Computes the personalized PageRank of every seed set (a collection of dense nodes of the CSRGraph)
+# and returns a list parallel to seed_sets with the top k nodes and their scores of each. The seed
+# sets are split into tasks of at most MAX_COLUMNS columns which run on a pool of processes; the
+# graph arrays are placed in shared memory once and mapped by every worker.
+def batch_personalized_pagerank(graph, seed_sets, k, alpha=0.85, tol=1.0e-6, max_iter=100, processes=None):
+    seed_sets = list(seed_sets)
+    if not seed_sets:
+        return []
+    processes = processes or os.cpu_count() or 1
+    arrays = iteration_arrays(graph)
+    columns = max(1, min(MAX_COLUMNS, -(-len(seed_sets) // processes)))
+    tasks = [seed_sets[i:i + columns] for i in range(0, len(seed_sets), columns)]
+    if processes == 1 or len(tasks) == 1:
+        return [top for task in tasks for top in rank_seed_sets(task, k, alpha, tol, max_iter, arrays)]
+    blocks, layout = share_arrays(arrays)
+    try:
+        with Pool(min(processes, len(tasks)), initializer=attach_arrays, initargs=(layout,)) as pool:
+            results = pool.starmap(rank_seed_sets, [(task, k, alpha, tol, max_iter) for task in tasks])
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+    return [top for result in results for top in result]
@@ -0,0 +1,139 @@
+from itertools import combinations
+import numpy as np
+from pagerank import pagerank, top_k
+
+# top-k sizes of the overlap in the correlation report
+TOP_K = (10, 100, 1000)
+
+
+# Computes the HITS hub and authority scores of every node of a CSRGraph by power iteration, both
+# normalized to sum to 1 like networkx. Stops once the L1 change of the authorities drops below n * tol.
+def hits(graph, tol=1.0e-8, max_iter=100):
+    n = graph.number_of_nodes()
+    if n == 0:
+        return np.zeros(0), np.zeros(0)
+    sources, targets = graph.edge_sources(), graph.out_targets
+    hubs = np.full(n, 1.0 / n)
+    authorities = hubs
+    for iteration in range(max_iter):
+        last = authorities
+        authorities = np.bincount(targets, weights=hubs[sources], minlength=n)
+        authorities /= authorities.sum() or 1.0
+        hubs = np.bincount(sources, weights=authorities[targets], minlength=n)
+        hubs /= hubs.sum() or 1.0
+        if np.abs(authorities - last).sum() < n * tol:
+            break
+    return hubs, authorities
+
+
+# Computes every ranking metric of the nodes of a CSRGraph on the same arrays: PageRank, the PageRank
+# of the reversed graph (which ranks nodes linking to many important nodes), HITS hubs and
+# authorities and the in- and out-degree. A PageRank computed before can be passed as scores.
+def metrics(graph, alpha=0.9, tol=1.0e-6, scores=None):
+    hubs, authorities = hits(graph)
+    return {'pagerank': scores if scores is not None else pagerank(graph, alpha=alpha, tol=tol)[0],
+            'reverse_pagerank': pagerank(graph.reverse(), alpha=alpha, tol=tol)[0],
+            'hub': hubs, 'authority': authorities,
+            'in_degree': graph.in_degree().astype(np.float64), 'out_degree': graph.out_degree().astype(np.float64)}
+
+
+# Ranks the values from low to high starting at 1, tied values get the average of their ranks
+def average_ranks(values):
+    order = np.argsort(values, kind='stable')
+    sorted_values = values[order]
+    starts = np.flatnonzero(np.concatenate(([True], sorted_values[1:] != sorted_values[:-1])))
+    ends = np.concatenate((starts[1:], [len(values)]))
+    ranks = np.empty(len(values))
+    ranks[order] = np.repeat((starts + ends + 1) / 2.0, ends - starts)
+    return ranks
+
+
+# Spearman's rank correlation, the Pearson correlation of the average ranks
+def spearman(a, b):
+    a, b = average_ranks(np.asarray(a)), average_ranks(np.asarray(b))
+    a, b = a - a.mean(), b - b.mean()
+    denominator = np.sqrt((a * a).sum() * (b * b).sum())
+    return float((a * b).sum() / denominator) if denominator else float('nan')
+
+
+# Counts the pairs i < j with values[i] > values[j] by a bottom-up merge sort: per level the
+# blocks are merged with one stable sort (of already sorted runs) and every element of a right block
+# passes as many elements of its left block as are bigger than it. Every one of the log n levels
+# sorts all n values again, so O(n log^2 n) in the worst case, though the sort finds the sorted runs.
+def inversions(values):
+    n = len(values)
+    values = np.unique(values, return_inverse=True)[1].astype(np.int64).ravel()
+    index = np.arange(n, dtype=np.int64)
+    total, width = 0, 1
+    while width < n:
+        block = index // (2 * width)
+        order = np.argsort(block * n + values, kind='stable')
+        position = np.empty(n, dtype=np.int64)
+        position[order] = index
+        right = (index // width) % 2 == 1
+        # merged position within the block minus position within the right block = left elements <= it
+        before = position[right] - block[right] * 2 * width - (index[right] - block[right] * 2 * width - width)
+        total += int((width - before).sum())
+        values = values[order]
+        width *= 2
+    return total
+
+
+# Returns the number of pairs within the runs of equal values of a sorted array
+def _tied_pairs(sorted_values):
+    if len(sorted_values) == 0:
+        return 0
+    starts = np.flatnonzero(np.concatenate(([True], sorted_values[1:] != sorted_values[:-1])))
+    sizes = np.diff(np.concatenate((starts, [len(sorted_values)])))
+    return int((sizes * (sizes - 1) // 2).sum())
+
+
+# Kendall's tau-b after Knight's algorithm: sort on a (then b), count the ties and the discordant
+# pairs as the inversions of b. O(n log^2 n) as the inversions are, instead of O(n^2) pairs
+def kendall_tau(a, b):
+    a, b = np.asarray(a), np.asarray(b)
+    n = len(a)
+    order = np.lexsort((b, a))
+    a, b = a[order], b[order]
+    pairs = n * (n - 1) // 2
+    ties_a = _tied_pairs(a)
+    joint = np.concatenate(([True], (a[1:] != a[:-1]) | (b[1:] != b[:-1]))) if n else np.zeros(0, dtype=bool)
+    starts = np.flatnonzero(joint)
+    sizes = np.diff(np.concatenate((starts, [n])))
+    ties_both = int((sizes * (sizes - 1) // 2).sum())
+    ties_b = _tied_pairs(np.sort(b))
+    discordant = inversions(b)
+    denominator = np.sqrt(float(pairs - ties_a) * float(pairs - ties_b))
+    if not denominator:
+        return float('nan')
+    return float(pairs - ties_a - ties_b + ties_both - 2 * discordant) / denominator
+
+
+# The fraction of the k highest nodes of a which are among the k highest nodes of b
+def top_k_overlap(a, b, k):
+    k = min(k, len(a))
+    if k == 0:
+        return float('nan')
+    return len(np.intersect1d(top_k(np.asarray(a), k), top_k(np.asarray(b), k))) / float(k)
+
+
+# Compares every pair of metrics over all nodes, returns a list of dicts with the Kendall tau,
+# Spearman correlation and the top-k overlaps
+def correlations(metrics, k=TOP_K):
+    report = []
+    for first, second in combinations(sorted(metrics), 2):
+        a, b = metrics[first], metrics[second]
+        row = {'first': first, 'second': second, 'kendall_tau': kendall_tau(a, b), 'spearman': spearman(a, b)}
+        for size in k:
+            row['top_' + str(size)] = top_k_overlap(a, b, size)
+        report.append(row)
+    return report
+
+
+# Writes the correlation report as a csv file in the style of the results
+def write_correlations(location, report, k=TOP_K):
+    columns = ['first', 'second', 'kendall_tau', 'spearman'] + ['top_' + str(size) for size in k]
+    with open(location, 'w') as out_file:
+        out_file.write(';'.join(columns) + '\n')
+        for row in report:
+            out_file.write(';'.join(str(row[column]) for column in columns) + '\n')
@@ -0,0 +1,98 @@
+import numpy as np
+from csrgraph import CSRGraph, expand, reach
+
+
+class ReachabilityOracle():
+    '''
+    Answers (source, target) reachability queries on an unweighted graph. Single queries run a
+    level-synchronous bidirectional breadth first search; the visited marks of both directions are
+    shared by all queries and reset by bumping a generation stamp instead of clearing them.
+    Answers are memoized per (source, target) pair, or per pair of strongly connected components if
+    the component of every node is given, which makes nodes of the same component interchangeable.
+    '''
+
+    # a source with at least this many targets in one batch gets a single full forward search
+    batch_search = 8
+
+    def __init__(self, graph, labels=None):
+        '''
+        :param graph: a CSRGraph or a networkx graph, the latter is copied into arrays once
+        :param labels: optional component label of every (dense) node, used as memo key
+        '''
+        self.source_graph = graph
+        if isinstance(graph, CSRGraph):
+            self.graph, self.index = graph, None
+        else:
+            self.graph, self.index = CSRGraph.from_networkx(graph)
+        n = self.graph.number_of_nodes()
+        self.labels = labels
+        self.memo = {}
+        # number of queries asked and of searches needed to answer them
+        self.queries = 0
+        self.searches = 0
+        self._seen = [np.zeros(n, dtype=np.int32), np.zeros(n, dtype=np.int32)]
+        self._stamp = 0
+
+    def dense(self, node):
+        return node if self.index is None else self.index[node]
+
+    def can_reach(self, source, target):
+        '''
+        Returns whether there is a path from @param source to @param target
+        :param source:
+        :param target:
+        :return True or False:
+        '''
+        self.queries += 1
+        return self._query(self.dense(source), self.dense(target))
+
+    def can_reach_batch(self, pairs):
+        '''
+        Answers many queries at once. Queries are grouped on source (component), a source with many
+        targets is answered by one forward search, the rest by the memoized bidirectional search.
+        :param pairs: iterable of (source, target) tuples
+        :return a list of booleans parallel to @param pairs:
+        '''
+        pairs = [(self.dense(source), self.dense(target)) for source, target in pairs]
+        self.queries += len(pairs)
+        groups = {}
+        for source, target in pairs:
+            groups.setdefault(self._key(source), (source, []))[1].append(target)
+        for source, targets in groups.values():
+            if len(targets) >= self.batch_search:
+                self.searches += 1
+                reached = reach(self.graph, [source])
+                for target in targets:
+                    self.memo[(self._key(source), self._key(target))] = bool(reached[target])
+        return [self._query(source, target) for source, target in pairs]
+
+    def _key(self, node):
+        return node if self.labels is None else self.labels[node]
+
+    def _query(self, source, target):
+        if source == target:
+            return True
+        key = (self._key(source), self._key(target))
+        if self.labels is not None and key[0] == key[1]:
+            return True
+        if key not in self.memo:
+            self.memo[key] = self._bidirectional(source, target)
+        return self.memo[key]
+
+    def _bidirectional(self, source, target):
+        self.searches += 1
+        self._stamp += 1
+        stamp, seen = self._stamp, self._seen
+        sides = [(self.graph.out_offsets, self.graph.out_targets), (self.graph.in_offsets, self.graph.in_sources)]
+        frontiers = [np.array([source]), np.array([target])]
+        seen[0][source], seen[1][target] = stamp, stamp
+        while len(frontiers[0]) and len(frontiers[1]):
+            # grow the smaller side, the searches meet once a node is marked by both
+            side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+            found = expand(sides[side][0], sides[side][1], frontiers[side])
+            if np.any(seen[1 - side][found] == stamp):
+                return True
+            found = np.unique(found[seen[side][found] != stamp])
+            seen[side][found] = stamp
+            frontiers[side] = found
+        return False
@@ -0,0 +1,125 @@
+from collections import deque
+import numpy as np
+
+
+class Budget():
+    '''
+    Tracks the nodes picked by a sampling strategy together with the number of edges they induce,
+    so checking whether the node or edge budget is reached costs O(1) per step.
+    '''
+
+    def __init__(self, graph, max_nodes=None, max_edges=None):
+        self.max_nodes = max_nodes
+        self.max_edges = max_edges
+        self.selected = bytearray(graph.number_of_nodes())
+        self.nodes = []
+        self.edges = 0
+        if max_edges:
+            self.out_offsets, self.out_targets = graph.out_offsets.tolist(), graph.out_targets.tolist()
+            self.in_offsets, self.in_sources = graph.in_offsets.tolist(), graph.in_sources.tolist()
+
+    def add(self, node):
+        self.selected[node] = 1
+        self.nodes.append(node)
+        if self.max_edges:
+            # the new induced edges are the links between node and the nodes picked so far
+            selected = self.selected
+            self.edges += sum(selected[succ] for succ in self.out_targets[self.out_offsets[node]:self.out_offsets[node + 1]])
+            self.edges += sum(selected[pred] for pred in self.in_sources[self.in_offsets[node]:self.in_offsets[node + 1]]
+                              if pred != node)
+
+    def full(self):
+        return bool((self.max_nodes and len(self.nodes) >= self.max_nodes)
+                    or (self.max_edges and self.edges >= self.max_edges))
+
+
+# Samples by breadth first search over the successors from a random start node (or start), a new
+# random start is taken whenever the search runs dry before the budget is reached
+def bfs_sample(graph, max_nodes=None, max_edges=None, seed=0, start=None):
+    rng = np.random.default_rng(seed)
+    budget = Budget(graph, max_nodes, max_edges)
+    offsets, targets = graph.out_offsets.tolist(), graph.out_targets.tolist()
+    starts = rng.permutation(graph.number_of_nodes()).tolist()
+    if start is not None:
+        starts.insert(0, start)
+    for root in starts:
+        if budget.full():
+            break
+        if budget.selected[root]:
+            continue
+        budget.add(root)
+        queue = deque([root])
+        while queue and not budget.full():
+            node = queue.popleft()
+            for succ in targets[offsets[node]:offsets[node + 1]]:
+                if not budget.selected[succ]:
+                    budget.add(succ)
+                    queue.append(succ)
+                    if budget.full():
+                        break
+    return graph.subgraph(budget.nodes)
+
+
+# Samples with forest fire: from a random start node every burning node sets fire to a geometric
+# number (mean forward / (1 - forward)) of its unburnt successors
+def forest_fire_sample(graph, max_nodes=None, max_edges=None, seed=0, forward=0.7):
+    rng = np.random.default_rng(seed)
+    budget = Budget(graph, max_nodes, max_edges)
+    offsets, targets = graph.out_offsets.tolist(), graph.out_targets.tolist()
+    for root in rng.permutation(graph.number_of_nodes()).tolist():
+        if budget.full():
+            break
+        if budget.selected[root]:
+            continue
+        budget.add(root)
+        queue = deque([root])
+        while queue and not budget.full():
+            node = queue.popleft()
+            links = [succ for succ in targets[offsets[node]:offsets[node + 1]] if not budget.selected[succ]]
+            burn = min(len(links), rng.geometric(1.0 - forward) - 1)
+            for succ in (rng.choice(links, burn, replace=False).tolist() if burn else []):
+                budget.add(succ)
+                queue.append(succ)
+                if budget.full():
+                    break
+    return graph.subgraph(budget.nodes)
+
+
+# Samples uniformly random nodes and keeps the subgraph they induce
+def random_node_sample(graph, max_nodes=None, max_edges=None, seed=0):
+    rng = np.random.default_rng(seed)
+    order = rng.permutation(graph.number_of_nodes())
+    if not max_edges:
+        return graph.subgraph(order[:max_nodes])
+    budget = Budget(graph, max_nodes, max_edges)
+    for node in order.tolist():
+        if budget.full():
+            break
+        budget.add(node)
+    return graph.subgraph(budget.nodes)
+
+
+# Samples uniformly random edges and keeps them with their end points, stopping at the edge where
+# the node budget is reached
+def random_edge_sample(graph, max_nodes=None, max_edges=None, seed=0):
+    rng = np.random.default_rng(seed)
+    edges = rng.permutation(graph.number_of_edges())[:max_edges]
+    if max_nodes:
+        # end points in the order the edges are taken, find where the max_nodes-th node appears
+        sequence = np.empty(2 * len(edges), dtype=np.int64)
+        sequence[0::2], sequence[1::2] = graph.edge_sources()[edges], graph.out_targets[edges]
+        first = np.sort(np.unique(sequence, return_index=True)[1])
+        if len(first) > max_nodes:
+            edges = edges[:first[max_nodes] // 2]
+    return graph.edge_subgraph(edges)
+
+
+STRATEGIES = {'bfs': bfs_sample, 'forest-fire': forest_fire_sample,
+              'random-node': random_node_sample, 'random-edge': random_edge_sample}
+
+
+# Samples a subgraph of a CSRGraph with one of the STRATEGIES, the same seed gives the same sample
+def sample(graph, strategy, max_nodes=None, max_edges=None, seed=0):
+    if strategy not in STRATEGIES:
+        raise ValueError("Unknown sampling strategy: " + str(strategy))
+    return STRATEGIES[strategy](graph, max_nodes=max_nodes, max_edges=max_edges, seed=seed)
@@ -0,0 +1,30 @@
+import networkx as nx
+import numpy as np
+from csrgraph import CSRGraph
+
+
+# Writes the edges between the nodes 0..n-1 as a .dot file in the format of the crawl, every node
+# with a url and one edge line per node
+def write_dot(location, edges, n):
+    targets = dict((node, []) for node in range(n))
+    for source, target in edges:
+        targets[source].append(target)
+    with open(location, 'w') as out_file:
+        out_file.write('digraph G {\n')
+        for node in range(n):
+            out_file.write(str(node) + ' [url="http://www.utwente.nl/' + str(node) + '.html"];\n')
+        for node in range(n):
+            out_file.write(' ' + str(node) + ' -> {' + ' '.join(map(str, targets[node])) + '};\n')
+        out_file.write('}\n')
+
+
+# A random graph of m edge draws between n nodes, as a CSRGraph and as a networkx graph with the same
+# (dense) nodes. Only the first sources nodes get out-links and only the first targets in-links, so
+# the graph has dangling nodes and nodes nobody links to.
+def random_graph(seed, n, m, sources=None, targets=None):
+    rng = np.random.default_rng(seed)
+    graph = CSRGraph.from_dense_edges(rng.integers(0, sources or n, m), rng.integers(0, targets or n, m), n)
+    reference = nx.DiGraph()
+    reference.add_nodes_from(range(n))
+    reference.add_edges_from(zip(graph.edge_sources().tolist(), graph.out_targets.tolist()))
+    return graph, reference
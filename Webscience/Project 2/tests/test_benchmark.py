@@ -0,0 +1,48 @@
+import pytest
+import benchmark
+import edgestore
+import tools
+
+STAGES = ['parse', 'degree', 'load', 'pagerank', 'scc', 'bow-tie', 'write']
+
+
+@pytest.mark.parametrize('engine', benchmark.ENGINES)
+def test_run_engine_records_every_stage(tmp_path, engine):
+    location = str(tmp_path / 'graph.dot')
+    benchmark.generate_dot(location, 300, seed=2)
+    run = benchmark.run_engine(location, engine)
+    data = tools.parse_dot_arrays(location)
+    assert run['edges'] == len(set(zip(data['sources'].tolist(), data['targets'].tolist())))
+    assert run['nodes'] == len(set(data['sources'].tolist()) | set(data['targets'].tolist()))
+    assert [stage['stage'] for stage in run['stages']] == STAGES
+    peaks = [stage['cumulative_peak_rss_mb'] for stage in run['stages']]
+    for stage in run['stages']:
+        assert stage['seconds'] >= 0
+        assert stage['peak_rss_growth_mb'] is None or stage['peak_rss_growth_mb'] >= 0
+    assert None in peaks or peaks == sorted(peaks)
+    assert (tmp_path / (engine + '_result.csv')).exists()
+
+
+def test_disk_engine_builds_a_fresh_store_every_run(tmp_path, monkeypatch):
+    location = str(tmp_path / 'graph.dot')
+    benchmark.generate_dot(location, 200, seed=3)
+    builds = []
+    build_store = edgestore.build_store
+
+    def counting_build_store(*args, **kwargs):
+        builds.append(args)
+        return build_store(*args, **kwargs)
+
+    monkeypatch.setattr(edgestore, 'build_store', counting_build_store)
+    first = benchmark.run_engine(location, 'disk')
+    second = benchmark.run_engine(location, 'disk')
+    assert len(builds) == 2
+    assert (first['nodes'], first['edges']) == (second['nodes'], second['edges'])
+
+
+def test_regressions():
+    baseline = {'runs': [{'engine': 'csr', 'scale': 10, 'stages': [{'stage': 'parse', 'seconds': 1.0},
+                                                                    {'stage': 'scc', 'seconds': 1.0}]}]}
+    report = {'runs': [{'engine': 'csr', 'scale': 10, 'stages': [{'stage': 'parse', 'seconds': 1.2},
+                                                                  {'stage': 'scc', 'seconds': 1.5}]}]}
+    assert benchmark.regressions(report, baseline) == [('csr', 10, 'scc', 1.0, 1.5)]
@@ -0,0 +1,80 @@
+import os
+import numpy as np
+from analyzer import Analyzer
+from benchmark import generate_dot
+from checkpoint import Checkpoints
+
+RESUMED_STAGES = ('Calculating PageRank of all nodes', 'Calculating the strongly connected components',
+                  'Calculating the bow-tie structure of the graph')
+
+
+def counting(calls, value):
+    def function():
+        calls.append(value)
+        return {'values': np.arange(value)}
+    return function
+
+
+def test_compute_resumes_from_the_checkpoint(tmp_path):
+    checkpoints, calls = Checkpoints(str(tmp_path / 'ck')), []
+    key = Checkpoints.key('sha1', 'csr', None)
+    arrays, resumed = checkpoints.compute('pagerank', key, counting(calls, 3))
+    assert not resumed and arrays['values'].tolist() == [0, 1, 2]
+    arrays, resumed = checkpoints.compute('pagerank', key, counting(calls, 5))
+    assert resumed and arrays['values'].tolist() == [0, 1, 2]
+    assert calls == [3]
+    # no temporary file is left behind
+    assert os.listdir(str(tmp_path / 'ck')) == [os.path.basename(checkpoints.path('pagerank', key))]
+
+
+def test_fresh_run_computes_again(tmp_path):
+    calls = []
+    key = Checkpoints.key('sha1')
+    Checkpoints(str(tmp_path / 'ck')).compute('scc', key, counting(calls, 3))
+    arrays, resumed = Checkpoints(str(tmp_path / 'ck'), resume=False).compute('scc', key, counting(calls, 4))
+    assert not resumed and calls == [3, 4]
+    # the fresh result replaces the checkpoint
+    assert Checkpoints(str(tmp_path / 'ck')).load('scc', key)['values'].tolist() == [0, 1, 2, 3]
+
+
+def test_changed_key_computes_again(tmp_path):
+    checkpoints, calls = Checkpoints(str(tmp_path / 'ck')), []
+    assert Checkpoints.key('sha1', 'csr', None) == Checkpoints.key('sha1', 'csr', None)
+    upstream = Checkpoints.key('sha1', 'csr', None)
+    checkpoints.compute('bow-tie', Checkpoints.key(upstream, 'bow-tie'), counting(calls, 1))
+    for key in (Checkpoints.key('other', 'csr', None), Checkpoints.key('sha1', 'csr', 100),
+                Checkpoints.key(Checkpoints.key('sha1', 'disk', None), 'bow-tie')):
+        assert checkpoints.load('bow-tie', key) is None
+    checkpoints.compute('bow-tie', Checkpoints.key(upstream, 'bow-tie', 2), counting(calls, 2))
+    assert calls == [1, 2]
+    checkpoints.remove('bow-tie')
+    assert checkpoints.load('bow-tie', Checkpoints.key(upstream, 'bow-tie')) is None
+
+
+def test_resumed_run_skips_the_finished_stages(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    generate_dot('graph.dot', 300, seed=5)
+    checkpoints = str(tmp_path / 'ck')
+    Analyzer().run('graph.dot', 'first.csv', None, False, engine='csr', checkpoints=checkpoints)
+
+    def fail(*args, **kwargs):
+        raise AssertionError('a finished stage ran again')
+    for name in ('pagerank_scores', 'yield_scc', 'generate_bow_tie_kinds'):
+        monkeypatch.setattr(Analyzer, name, fail)
+    record = Analyzer().run('graph.dot', 'second.csv', None, False, engine='csr', checkpoints=checkpoints)
+    counters = dict((stage['stage'], stage['counters']) for stage in record['stages'])
+    for name in RESUMED_STAGES:
+        assert counters[name]['checkpoints'] == 1
+    with open('first.csv') as first, open('second.csv') as second:
+        assert first.read() == second.read()
+
+
+def test_changed_source_invalidates_the_stages(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    generate_dot('graph.dot', 300, seed=6)
+    checkpoints = str(tmp_path / 'ck')
+    Analyzer().run('graph.dot', 'first.csv', None, False, engine='csr', checkpoints=checkpoints)
+    generate_dot('graph.dot', 300, seed=7)
+    record = Analyzer().run('graph.dot', 'second.csv', None, False, engine='csr', checkpoints=checkpoints)
+    for stage in record['stages']:
+        assert 'checkpoints' not in stage['counters']
@@ -0,0 +1,85 @@
+import networkx as nx
+import numpy as np
+import bowtie
+from csrgraph import CSRGraph, component_labels, reach
+from graphs import random_graph
+
+
+def partition(components):
+    return sorted(sorted(component) for component in components)
+
+
+def test_csr_graph_matches_networkx():
+    graph, reference = random_graph(1, 100, 400, sources=80)
+    assert graph.number_of_nodes() == reference.number_of_nodes()
+    assert graph.number_of_edges() == reference.number_of_edges()
+    for node in range(100):
+        assert graph.successors(node).tolist() == sorted(reference.successors(node))
+        assert sorted(graph.predecessors(node).tolist()) == sorted(reference.predecessors(node))
+    assert graph.out_degree().tolist() == [reference.out_degree(node) for node in range(100)]
+    assert graph.in_degree().tolist() == [reference.in_degree(node) for node in range(100)]
+    # the nodes of a copied networkx graph keep their ids
+    copy, index = CSRGraph.from_networkx(nx.relabel_nodes(reference, dict((node, node * 10) for node in range(100))))
+    assert copy.node_ids.tolist() == [node * 10 for node in reference.nodes()]
+    assert set(copy.labels(np.arange(5))) == set(str(node * 10) for node in list(reference.nodes())[:5])
+    nodes = list(range(0, 100, 3))
+    subgraph = graph.subgraph(nodes)
+    assert subgraph.node_ids.tolist() == nodes
+    edges = zip(subgraph.node_ids[subgraph.edge_sources()].tolist(), subgraph.node_ids[subgraph.out_targets].tolist())
+    assert set(edges) == set(reference.subgraph(nodes).edges())
+
+
+def test_components_match_networkx():
+    for seed in range(5):
+        graph, reference = random_graph(seed, 300, 450)
+        components = component_labels(graph)
+        assert partition(components.members(label).tolist() for label in range(len(components))) == \
+            partition(nx.strongly_connected_components(reference))
+        assert components.sizes[components.giant()] == max(map(len, nx.strongly_connected_components(reference)))
+
+
+def test_components_of_a_deep_path():
+    # a cycle far deeper than the recursion limit
+    n = 50000
+    graph = CSRGraph.from_dense_edges(np.arange(n), (np.arange(n) + 1) % n, n + 1)
+    components = component_labels(graph)
+    assert len(components) == 2 and components.sizes[components.giant()] == n
+
+
+def test_reach_matches_networkx():
+    graph, reference = random_graph(6, 200, 300)
+    seeds = [3, 17]
+    blocked = np.zeros(200, dtype=bool)
+    blocked[[5, 40, 41]] = True
+    forward = set(seeds).union(*(nx.descendants(reference, seed) for seed in seeds))
+    assert set(np.flatnonzero(reach(graph, seeds)).tolist()) == forward
+    backward = set(seeds).union(*(nx.ancestors(reference, seed) for seed in seeds))
+    assert set(np.flatnonzero(reach(graph, seeds, reverse=True)).tolist()) == backward
+    unblocked = reference.subgraph(node for node in range(200) if not blocked[node] or node in seeds)
+    expected = set(seeds).union(*(nx.descendants(unblocked, seed) for seed in seeds)) - {5, 40, 41}
+    assert set(np.flatnonzero(reach(graph, seeds, blocked=blocked)).tolist()) == expected
+
+
+def test_bow_tie_matches_its_definition():
+    for seed in range(5):
+        graph, reference = random_graph(10 + seed, 300, 420)
+        components = component_labels(graph)
+        nodes, kinds = bowtie.classify(graph, components, components.giant())
+        core = max(nx.strongly_connected_components(reference), key=len)
+        in_set = set().union(*(nx.ancestors(reference, node) for node in core)) - core
+        out_set = set().union(*(nx.descendants(reference, node) for node in core)) - core
+        rest = reference.subgraph(set(range(300)) - core)
+        from_in = set().union(*(nx.descendants(rest.subgraph(set(rest) - out_set), node) for node in in_set))
+        to_out = set().union(*(nx.ancestors(rest.subgraph(set(rest) - in_set), node) for node in out_set))
+        expected = dict((node, bowtie.DISCONNECTED) for node in range(300))
+        expected.update((node, bowtie.TENDRIL) for node in (from_in | to_out) - in_set - out_set)
+        expected.update((node, bowtie.TUBE) for node in (from_in & to_out) - in_set - out_set)
+        expected.update((node, bowtie.IN) for node in in_set)
+        expected.update((node, bowtie.OUT) for node in out_set)
+        expected.update((node, bowtie.GSCC) for node in core)
+        assert dict(zip(np.asarray(nodes).tolist(), kinds.tolist())) == expected
+        # the networkx engine gives the same sets
+        sets = list(nx.strongly_connected_components(reference))
+        giant = max(range(len(sets)), key=lambda label: len(sets[label]))
+        nodes, kinds = bowtie.classify(reference, sets, giant)
+        assert dict(zip(nodes, kinds.tolist())) == expected
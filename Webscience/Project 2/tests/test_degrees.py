@@ -0,0 +1,56 @@
+import collections
+import numpy as np
+from degrees import DegreeStats
+from graphs import random_graph
+
+
+def expected_distribution(degrees):
+    counts = collections.Counter(degrees)
+    return sorted(counts), [counts[degree] for degree in sorted(counts)]
+
+
+def expected_rank(degrees):
+    order = sorted(range(len(degrees)), key=lambda node: (-degrees[node], node))
+    ranks = [0] * len(degrees)
+    for position, node in enumerate(order):
+        ranks[node] = position + 1
+    return ranks
+
+
+def test_degrees_match_networkx():
+    graph, reference = random_graph(1, 200, 700, sources=150, targets=170)
+    for stats in (DegreeStats.from_graph(graph),
+                  DegreeStats.from_edges(graph.node_ids[graph.edge_sources()], graph.node_ids[graph.out_targets])):
+        # from_edges only knows the nodes which have an edge
+        nodes = stats.node_ids.tolist()
+        in_degree = [reference.in_degree(node) for node in nodes]
+        out_degree = [reference.out_degree(node) for node in nodes]
+        assert stats.in_degree.tolist() == in_degree
+        assert stats.out_degree.tolist() == out_degree
+        assert [values.tolist() for values in stats.in_distribution()] == list(expected_distribution(in_degree))
+        assert [values.tolist() for values in stats.out_distribution()] == list(expected_distribution(out_degree))
+        assert stats.in_rank().tolist() == expected_rank(in_degree)
+        assert stats.out_rank().tolist() == expected_rank(out_degree)
+
+
+def test_duplicate_edges_count_double():
+    stats = DegreeStats.from_edges(np.array([10, 10, 20, 30]), np.array([20, 20, 30, 10]))
+    assert stats.node_ids.tolist() == [10, 20, 30]
+    assert stats.in_degree.tolist() == [1, 2, 1]
+    assert stats.out_degree.tolist() == [2, 1, 1]
+    assert stats.in_rank().tolist() == [2, 1, 3]
+
+
+def test_index_of_dot_ids():
+    graph, reference = random_graph(2, 100, 150, sources=60, targets=70)
+    stats = DegreeStats.from_edges(graph.node_ids[graph.edge_sources()] * 7, graph.node_ids[graph.out_targets] * 7)
+    for node in reference.nodes():
+        position = stats.index(node * 7)
+        if reference.degree(node):
+            assert stats.node_ids[position] == node * 7
+            assert stats.in_degree[position] == reference.in_degree(node)
+            assert stats.out_degree[position] == reference.out_degree(node)
+        else:
+            assert position == -1
+    # ids between, below and above the known ones
+    assert stats.index(8) == -1 and stats.index(-1) == -1 and stats.index(7 * 100) == -1
@@ -0,0 +1,87 @@
+import networkx as nx
+import numpy as np
+import bowtie
+import edgestore
+from analyzer import Analyzer
+from benchmark import generate_dot
+from csrgraph import CSRGraph, component_labels
+from graphs import write_dot
+
+
+def open_store(tmp_path, edges, n, budget=1 << 10):
+    tmp_path.mkdir(parents=True, exist_ok=True)
+    write_dot(str(tmp_path / 'graph.dot'), edges, n)
+    return edgestore.open_store(str(tmp_path / 'store'), str(tmp_path / 'graph.dot'), budget)
+
+
+def largest_component(store, edges):
+    graph = nx.DiGraph(list(edges))
+    graph.add_nodes_from(range(store.number_of_nodes()))
+    return max(nx.strongly_connected_components(graph), key=len)
+
+
+def test_giant_component_is_not_fooled_by_a_hub(tmp_path):
+    # node 0 has the most in- times out-links but is a component of its own, the cycle 61..100 is larger
+    edges = [(leaf, 0) for leaf in range(1, 31)] + [(0, leaf) for leaf in range(31, 61)]
+    edges += [(node, node + 1) for node in range(61, 100)] + [(100, 61)]
+    store = open_store(tmp_path, edges, 101)
+    gscc, proven = edgestore.giant_component(store)
+    assert proven
+    assert set(store.node_ids[gscc].tolist()) == set(range(61, 101))
+
+
+def test_giant_component_matches_networkx(tmp_path):
+    rng = np.random.default_rng(5)
+    for attempt in range(5):
+        n = 300
+        edges = set(zip(rng.integers(0, n, 400).tolist(), rng.integers(0, n, 400).tolist()))
+        store = open_store(tmp_path / str(attempt), edges, n)
+        gscc, proven = edgestore.giant_component(store)
+        assert proven
+        assert len(gscc) == len(largest_component(store, [(source, target) for source, target in edges]))
+
+
+def test_giant_component_reports_an_unproven_result(tmp_path):
+    # two cycles of four nodes and one of three with a more linked node, one seed cannot settle it
+    edges = [(0, 1), (1, 2), (2, 0), (0, 2), (2, 1), (1, 0)]
+    edges += [(node, node + 1) for node in range(3, 6)] + [(6, 3)]
+    edges += [(node, node + 1) for node in range(7, 10)] + [(10, 7)]
+    store = open_store(tmp_path, edges, 11)
+    assert not edgestore.giant_component(store, max_seeds=1)[1]
+    gscc, proven = edgestore.giant_component(store)
+    assert proven and len(gscc) == 4
+
+
+def test_streaming_matches_the_csr_engine(tmp_path):
+    rng = np.random.default_rng(6)
+    n = 500
+    edges = set(zip(rng.integers(0, n, 2000).tolist(), rng.integers(0, n, 2000).tolist()))
+    store = open_store(tmp_path, edges, n, budget=1 << 9)
+    graph = CSRGraph.from_edges([source for source, target in edges], [target for source, target in edges])
+    assert np.array_equal(graph.node_ids, store.node_ids)
+    reference = nx.pagerank(nx.DiGraph(list(edges)), alpha=0.85, tol=1.0e-10)
+    scores = edgestore.stream_pagerank(store, tol=1.0e-12, max_iter=1000)[0]
+    assert np.allclose(scores, [reference[node] for node in store.node_ids.tolist()], atol=1.0e-8)
+    components = component_labels(graph)
+    gscc = edgestore.giant_component(store)[0]
+    assert np.array_equal(gscc, components.members(components.giant()))
+    nodes, kinds = bowtie.classify(graph, components, components.giant())
+    assert np.array_equal(edgestore.bow_tie(store, gscc), kinds)
+
+
+def test_disk_bow_tie_checkpoint_depends_on_the_seeds(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    generate_dot('graph.dot', 300, seed=8)
+
+    def resumed():
+        record = Analyzer().run('graph.dot', 'result.csv', None, False, engine='disk',
+                                checkpoints=str(tmp_path / 'ck'))
+        counters = dict((stage['stage'], stage['counters']) for stage in record['stages'])
+        return [counters[name].get('checkpoints', 0) for name in
+                ('Calculating the huge strongly connected component', 'Calculating the bow-tie structure of the graph')]
+    assert resumed() == [0, 0]
+    assert resumed() == [1, 1]
+    # another number of seeds may find another gscc, so the bow-tie built on it is classified again
+    monkeypatch.setattr(edgestore, 'MAX_SEEDS', edgestore.MAX_SEEDS // 2)
+    assert resumed() == [0, 0]
+    assert resumed() == [1, 1]
@@ -0,0 +1,95 @@
+import os
+import numpy as np
+import edgestore
+import graphcache
+from graphcache import GraphCache, content_hash
+from graphs import write_dot
+
+
+def arrays():
+    return {'sources': np.array([0, 1, 2]), 'targets': np.array([1, 2, 0])}
+
+
+def touch(location, seconds):
+    stat = os.stat(location)
+    os.utime(location, ns=(stat.st_atime_ns, stat.st_mtime_ns + seconds * 10 ** 9))
+
+
+def count_hashes(monkeypatch):
+    hashes = []
+
+    def counting_hash(location):
+        hashes.append(location)
+        return content_hash(location)
+    monkeypatch.setattr(graphcache, 'content_hash', counting_hash)
+    return hashes
+
+
+def test_unchanged_source_is_a_hit(tmp_path, monkeypatch):
+    source = str(tmp_path / 'graph.dot')
+    write_dot(source, [(0, 1), (1, 2)], 3)
+    cache = GraphCache(str(tmp_path / 'cache'))
+    assert cache.load(source) is None
+    cache.store(source, arrays())
+    hashes = count_hashes(monkeypatch)
+    loaded = cache.load(source)
+    assert sorted(loaded) == ['sources', 'targets']
+    assert all(np.array_equal(loaded[name], values) for name, values in arrays().items())
+    # the size and modification time match, so the content is not hashed again
+    assert hashes == []
+
+
+def test_changed_size_or_content_is_a_miss(tmp_path):
+    source = str(tmp_path / 'graph.dot')
+    write_dot(source, [(0, 1), (1, 2)], 3)
+    cache = GraphCache(str(tmp_path / 'cache'))
+    cache.store(source, arrays())
+    write_dot(source, [(0, 1), (1, 2), (2, 0)], 3)
+    assert cache.load(source) is None
+    # the same size with other content and a new modification time
+    cache.store(source, arrays())
+    with open(source, 'r') as in_file:
+        content = in_file.read()
+    with open(source, 'w') as out_file:
+        out_file.write(content.replace('{2}', '{0}'))
+    touch(source, 5)
+    assert os.path.getsize(source) == cache.read_meta()['size']
+    assert cache.load(source) is None
+    # a store interrupted before its meta file is written stays invalid
+    cache.clear()
+    assert cache.load(source) is None
+
+
+def test_touched_source_refreshes_the_meta(tmp_path, monkeypatch):
+    source = str(tmp_path / 'graph.dot')
+    write_dot(source, [(0, 1), (1, 2)], 3)
+    cache = GraphCache(str(tmp_path / 'cache'))
+    cache.store(source, arrays())
+    touch(source, 5)
+    hashes = count_hashes(monkeypatch)
+    assert cache.load(source) is not None
+    assert len(hashes) == 1
+    assert cache.read_meta()['mtime'] == os.stat(source).st_mtime_ns
+    # the new modification time was remembered, the next check does not hash
+    assert cache.load(source) is not None
+    assert len(hashes) == 1
+
+
+def test_touched_source_does_not_rebuild_the_store(tmp_path, monkeypatch):
+    source = str(tmp_path / 'graph.dot')
+    write_dot(source, [(0, 1), (1, 2), (2, 0)], 3)
+    directory = str(tmp_path / 'store')
+    builds = []
+    build_store = edgestore.build_store
+
+    def counting_build(*args):
+        builds.append(args)
+        return build_store(*args)
+    monkeypatch.setattr(edgestore, 'build_store', counting_build)
+    assert edgestore.open_store(directory, source).number_of_edges() == 3
+    touch(source, 5)
+    assert edgestore.open_store(directory, source).number_of_edges() == 3
+    assert len(builds) == 1
+    write_dot(source, [(0, 1), (1, 2), (2, 0), (0, 2)], 3)
+    assert edgestore.open_store(directory, source).number_of_edges() == 4
+    assert len(builds) == 2
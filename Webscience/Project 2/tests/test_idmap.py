@@ -0,0 +1,17 @@
+import numpy as np
+from idmap import IdMap
+
+
+def url_arrays(pairs):
+    data = [url.encode('utf-8') for node_id, url in pairs]
+    return (np.array([node_id for node_id, url in pairs]), np.concatenate(([0], np.cumsum([len(url) for url in data]))),
+            np.frombuffer(b''.join(data), dtype=np.uint8))
+
+
+def test_urls_of_nodes():
+    url_ids, url_offsets, url_data = url_arrays([(7, 'http://a/é'), (3, 'http://b'), (7, 'http://a/last'), (9, 'x')])
+    ids = IdMap.from_arrays(np.array([3, 5, 7]), url_ids, url_offsets, url_data)
+    assert ids.urls([2, 0, 1]) == ['http://a/last', 'http://b', '']
+    assert ids.urls(np.zeros(0, dtype=np.int64)) == []
+    assert ids.url(2) == 'http://a/last'
+    assert ids.index([5, 9, 3]).tolist() == [1, -1, 0]
@@ -0,0 +1,30 @@
+import pytest
+from analyzer import Analyzer
+from benchmark import generate_dot
+from instrument import CallbackSink
+
+PROGRESS_STAGES = ('Calculating PageRank of all nodes', 'Calculating the strongly connected components',
+                   'Calculating the bow-tie structure of the graph')
+
+
+@pytest.mark.parametrize('engine', ['csr', 'disk'])
+def test_running_stages_report_progress(tmp_path, monkeypatch, engine):
+    monkeypatch.chdir(tmp_path)
+    generate_dot('graph.dot', 2000, seed=4)
+    events = {}
+
+    def collect(event, item):
+        if event == 'progress':
+            events.setdefault(item.name, []).append((item.done, item.total, item.rate()))
+
+    record = Analyzer().run('graph.dot', 'result.csv', None, False, engine=engine, resume=False,
+                            checkpoints=str(tmp_path / 'ck'), sinks=[CallbackSink(collect)])
+    for name in PROGRESS_STAGES:
+        if engine == 'disk' and name == 'Calculating the strongly connected components':
+            continue
+        progress = events[name]
+        assert progress[-1][0] == progress[-1][1]
+        assert all(total is None or done <= total for done, total, rate in progress)
+        assert progress[-1][2] is not None
+    for stage in record['stages']:
+        assert 'reachability queries' not in stage['counters']
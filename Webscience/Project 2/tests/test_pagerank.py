@@ -0,0 +1,68 @@
+import networkx as nx
+import numpy as np
+import pagerank
+from csrgraph import CSRGraph
+from graphs import random_graph
+
+
+def ordered(ranks, n):
+    return np.array([ranks[node] for node in range(n)])
+
+
+def test_pagerank_matches_networkx():
+    graph, reference = random_graph(11, 200, 800, sources=150, targets=180)
+    scores, residuals = pagerank.pagerank(graph, alpha=0.85, tol=1.0e-10, max_iter=1000)
+    assert np.allclose(scores, ordered(nx.pagerank(reference, alpha=0.85, tol=1.0e-10), 200), atol=1.0e-9)
+    assert residuals[-1] < 200 * 1.0e-10
+
+
+def test_weighted_pagerank_matches_networkx():
+    graph, reference = random_graph(12, 100, 400, sources=90)
+    rng = np.random.default_rng(12)
+    weights = rng.integers(1, 10, graph.number_of_edges()).astype(np.float64)
+    for source, target, weight in zip(graph.edge_sources().tolist(), graph.out_targets.tolist(), weights):
+        reference[source][target]['weight'] = weight
+    scores = pagerank.pagerank(graph, tol=1.0e-10, max_iter=1000, weights=weights)[0]
+    assert np.allclose(scores, ordered(nx.pagerank(reference, tol=1.0e-10, weight='weight'), 100), atol=1.0e-9)
+
+
+def test_warm_start_converges_to_the_same_scores():
+    graph = random_graph(13, 150, 600, sources=120)[0]
+    cold, cold_residuals = pagerank.pagerank(graph, tol=1.0e-10, max_iter=1000)
+    warm, warm_residuals = pagerank.pagerank(graph, tol=1.0e-10, max_iter=1000, start=cold * 3)
+    assert np.allclose(warm, cold, atol=1.0e-9)
+    assert len(warm_residuals) < len(cold_residuals)
+
+
+def test_incremental_pagerank_matches_a_full_run(tmp_path):
+    rng = np.random.default_rng(14)
+    sources, targets = rng.integers(0, 300, 1500), rng.integers(0, 300, 1500)
+    old = CSRGraph.from_edges(sources, targets)
+    pagerank.save_scores(str(tmp_path / 'old.npz'), old, pagerank.pagerank(old, tol=1.0e-10, max_iter=1000)[0])
+    previous = pagerank.load_scores(str(tmp_path / 'old.npz'))
+    # a new crawl: a few links removed, a few added and two new pages
+    keep = rng.random(1500) > 0.01
+    sources = np.concatenate((sources[keep], rng.integers(0, 300, 10), [300, 12]))
+    targets = np.concatenate((targets[keep], rng.integers(0, 300, 10), [5, 301]))
+    new = CSRGraph.from_edges(sources, targets)
+    exact = pagerank.pagerank(new, tol=1.0e-12, max_iter=1000)[0]
+    for local in (True, False):
+        scores = pagerank.incremental_pagerank(new, previous, tol=1.0e-12, max_iter=1000, local=local)[0]
+        assert np.allclose(scores, exact, atol=1.0e-8)
+
+
+def test_approximations_find_the_top_pages():
+    graph = random_graph(15, 400, 3000, targets=300)[0]
+    exact = pagerank.pagerank(graph, tol=1.0e-10, max_iter=1000)[0]
+    push, bound = pagerank.approximate_pagerank(graph, method='push', epsilon=1.0e-6)
+    assert np.abs(push - exact).sum() <= bound.max() + 1.0e-9
+    walks, errors = pagerank.approximate_pagerank(graph, walks=200, seed=3)
+    assert np.abs(walks - exact).max() < 5 * errors.max()
+    assert pagerank.agreement(walks, exact, 10)[0] >= 7
+
+
+def test_top_k_is_sorted_and_stable():
+    scores = np.array([0.1, 0.4, 0.2, 0.4, 0.0])
+    assert pagerank.top_k(scores, 3).tolist() == [1, 3, 2]
+    assert pagerank.top_k(scores, 10).tolist() == [1, 3, 2, 0, 4]
+    assert len(pagerank.top_k(scores, 0)) == 0
@@ -0,0 +1,46 @@
+import networkx as nx
+import numpy as np
+from csrgraph import CSRGraph
+from personalized import batch_personalized_pagerank, iteration_arrays, personalized_pagerank, seed_columns
+
+
+def reference(edges, n, seeds):
+    graph = nx.DiGraph()
+    graph.add_nodes_from(range(n))
+    graph.add_edges_from(edges)
+    personalization = dict((node, 1.0 if node in seeds else 0.0) for node in range(n))
+    ranks = nx.pagerank(graph, alpha=0.85, personalization=personalization, tol=1.0e-10)
+    return np.array([ranks[node] for node in range(n)])
+
+
+def test_trailing_nodes_without_in_links():
+    # node 3 has no in-links and is the highest node, its empty row must not cut off the in-edges of 2
+    edges = [(0, 2), (1, 2), (3, 0), (2, 1)]
+    graph = CSRGraph.from_dense_edges([u for u, v in edges], [v for u, v in edges], 4)
+    scores = personalized_pagerank(iteration_arrays(graph), seed_columns(4, [[1, 2]]), tol=1.0e-10, max_iter=1000)
+    assert np.allclose(scores[:, 0], reference(edges, 4, {1, 2}), atol=1.0e-8)
+    assert abs(scores.sum() - 1.0) < 1.0e-8
+
+
+def test_columns_match_networkx_on_random_graph():
+    rng = np.random.default_rng(7)
+    n = 60
+    sources, targets = rng.integers(0, 40, 300), rng.integers(0, 50, 300)
+    # nodes 50..59 have no in-links, 40..59 no out-links
+    graph = CSRGraph.from_dense_edges(sources, targets, n)
+    edges = list(zip(graph.edge_sources().tolist(), graph.out_targets.tolist()))
+    seed_sets = [[0], [3, 55], list(range(10, 20))]
+    scores = personalized_pagerank(iteration_arrays(graph), seed_columns(n, seed_sets), tol=1.0e-10, max_iter=1000)
+    for column, seeds in enumerate(seed_sets):
+        assert np.allclose(scores[:, column], reference(edges, n, set(seeds)), atol=1.0e-8)
+
+
+def test_batch_matches_single_process():
+    rng = np.random.default_rng(3)
+    graph = CSRGraph.from_dense_edges(rng.integers(0, 80, 400), rng.integers(0, 100, 400), 100)
+    seed_sets = [[seed] for seed in range(20)]
+    serial = batch_personalized_pagerank(graph, seed_sets, 5, tol=1.0e-10, max_iter=1000, processes=1)
+    parallel = batch_personalized_pagerank(graph, seed_sets, 5, tol=1.0e-10, max_iter=1000, processes=2)
+    for (nodes, scores), (other_nodes, other_scores) in zip(serial, parallel):
+        assert np.array_equal(nodes, other_nodes)
+        assert np.allclose(scores, other_scores)
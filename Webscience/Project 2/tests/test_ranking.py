@@ -0,0 +1,71 @@
+from itertools import combinations
+import networkx as nx
+import numpy as np
+import pytest
+import ranking
+from analyzer import Analyzer
+from benchmark import generate_dot
+from graphs import random_graph
+
+
+def brute_kendall_tau(a, b):
+    concordant = discordant = ties_a = ties_b = 0
+    for i, j in combinations(range(len(a)), 2):
+        sign = np.sign(a[i] - a[j]) * np.sign(b[i] - b[j])
+        concordant += sign > 0
+        discordant += sign < 0
+        ties_a += a[i] == a[j]
+        ties_b += b[i] == b[j]
+    pairs = len(a) * (len(a) - 1) // 2
+    return (concordant - discordant) / np.sqrt(float(pairs - ties_a) * (pairs - ties_b))
+
+
+def brute_average_ranks(values):
+    return np.array([(values < value).sum() + ((values == value).sum() + 1) / 2.0 for value in values])
+
+
+def test_hits_matches_networkx():
+    graph, reference = random_graph(21, 150, 700, sources=120, targets=140)
+    hubs, authorities = ranking.hits(graph, tol=1.0e-12, max_iter=1000)
+    reference_hubs, reference_authorities = nx.hits(reference, tol=1.0e-12, max_iter=1000)
+    assert np.allclose(hubs, [reference_hubs[node] for node in range(150)], atol=1.0e-8)
+    assert np.allclose(authorities, [reference_authorities[node] for node in range(150)], atol=1.0e-8)
+
+
+@pytest.mark.parametrize('levels', [1000, 5, 2])
+def test_rank_correlations_match_their_definitions(levels):
+    rng = np.random.default_rng(levels)
+    a = rng.integers(0, levels, 120).astype(np.float64)
+    b = a + rng.integers(0, levels, 120)
+    assert ranking.kendall_tau(a, b) == pytest.approx(brute_kendall_tau(a, b))
+    assert np.array_equal(ranking.average_ranks(a), brute_average_ranks(a))
+    expected = np.corrcoef(brute_average_ranks(a), brute_average_ranks(b))[0, 1]
+    assert ranking.spearman(a, b) == pytest.approx(expected)
+
+
+def test_inversions_count_the_pairs_out_of_order():
+    rng = np.random.default_rng(22)
+    for n in (0, 1, 2, 7, 64, 101):
+        values = rng.integers(0, 10, n)
+        expected = sum(values[i] > values[j] for i, j in combinations(range(n), 2))
+        assert ranking.inversions(values) == expected
+
+
+def test_correlations_of_the_metrics():
+    graph = random_graph(23, 100, 400)[0]
+    metrics = ranking.metrics(graph)
+    report = ranking.correlations(metrics, k=(10,))
+    assert len(report) == len(metrics) * (len(metrics) - 1) // 2
+    row = [row for row in report if row['first'] == 'authority' and row['second'] == 'in_degree'][0]
+    assert row['kendall_tau'] > 0.5 and 0 <= row['top_10'] <= 1
+    assert ranking.top_k_overlap(metrics['pagerank'], metrics['pagerank'], 10) == 1.0
+
+
+def test_disk_engine_rejects_the_ranking_stage(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    generate_dot('graph.dot', 100, seed=24)
+    with pytest.raises(ValueError, match='ranking'):
+        Analyzer().run('graph.dot', 'result.csv', None, False, engine='disk', stages=['ranking'],
+                       checkpoints=str(tmp_path / 'ck'))
+    # nothing was built or written
+    assert not (tmp_path / 'Input').exists() and not (tmp_path / 'result.csv').exists()
@@ -0,0 +1,75 @@
+import networkx as nx
+import numpy as np
+from csrgraph import component_labels
+from graphs import random_graph
+from reachability import ReachabilityOracle
+
+
+def random_pairs(seed, n, count):
+    rng = np.random.default_rng(seed)
+    return list(zip(rng.integers(0, n, count).tolist(), rng.integers(0, n, count).tolist()))
+
+
+def test_can_reach_matches_networkx():
+    for seed in range(4):
+        graph, reference = random_graph(seed, 150, 220, sources=120, targets=130)
+        oracle = ReachabilityOracle(graph)
+        for source, target in random_pairs(seed, 150, 300):
+            assert oracle.can_reach(source, target) == nx.has_path(reference, source, target)
+
+
+def test_can_reach_a_networkx_graph():
+    _, reference = random_graph(4, 100, 150)
+    reference = nx.relabel_nodes(reference, dict((node, 'n' + str(node)) for node in reference))
+    oracle = ReachabilityOracle(reference)
+    for source, target in random_pairs(4, 100, 200):
+        source, target = 'n' + str(source), 'n' + str(target)
+        assert oracle.can_reach(source, target) == nx.has_path(reference, source, target)
+
+
+def test_can_reach_batch_matches_networkx():
+    graph, reference = random_graph(5, 150, 250, sources=120)
+    # a few sources with many targets get a full forward search, the others are answered one by one
+    pairs = [(source, target) for source in (2, 9, 31) for target in range(0, 150, 5)]
+    pairs += random_pairs(5, 150, 100)
+    oracle = ReachabilityOracle(graph)
+    assert oracle.can_reach_batch(pairs) == [nx.has_path(reference, source, target) for source, target in pairs]
+    assert oracle.queries == len(pairs)
+    assert oracle.searches < len(pairs)
+
+
+def test_answers_are_memoized():
+    graph, _ = random_graph(6, 120, 200)
+    pairs = random_pairs(6, 120, 100)
+    oracle = ReachabilityOracle(graph)
+    first = [oracle.can_reach(source, target) for source, target in pairs]
+    searches = oracle.searches
+    assert [oracle.can_reach(source, target) for source, target in pairs] == first
+    assert oracle.searches == searches
+    assert oracle.queries == 2 * len(pairs)
+
+
+def test_component_labels_share_answers():
+    graph, reference = random_graph(7, 120, 260)
+    components = component_labels(graph)
+    oracle = ReachabilityOracle(graph, labels=components.labels)
+    pairs = random_pairs(7, 120, 400)
+    for source, target in pairs:
+        assert oracle.can_reach(source, target) == nx.has_path(reference, source, target)
+    # at most one search per pair of components, never for a pair inside one component
+    keys = set((components.labels[source], components.labels[target]) for source, target in pairs
+               if source != target and components.labels[source] != components.labels[target])
+    assert oracle.searches == len(keys)
+
+
+def test_generation_stamp_reuses_the_marks():
+    graph, reference = random_graph(8, 100, 160)
+    oracle = ReachabilityOracle(graph)
+    marks = [seen for seen in oracle._seen]
+    pairs = [(source, target) for source, target in random_pairs(8, 100, 150) if source != target]
+    for source, target in pairs:
+        assert oracle.can_reach(source, target) == nx.has_path(reference, source, target)
+    # the same arrays are marked by every search, no mark is newer than the last search
+    assert all(seen is mark for seen, mark in zip(oracle._seen, marks))
+    assert oracle._stamp == oracle.searches
+    assert max(seen.max() for seen in oracle._seen) == oracle._stamp
@@ -0,0 +1,59 @@
+import numpy as np
+from analyzer import Analyzer
+from benchmark import generate_dot
+import tools
+
+
+def read_results(location):
+    rows, sets = {}, {}
+    with open(location) as in_file:
+        lines = in_file.read().split(tools.newline)
+    separators = [index for index, line in enumerate(lines) if line == tools.separator]
+    for line in lines[1:separators[0]]:
+        fields = line.split(';')
+        rows[fields[4]] = fields[6]
+    for line in lines[separators[1] + 2:]:
+        if line:
+            node_id, name = line.split(';')
+            sets[node_id] = name
+    return rows, sets
+
+
+def run(tmp_path, name, treshold, **kwargs):
+    Analyzer().run('graph.dot', name + '.csv', treshold, False, resume=False, checkpoints=str(tmp_path / 'ck'),
+                   **kwargs)
+    return read_results(name + '.csv')
+
+
+def test_nodes_outside_the_treshold_graph_are_unclassified(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    generate_dot('graph.dot', 600, seed=1)
+    rows, sets = run(tmp_path, 'part', 150, engine='csr')
+    for node_id, name in rows.items():
+        assert name == sets.get(node_id, tools.UNCLASSIFIED)
+    assert tools.UNCLASSIFIED in rows.values()
+    types = np.load('part.npz')['type']
+    assert (types == -1).sum() == sum(1 for name in rows.values() if name == tools.UNCLASSIFIED)
+
+
+def test_engines_write_the_same_bow_tie(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    generate_dot('graph.dot', 400, seed=2)
+    results = [run(tmp_path, engine, None, engine=engine) for engine in ('networkx', 'csr', 'disk')]
+    for rows, sets in results[1:]:
+        assert sets == results[0][1]
+        assert rows == results[0][0]
+    assert tools.UNCLASSIFIED not in results[0][0].values()
+
+
+def test_a_resumed_run_saves_the_pagerank(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    generate_dot('graph.dot', 300, seed=3)
+    checkpoints = str(tmp_path / 'ck')
+    Analyzer().run('graph.dot', 'first.csv', None, False, engine='csr', checkpoints=checkpoints)
+    record = Analyzer().run('graph.dot', 'second.csv', None, False, engine='csr', checkpoints=checkpoints)
+    stage = next(stage for stage in record['stages'] if stage['stage'] == 'Calculating PageRank of all nodes')
+    assert stage['counters']['checkpoints'] == 1
+    with np.load('first_pagerank.npz') as first, np.load('second_pagerank.npz') as second:
+        assert np.array_equal(first['scores'], second['scores'])
+        assert np.array_equal(first['node_ids'], second['node_ids'])
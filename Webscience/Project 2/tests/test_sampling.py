@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+import sampling
+from graphs import random_graph
+
+
+def edge_set(graph):
+    return set(zip(graph.node_ids[graph.edge_sources()].tolist(), graph.node_ids[graph.out_targets].tolist()))
+
+
+@pytest.mark.parametrize('strategy', sorted(sampling.STRATEGIES))
+def test_samples_are_repeatable_subgraphs(strategy):
+    graph, reference = random_graph(41, 500, 2500)
+    sample = sampling.sample(graph, strategy, max_nodes=100, seed=4)
+    again = sampling.sample(graph, strategy, max_nodes=100, seed=4)
+    assert np.array_equal(sample.node_ids, again.node_ids) and edge_set(sample) == edge_set(again)
+    assert sample.number_of_nodes() <= 100
+    nodes = sample.node_ids.tolist()
+    if strategy == 'random-edge':
+        assert edge_set(sample) <= set(reference.edges())
+    else:
+        # the other strategies pick nodes and keep every link between them
+        assert sample.number_of_nodes() == 100
+        assert edge_set(sample) == set(reference.subgraph(nodes).edges())
+    assert edge_set(sampling.sample(graph, strategy, max_nodes=100, seed=5)) != edge_set(sample)
+
+
+@pytest.mark.parametrize('strategy', sorted(sampling.STRATEGIES))
+def test_edge_budget(strategy):
+    graph = random_graph(42, 500, 2500)[0]
+    sample = sampling.sample(graph, strategy, max_edges=300, seed=1)
+    if strategy == 'random-edge':
+        assert sample.number_of_edges() == 300
+    else:
+        # the node which reaches the budget brings all its links with it
+        assert 300 <= sample.number_of_edges() < 300 + 2 * int(graph.out_degree().max() + graph.in_degree().max())
+
+
+def test_bfs_sample_from_a_start_node():
+    graph, reference = random_graph(43, 300, 1200)
+    sample = sampling.bfs_sample(graph, max_nodes=20, start=7)
+    # the start node and its successors come first
+    assert set([7] + sorted(reference.successors(7))[:19]) <= set(sample.node_ids.tolist())
+    with pytest.raises(ValueError):
+        sampling.sample(graph, 'snowball')
@@ -0,0 +1,48 @@
+import numpy as np
+import tools
+from graphs import write_dot
+
+
+def write_graph(location, seed, n=400, m=2000):
+    rng = np.random.default_rng(seed)
+    edges = sorted(set(zip(rng.integers(0, n, m).tolist(), rng.integers(0, n, m).tolist())))
+    write_dot(location, edges, n)
+    # a source continuing on the next line, as in lines split by the crawler
+    with open(location, 'r') as in_file:
+        text = in_file.read()
+    with open(location, 'w') as out_file:
+        out_file.write(text.replace('}\n', ' 7 -> {1 2};\n 7 -> {3};\n}\n'))
+    return set(edges) | {(7, 1), (7, 2), (7, 3)}
+
+
+def test_records_do_not_depend_on_the_chunk_size(tmp_path):
+    location = str(tmp_path / 'graph.dot')
+    write_graph(location, 31)
+    records = list(tools.iter_dot_file(location))
+    assert list(tools.iter_dot_file(location, chunk_size=37)) == records
+    assert sum(1 for kind, first, second in records if kind == tools.NODE) == 400
+
+
+def test_parallel_parse_matches_the_serial_parse(tmp_path):
+    location = str(tmp_path / 'graph.dot')
+    edges = write_graph(location, 32)
+    serial = tools.parse_dot_arrays(location)
+    assert set(zip(serial['sources'].tolist(), serial['targets'].tolist())) == edges
+    urls = tools.urls_from_arrays(serial['url_ids'], serial['url_offsets'], serial['url_data'])
+    assert urls == dict((str(node), 'http://www.utwente.nl/' + str(node) + '.html') for node in range(400))
+    for processes in (2, 3):
+        parallel = tools.parse_dot_arrays(location, processes)
+        assert sorted(parallel) == sorted(serial)
+        for name in serial:
+            assert np.array_equal(parallel[name], serial[name]), name
+
+
+def test_split_files_load_as_the_parsed_graph(tmp_path):
+    location = str(tmp_path / 'graph.dot')
+    edges = write_graph(location, 33)
+    tools.split_dot_file(location, str(tmp_path / 'urls.txt'), str(tmp_path / 'edges.txt'), processes=2)
+    sources, targets, line_ends = tools.load_edge_arrays(str(tmp_path / 'edges.txt'))
+    assert set(zip(sources.tolist(), targets.tolist())) == edges
+    data = tools.parse_dot_arrays(location)
+    assert tools.load_urls(str(tmp_path / 'urls.txt')) == tools.urls_from_arrays(data['url_ids'], data['url_offsets'],
+                                                                                data['url_data'])
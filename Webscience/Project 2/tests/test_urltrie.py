@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+from analyzer import Analyzer
+from benchmark import generate_dot
+from csrgraph import CSRGraph
+from urltrie import UrlTrie, url_directories
+
+
+def random_urls(seed, n):
+    rng = np.random.default_rng(seed)
+    hosts = ['http://www.utwente.nl', 'http://www.utwente.nl.evil', 'https://wiki.utwente.nl', 'http://home.utwente.nl']
+    urls = []
+    for node in range(n):
+        if rng.random() < 0.05:
+            urls.append('')
+            continue
+        directories = ['d' + str(rng.integers(0, 4)) for level in range(rng.integers(0, 4))]
+        urls.append('/'.join([hosts[rng.integers(0, len(hosts))]] + directories + ['p' + str(node) + '.html']))
+    return urls
+
+
+def test_url_directories():
+    assert url_directories('http://www.utwente.nl/a/b/index.html') == ['http://www.utwente.nl', 'a', 'b']
+    assert url_directories('http://www.utwente.nl') == ['http://www.utwente.nl']
+    assert url_directories('http://www.utwente.nl/') == ['http://www.utwente.nl']
+
+
+def test_nodes_match_startswith():
+    urls = random_urls(51, 600)
+    trie = UrlTrie.from_urls(urls)
+    prefixes = ['', 'http', 'http://www.utwente.nl', 'http://www.utwente.nl/', 'http://www.utwente.nl/d1',
+                'http://www.utwente.nl/d1/', 'http://www.utwente.nl/d1/d', 'http://www.utwente.nl/p1',
+                'https://wiki.utwente.nl/d2/d3/p', 'http://home', 'http://www.utwente.nl.', 'ftp://']
+    prefixes += [url[:cut] for url in urls[:40] for cut in (len(url) // 2, len(url))]
+    for prefix in prefixes:
+        expected = [node for node, url in enumerate(urls) if url.startswith(prefix)]
+        assert trie.nodes(prefix).tolist() == expected, prefix
+
+
+def test_collapse_counts_the_links_between_hosts():
+    urls = random_urls(52, 300)
+    rng = np.random.default_rng(52)
+    graph = CSRGraph.from_dense_edges(rng.integers(0, 300, 1500), rng.integers(0, 300, 1500), 300)
+    trie = UrlTrie.from_urls(urls)
+    quotient = trie.collapse(graph, 1)
+    host = [url_directories(url)[0] if url else '' for url in urls]
+    links, internal = {}, {}
+    for source, target in zip(graph.edge_sources().tolist(), graph.out_targets.tolist()):
+        if host[source] == host[target]:
+            internal[host[source]] = internal.get(host[source], 0) + 1
+        else:
+            links[(host[source], host[target])] = links.get((host[source], host[target]), 0) + 1
+    labels = quotient.graph.node_ids.tolist()
+    assert sorted(labels) == sorted(set(host))
+    edges = zip(quotient.graph.edge_sources().tolist(), quotient.graph.out_targets.tolist(), quotient.weights.tolist())
+    assert dict(((labels[source], labels[target]), weight) for source, target, weight in edges) == links
+    assert dict((labels[group], count) for group, count in enumerate(quotient.internal.tolist()) if count) == internal
+    assert quotient.sizes.tolist() == [host.count(label) for label in labels]
+
+
+def test_only_the_csr_engine_runs_the_sites_stage(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    generate_dot('graph.dot', 100, seed=25)
+    with pytest.raises(ValueError, match='sites'):
+        Analyzer().run('graph.dot', 'result.csv', None, False, engine='disk', stages=['sites'],
+                       checkpoints=str(tmp_path / 'ck'))
+    assert not (tmp_path / 'result_sites.csv').exists()
+    Analyzer().run('graph.dot', 'result.csv', None, False, engine='csr', stages=['sites'],
+                   checkpoints=str(tmp_path / 'ck'))
+    assert (tmp_path / 'result_sites.csv').exists()
@@ -1,48 +1,196 @@
 from _hashlib import new
+import os
 import os.path
 import networkx as nx
 import re
 import time
+from array import array
+from multiprocessing import Pool
+import numpy as np
+from csrgraph import CSRGraph, expand
+from degrees import DegreeStats
 
 separator, newline, divider = '-----', '\n', '/'
 
+# record kinds yielded by iter_dot_file and the size of the blocks read from disk
+NODE, EDGE = 0, 1
+CHUNK_SIZE = 1 << 24
+# number of byte ranges per process of a parallel parse, more ranges even out the work
+RANGES_PER_PROCESS = 4
 
-# Splits the initial .dot file to a url-file and an edges file, usable by the second trimming method
-def split_dot_file(in_loc, urls_out, edges_out):
-    with open(in_loc, 'r') as in_file:
-        # parse urls
-        urls_file = open(urls_out, 'w')
-        line = in_file.readline()
-        urls = {}
-        while line:
-            connections = re.split(' \[url=\\"', line)
-            if len(connections) == 2:
-                urls_file.write(connections[0] + ";" + connections[1][:-4] + newline)
-                urls[connections[0]] = connections[1][:-4]
-            line = in_file.readline()
-            if line[0] == ' ':
+# matches either a url line ('76 [url="http://..."];') or an edge line (' 76 -> {1 2 3}') of the .dot file
+_RECORD_PATTERN = re.compile(rb'^(?:(\d+) \[url="(.*)"\]| (\d+) -> \{(.*))', re.M)
+_ID_PATTERN = re.compile(rb'\d+')
+# matches a line of the edges file written by split_dot_file ('76 -> {1 2 3}')
+_EDGES_LINE_PATTERN = re.compile(rb'^(\d+) -> \{(.*)', re.M)
+
+
+# Reads a file (or the bytes from start up to end) in large blocks which always end on a line boundary
+def read_chunks(location, chunk_size=CHUNK_SIZE, start=0, end=None):
+    with open(location, 'rb') as in_file:
+        in_file.seek(start)
+        tail, left = b'', end - start if end is not None else -1
+        while True:
+            chunk = in_file.read(chunk_size if left < 0 else min(chunk_size, left))
+            left -= len(chunk)
+            if not chunk:
                 break
-        urls_file.close()
-        # sort edges to number of slashes
-        edges = []
-        leftovers = []
-        while line:
-            parts = re.split(' -> {', line[1:])
-            if parts[0] in urls:
-                edges.append((urls[parts[0]], parts))
+            if tail:
+                chunk = tail + chunk
+            cut = chunk.rfind(b'\n') + 1
+            tail = chunk[cut:]
+            if cut:
+                yield chunk[:cut]
+        if tail:
+            yield tail
+
+
+# Streams the records of a .dot file: (NODE, node id, url) for every url line and
+# (EDGE, source id, target id) for every edge, both in file order. With raw the urls stay bytes.
+# start and end limit it to a byte range, both on line boundaries (see line_ranges).
+def iter_dot_file(in_loc, chunk_size=CHUNK_SIZE, raw=False, start=0, end=None):
+    for chunk in read_chunks(in_loc, chunk_size, start, end):
+        for match in _RECORD_PATTERN.finditer(chunk):
+            node, url, source, targets = match.groups()
+            if node is not None:
+                yield NODE, int(node), url if raw else url.decode('utf-8')
             else:
-                leftovers.append(parts)
-            line = in_file.readline();
-            if line[0] != ' ':
-                break
-        edges = sorted(edges, key=lambda x: x[0].count("/"), reverse=True)
-        # write edges
-        edges_file = open(edges_out, 'w')
-        for edge in edges:
-            edges_file.write(edge[1][0] + ' -> {' + edge[1][1])
-        for leftover in leftovers:
-            edges_file.write(leftover[0] + ' -> {' + leftover[1])
-        edges_file.close()
+                source = int(source)
+                for target in _ID_PATTERN.findall(targets):
+                    yield EDGE, source, int(target)
+
+
+# Splits a file into count byte ranges of about the same size, every range starts and ends on a
+# line boundary. Returns the list of (start, end) pairs.
+def line_ranges(location, count):
+    size = os.path.getsize(location)
+    bounds = [0]
+    with open(location, 'rb') as in_file:
+        for index in range(1, count):
+            position = max(size * index // count, bounds[-1])
+            if position > 0:
+                # move to the start of the next line, unless position already is at one
+                in_file.seek(position - 1)
+                in_file.readline()
+                position = in_file.tell()
+            bounds.append(min(position, size))
+    bounds.append(size)
+    return [(start, end) for start, end in zip(bounds[:-1], bounds[1:]) if end > start]
+
+
+# Parses a byte range of the .dot file into the raw arrays of its url lines and edge lines, edges of
+# consecutive edge records with the same source form one line
+def parse_dot_range(in_loc, start=0, end=None):
+    url_ids, url_offsets, url_data = array('l'), array('l', [0]), bytearray()
+    line_sources, line_starts, targets = array('l'), array('l'), array('l')
+    for kind, first, second in iter_dot_file(in_loc, raw=True, start=start, end=end):
+        if kind == NODE:
+            url_ids.append(first)
+            url_data += second
+            url_offsets.append(len(url_data))
+        else:
+            if not line_sources or line_sources[-1] != first:
+                line_sources.append(first)
+                line_starts.append(len(targets))
+            targets.append(second)
+    line_starts.append(len(targets))
+    return (np.array(url_ids, dtype=np.int64), np.array(url_offsets, dtype=np.int64),
+            np.frombuffer(bytes(url_data), dtype=np.uint8), np.array(line_sources, dtype=np.int64),
+            np.array(line_starts, dtype=np.int64), np.array(targets, dtype=np.int64))
+
+
+# Concatenates the raw arrays of parse_dot_range of consecutive byte ranges into those of the whole
+# file. A line which continues in the next range (same source) is joined again, like a serial parse.
+def merge_dot_ranges(parts):
+    url_ids, url_offsets, url_data, line_sources, line_starts, targets = [], [], [], [], [], []
+    url_size = edge_size = 0
+    last_source = None
+    for part_url_ids, part_url_offsets, part_url_data, part_sources, part_starts, part_targets in parts:
+        url_ids.append(part_url_ids)
+        url_offsets.append(part_url_offsets[:-1] + url_size)
+        url_data.append(part_url_data)
+        url_size += len(part_url_data)
+        if len(part_sources) and part_sources[0] == last_source:
+            part_sources, part_starts = part_sources[1:], part_starts[1:]
+        line_sources.append(part_sources)
+        line_starts.append(part_starts[:-1] + edge_size)
+        targets.append(part_targets)
+        edge_size += len(part_targets)
+        if len(part_sources):
+            last_source = part_sources[-1]
+    url_offsets.append(np.array([url_size], dtype=np.int64))
+    line_starts.append(np.array([edge_size], dtype=np.int64))
+    return (np.concatenate(url_ids), np.concatenate(url_offsets), np.concatenate(url_data),
+            np.concatenate(line_sources), np.concatenate(line_starts), np.concatenate(targets))
+
+
+# Pool task: parse_dot_range of one (location, start, end) range
+def _parse_range_task(task):
+    return parse_dot_range(*task)
+
+
+# Parses the .dot file into arrays: the url ids with all urls in one byte string plus offsets, the
+# edges (with the end of every edge line) in the order split_dot_file writes them and the degrees.
+# With more than one process the file is split into byte ranges on line boundaries which are parsed
+# by a pool of processes and merged, the arrays are the same as those of a serial parse.
+def parse_dot_arrays(in_loc, processes=1):
+    processes = processes or os.cpu_count() or 1
+    tasks = [(in_loc, start, end) for start, end in line_ranges(in_loc, processes * RANGES_PER_PROCESS)]
+    if processes == 1 or len(tasks) <= 1:
+        parts = [parse_dot_range(in_loc)]
+    else:
+        with Pool(min(processes, len(tasks))) as pool:
+            parts = pool.map(_parse_range_task, tasks)
+    url_ids, url_offsets, url_data, line_sources, line_starts, targets = merge_dot_ranges(parts)
+    # sort edge lines to the number of slashes of their url, lines without a known url go last
+    counts = np.concatenate(([0], np.cumsum(url_data == ord(divider))))
+    slashes = counts[url_offsets[1:]] - counts[url_offsets[:-1]]
+    keys = np.ones(len(line_sources), dtype=np.int64)
+    if len(url_ids):
+        by_id = np.argsort(url_ids, kind='stable')
+        found = by_id[np.minimum(np.searchsorted(url_ids, line_sources, sorter=by_id), len(url_ids) - 1)]
+        known = url_ids[found] == line_sources
+        keys[known] = -slashes[found[known]]
+    lines = np.argsort(keys, kind='stable')
+    lengths = np.diff(line_starts)[lines]
+    sources = np.repeat(line_sources[lines], lengths)
+    targets = expand(line_starts, targets, lines)
+    # the degrees are counted on the edge arrays right away, no second pass over the edges
+    indegree_ids, indegree_values = count_indegrees(targets)
+    degrees = DegreeStats.from_edges(sources, targets)
+    return {'url_ids': url_ids, 'url_offsets': url_offsets, 'url_data': url_data,
+            'sources': sources, 'targets': targets, 'line_ends': np.cumsum(lengths),
+            'indegree_ids': indegree_ids, 'indegree_values': indegree_values,
+            'degree_ids': degrees.node_ids, 'in_degree': degrees.in_degree, 'out_degree': degrees.out_degree}
+
+
+# Counts the in-degrees of the edge targets, in the order calculate_indegrees writes them
+def count_indegrees(targets):
+    ids, first, counts = np.unique(targets, return_index=True, return_counts=True)
+    order = np.argsort(first, kind='stable')
+    ids, counts = ids[order], counts[order]
+    order = np.argsort(counts, kind='stable')
+    return ids[order], counts[order]
+
+
+# Splits the initial .dot file to a url-file and an edges file, usable by the second trimming method
+def split_dot_file(in_loc, urls_out, edges_out, processes=1):
+    data = parse_dot_arrays(in_loc, processes)
+    write_split_files(data, urls_out, edges_out)
+    return data
+
+
+# Writes the arrays of parse_dot_arrays as the url-file and the edges file
+def write_split_files(data, urls_out, edges_out):
+    url_data, url_offsets = bytes(data['url_data']), data['url_offsets'].tolist()
+    with open(urls_out, 'w', buffering=CHUNK_SIZE) as urls_file:
+        for index, node in enumerate(data['url_ids'].tolist()):
+            urls_file.write(str(node) + ';' + url_data[url_offsets[index]:url_offsets[index + 1]].decode('utf-8') + newline)
+    sources, targets, start = data['sources'].tolist(), data['targets'].tolist(), 0
+    with open(edges_out, 'w', buffering=CHUNK_SIZE) as edges_file:
+        for end in data['line_ends'].tolist():
+            edges_file.write(str(sources[start]) + ' -> {' + ' '.join(map(str, targets[start:end])) + '}' + newline)
+            start = end
 
 
 # Splits the initial .dot file to a url-file and an edges file, usable by the first trimming method
@@ -70,25 +218,19 @@ def split_dot_file_old(in_loc, urls_out, edges_out):
 
 # calculates the in-degrees from the input file and writes it to the output file
 def calculate_indegrees(in_loc, out_loc):
-    indegrees = {}
-    with open(in_loc, 'r') as in_file:
-        for line in in_file:
-            connections = re.split(' -> {', line)
-            if connections:
-                ancestors = re.findall('\d+', connections[1])
-                for ancestor in ancestors:
-                    if ancestor not in indegrees:
-                        indegrees[ancestor] = 1
-                    else:
-                        indegrees[ancestor] += 1
-    out_file = open(out_loc, 'w')
-    out_file.write("Node id; In degrees" + newline)
-    listt = sorted(indegrees.items(), key=lambda x: x[1], reverse=False)
-    for item in listt:
-        out_file.write(str(item[0]) + "; " + str(item[1]) + newline)
-    out_file.close()
-
-# loads the graph using the second trim method
+    sources, targets, line_ends = load_edge_arrays(in_loc)
+    write_indegrees(out_loc, *count_indegrees(targets))
+
+
+# writes the in-degrees in the format of calculate_indegrees
+def write_indegrees(location, ids, values):
+    with open(location, 'w', buffering=CHUNK_SIZE) as out_file:
+        out_file.write("Node id; In degrees" + newline)
+        for node, value in zip(ids.tolist(), values.tolist()):
+            out_file.write(str(node) + "; " + str(value) + newline)
+
+
+# loads the graph using the second trim method, a treshold of None loads the whole graph
 def load_graph(location, treshold):
     graph = nx.DiGraph()
     with open(location, 'r') as file:
@@ -99,12 +241,45 @@ def load_graph(location, treshold):
                 predecessors = re.findall('\d+', connections[1])
                 for elem in predecessors:
                     graph.add_edge(connections[0], elem)
-                if nx.number_of_nodes(graph) >= treshold:
+                if treshold and nx.number_of_nodes(graph) >= treshold:
                     return graph
             cntr += 1
     return graph
 
 
+# loads the edges file as integer arrays of sources and targets plus the end of every line
+def load_edge_arrays(location):
+    sources, targets, line_ends = array('l'), array('l'), array('l')
+    for chunk in read_chunks(location):
+        for match in _EDGES_LINE_PATTERN.finditer(chunk):
+            source = int(match.group(1))
+            for target in _ID_PATTERN.findall(match.group(2)):
+                sources.append(source)
+                targets.append(int(target))
+            line_ends.append(len(targets))
+    return np.array(sources, dtype=np.int64), np.array(targets, dtype=np.int64), np.array(line_ends, dtype=np.int64)
+
+
+# keeps the edges up to the line on which the graph reaches treshold nodes, like load_graph does
+def truncate_edges(sources, targets, line_ends, treshold):
+    if not treshold:
+        return sources, targets
+    # load_graph adds the source and then the target of every edge, find where each node appears first
+    sequence = np.empty(2 * len(sources), dtype=np.int64)
+    sequence[0::2], sequence[1::2] = sources, targets
+    first = np.sort(np.unique(sequence, return_index=True)[1])
+    if len(first) < treshold:
+        return sources, targets
+    cut = line_ends[np.searchsorted(line_ends, first[treshold - 1] // 2, side='right')]
+    return sources[:cut], targets[:cut]
+
+
+# loads the graph using the second trim method as an array-backed CSRGraph
+def load_csr_graph(location, treshold):
+    sources, targets, line_ends = load_edge_arrays(location)
+    return CSRGraph.from_edges(*truncate_edges(sources, targets, line_ends, treshold))
+
+
 # loads the graph using the first trim method
 def load_graph_old(location, treshold):
     graph = nx.DiGraph()
@@ -130,6 +305,29 @@ def load_urls(location):
     return urls
 
 
+# builds the dictionary of load_urls from the url arrays of parse_dot_arrays
+def urls_from_arrays(url_ids, url_offsets, url_data):
+    url_data, url_offsets = bytes(url_data), url_offsets.tolist()
+    return dict((str(node), url_data[url_offsets[index]:url_offsets[index + 1]].decode('utf-8'))
+                for index, node in enumerate(url_ids.tolist()))
+
+
+# builds the dictionary of load_indegrees from in-degree arrays, the first rank is 1 like in the file
+def indegrees_from_arrays(ids, values):
+    return dict((str(node), (rank, str(value))) for rank, (node, value) in enumerate(zip(ids.tolist(), values.tolist()), 1))
+
+
+# turns in-degree arrays into the in-degree rank (0 for nodes without in-links) and the in-degree of
+# every dense node of the idmap.IdMap ids, the first rank is 1 like in the file
+def dense_indegrees(ids, indegree_ids, indegree_values):
+    ranks, values = np.zeros(len(ids), dtype=np.int64), np.zeros(len(ids), dtype=np.int64)
+    dense = ids.index(indegree_ids)
+    known = dense >= 0
+    ranks[dense[known]] = np.arange(1, len(dense) + 1)[known]
+    values[dense[known]] = np.asarray(indegree_values)[known]
+    return ranks, values
+
+
 # loads the in-degree file
 def load_indegrees(location):
     idgr = {}
@@ -142,53 +340,140 @@ def load_indegrees(location):
     return idgr
 
 
-# writes the analyser-results to a file
+# the bow-tie sets in the order a node is checked against them, with their names in the results
+SET_NAMES = ('gscc', 'in', 'out', 'tendril', 'tube', 'disconnected')
+SET_TITLES = ('Huge scc', 'In', 'Out', 'Tendrils', 'Tubes', 'Disconnected')
+# the type of the nodes which are in none of the sets, e.g. nodes outside the treshold graph the
+# bow-tie was computed on
+UNCLASSIFIED = 'unclassified'
+# number of rows which are joined before a write
+ROWS_PER_WRITE = 10000
+
+
+# returns the index in SET_NAMES of the first bow-tie set containing node, -1 if none contains it
+def set_index(node, sets):
+    for index, members in enumerate(sets):
+        if node in members:
+            return index
+    return -1
+
+
+# returns the type written for an index of set_index
+def set_name(index):
+    return SET_NAMES[index] if index >= 0 else UNCLASSIFIED
+
+
+# writes the analyser-results to a file, rows are buffered and written in chunks. After the
+# summary every node of the bow-tie sets gets a row with its set, instead of the sets being
+# written out as one line each.
 def write_results(location, pr, gscc, inc, outc, tenc, tubec, disc, indegrees, urls, num_of_nodes):
-    with open(location, 'w') as file:
-        file.write('PageRank;inDegreeRank;PageRankValue;inDegreeValue;Node id;Url;Type\n')
+    sets = (gscc, inc, outc, tenc, tubec, disc)
+    with open(location, 'w', buffering=CHUNK_SIZE) as file:
+        rows = ['PageRank;inDegreeRank;PageRankValue;inDegreeValue;Node id;Url;Type\n']
         for index, item in enumerate(pr):
             if item[0] not in indegrees:
                 continue
-            file.write(str(index)
-                       + ';' + str(indegrees[item[0]][0])
-                       + ';' + str(item[1])
-                       + ';' + str(indegrees[item[0]][1])
-                       + ';' + str(item[0])
-                       + ';')
-            if item[0] in urls:
-                 file.write(urls[item[0]])
-            if item[0] in gscc:
-                 file.write(';gscc')
-            elif item[0] in inc:
-                 file.write(';in')
-            elif item[0] in outc:
-                 file.write(';out')
-            elif item[0] in tenc:
-                 file.write(';tendril')
-            elif item[0] in tubec:
-                 file.write(';tube')
-            else:
-                 file.write(';disconnected')
-            file.write(newline)
-
-        file.write(separator + newline)
-        file.write('Number of nodes: ' + str(num_of_nodes) + newline)
-        file.write('Huge scc (' + str(len(gscc)) + ' nodes - ' + str(100 * len(gscc) / float(num_of_nodes)) + '%):' + newline)
-        file.write('\t' + str(gscc) + newline)
-        file.write('In (' + str(len(inc)) + ' nodes - ' + str(100 * len(inc) / float(num_of_nodes)) + '%):' + newline)
-        file.write('\t' + str(inc) + newline)
-        file.write(separator + newline)
-        file.write('Out (' + str(len(outc)) + ' nodes - ' + str(100 * len(outc) / float(num_of_nodes)) + '%):' + newline)
-        file.write('\t' + str(outc) + newline)
-        file.write(separator + newline)
-        file.write('Tendrils (' + str(len(tenc)) + ' nodes - ' + str(100 * len(tenc) / float(num_of_nodes)) + '%):' + newline)
-        file.write('\t' + str(tenc) + newline)
-        file.write(separator + newline)
-        file.write('Tubes (' + str(len(tubec)) + ' nodes - ' + str(100 * len(tubec) / float(num_of_nodes)) + '%):' + newline)
-        file.write('\t' + str(tubec) + newline)
-        file.write(separator + newline)
-        file.write('Disconnected (' + str(len(disc)) + ' nodes - ' + str(100 * len(disc) / float(num_of_nodes)) + '%):' + newline)
-        file.write('\t' + str(disc) + newline)
+            rows.append(str(index) + ';' + str(indegrees[item[0]][0]) + ';' + str(item[1])
+                        + ';' + str(indegrees[item[0]][1]) + ';' + str(item[0]) + ';' + urls.get(item[0], '')
+                        + ';' + set_name(set_index(item[0], sets)) + newline)
+            if len(rows) >= ROWS_PER_WRITE:
+                file.write(''.join(rows))
+                rows = []
+
+        rows.append(separator + newline)
+        rows.append('Number of nodes: ' + str(num_of_nodes) + newline)
+        for title, members in zip(SET_TITLES, sets):
+            rows.append(title + ' (' + str(len(members)) + ' nodes - ' + str(100 * len(members) / float(num_of_nodes)) + '%)' + newline)
+        rows.append(separator + newline)
+        rows.append('Node id;Type' + newline)
+        for name, members in zip(SET_NAMES, sets):
+            for node in members:
+                rows.append(str(node) + ';' + name + newline)
+                if len(rows) >= ROWS_PER_WRITE:
+                    file.write(''.join(rows))
+                    rows = []
+        file.write(''.join(rows))
+
+
+# writes the analyser-results as compressed columns (numpy .npz): the PageRank rows of write_results
+# and the bow-tie set (index in SET_NAMES, -1 for unclassified) of every node, the node ids have to
+# be numeric
+def write_results_binary(location, pr, gscc, inc, outc, tenc, tubec, disc, indegrees, urls, num_of_nodes):
+    sets = (gscc, inc, outc, tenc, tubec, disc)
+    ranks = [index for index, item in enumerate(pr) if item[0] in indegrees]
+    pr = [pr[index] for index in ranks]
+    url_data = [urls.get(item[0], '').encode('utf-8') for item in pr]
+    np.savez_compressed(
+        location,
+        rank=np.array(ranks, dtype=np.int32),
+        node_id=np.array([int(item[0]) for item in pr], dtype=np.int64),
+        pagerank=np.array([item[1] for item in pr], dtype=np.float64),
+        indegree_rank=np.array([indegrees[item[0]][0] for item in pr], dtype=np.int64),
+        indegree=np.array([int(indegrees[item[0]][1]) for item in pr], dtype=np.int64),
+        type=np.array([set_index(item[0], sets) for item in pr], dtype=np.int8),
+        url_data=np.frombuffer(b''.join(url_data), dtype=np.uint8),
+        url_offsets=np.cumsum([0] + [len(url) for url in url_data], dtype=np.int64),
+        set_node_id=np.array([int(node) for members in sets for node in members], dtype=np.int64),
+        set_type=np.repeat(np.arange(len(sets), dtype=np.int8), [len(members) for members in sets]),
+        set_names=np.array(SET_NAMES),
+        number_of_nodes=np.array(num_of_nodes))
+
+
+# writes the analyser-results like write_results, but from dense node ids (see idmap.IdMap ids) so
+# no string keys are looked up: nodes and scores are the PageRank rows, kinds the index in SET_NAMES
+# of every node (-1 for nodes outside the bow-tie graph, their rows say unclassified) and
+# indegree_rank and indegree the arrays of dense_indegrees. The set section lists the nodes in id order.
+def write_dense_results(location, nodes, scores, kinds, indegree_rank, indegree, ids):
+    counts = np.bincount(kinds[kinds >= 0], minlength=len(SET_NAMES))
+    num_of_nodes = int(counts.sum())
+    nodes = np.asarray(nodes, dtype=np.int64)
+    with open(location, 'w', buffering=CHUNK_SIZE) as file:
+        file.write('PageRank;inDegreeRank;PageRankValue;inDegreeValue;Node id;Url;Type\n')
+        for start in range(0, len(nodes), ROWS_PER_WRITE):
+            chunk = nodes[start:start + ROWS_PER_WRITE]
+            rows = np.flatnonzero(indegree_rank[chunk] > 0)
+            chunk = chunk[rows]
+            names = [set_name(kind) for kind in kinds[chunk].tolist()]
+            file.write(''.join(
+                str(index) + ';' + str(rank) + ';' + str(score) + ';' + str(value) + ';' + str(node_id) + ';' + url
+                + ';' + name + newline for index, rank, score, value, node_id, url, name in zip(
+                    (rows + start).tolist(), indegree_rank[chunk].tolist(), np.asarray(scores)[rows + start].tolist(),
+                    indegree[chunk].tolist(), ids.node_ids[chunk].tolist(), ids.urls(chunk), names)))
+
+        rows = [separator + newline, 'Number of nodes: ' + str(num_of_nodes) + newline]
+        for title, count in zip(SET_TITLES, counts.tolist()):
+            rows.append(title + ' (' + str(count) + ' nodes - ' + str(100 * count / float(num_of_nodes)) + '%)' + newline)
+        rows.append(separator + newline)
+        rows.append('Node id;Type' + newline)
+        file.write(''.join(rows))
+        for kind, name in enumerate(SET_NAMES):
+            members = ids.node_ids[np.flatnonzero(kinds == kind)].tolist()
+            for start in range(0, len(members), ROWS_PER_WRITE):
+                file.write(''.join(str(node_id) + ';' + name + newline for node_id in members[start:start + ROWS_PER_WRITE]))
+
+
+# writes the columns of write_results_binary from dense node ids, see write_dense_results
+def write_dense_results_binary(location, nodes, scores, kinds, indegree_rank, indegree, ids):
+    nodes = np.asarray(nodes, dtype=np.int64)
+    ranks = np.flatnonzero(indegree_rank[nodes] > 0)
+    nodes = nodes[ranks]
+    lengths = ids.url_offsets[nodes + 1] - ids.url_offsets[nodes]
+    members = np.concatenate([np.flatnonzero(kinds == kind) for kind in range(len(SET_NAMES))])
+    np.savez_compressed(
+        location,
+        rank=ranks.astype(np.int32),
+        node_id=ids.node_ids[nodes].astype(np.int64),
+        pagerank=np.asarray(scores, dtype=np.float64)[ranks],
+        indegree_rank=indegree_rank[nodes],
+        indegree=indegree[nodes],
+        type=kinds[nodes].astype(np.int8),
+        url_data=expand(ids.url_offsets, ids.url_data, nodes),
+        url_offsets=np.concatenate(([0], np.cumsum(lengths))).astype(np.int64),
+        set_node_id=ids.node_ids[members].astype(np.int64),
+        set_type=kinds[members].astype(np.int8),
+        set_names=np.array(SET_NAMES),
+        number_of_nodes=np.array(len(members)))
+
 
 def write_items(file, items):
     for item in items:
@@ -197,4 +482,16 @@ def write_items(file, items):
 def print_process(text, current, total, interval):
     if interval > 0:
         if current % interval == 0:
-            print(text, current, divider, total)
\ No newline at end of file
+            print(text, current, divider, total)
+
+# writes the sites of a urltrie.Quotient sorted on their pagerank (the list of Analyzer.generate_sites)
+# with their number of pages, the links within the site and the links from and to other sites
+def write_sites(location, quotient, site_pr):
+    in_weight, out_weight = quotient.in_weight().tolist(), quotient.out_weight().tolist()
+    with open(location, 'w', buffering=CHUNK_SIZE) as file:
+        rows = ['PageRank;PageRankValue;Site;Pages;Internal links;In-links;Out-links' + newline]
+        for index, (group, score) in enumerate(site_pr):
+            rows.append(str(index) + ';' + str(score) + ';' + quotient.graph.label(group) + ';'
+                        + str(quotient.sizes[group]) + ';' + str(quotient.internal[group]) + ';'
+                        + str(in_weight[group]) + ';' + str(out_weight[group]) + newline)
+        file.write(''.join(rows))
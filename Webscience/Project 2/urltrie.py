@@ -0,0 +1,226 @@
+from bisect import bisect_left
+import numpy as np
+from csrgraph import CSRGraph
+
+
+# Splits a url into its host (with the scheme) and the directories of its path, the file name is
+# dropped: http://www.utwente.nl/a/b/index.html gives [http://www.utwente.nl, a, b]
+def url_directories(url):
+    scheme = url.find('://')
+    slash = url.find('/', scheme + 3 if scheme >= 0 else 0)
+    if slash < 0:
+        return [url]
+    return [url[:slash]] + url[slash + 1:].split('/')[:-1]
+
+
+class UrlTrie():
+    '''
+    Trie of the hosts and directories of the urls of the nodes of a graph. The trie nodes are
+    numbered in depth first order with the root (the nodes without a url) as 0, so every subtree is
+    the range of trie nodes from itself up to its end, and the graph nodes are kept sorted on their
+    directory, so the graph nodes below a trie node are one slice as well.
+    '''
+
+    def __init__(self, paths, parents, depths, ends, children, order, offsets, urls):
+        '''
+        :param paths: the url prefix of every trie node, e.g. http://www.utwente.nl/a
+        :param parents: the parent of every trie node, -1 for the root
+        :param depths: 0 for the root, 1 for the hosts, 2 for their directories, ...
+        :param ends: the end of the subtree of every trie node (exclusive)
+        :param children: per trie node the sorted list of (label, trie node) of its children
+        :param order: the graph nodes sorted on the trie node of their directory
+        :param offsets: the graph nodes of trie node i are order[offsets[i]:offsets[i + 1]]
+        :param urls: the url of every graph node
+        '''
+        self.paths = paths
+        self.parents = parents
+        self.depths = depths
+        self.ends = ends
+        self.children = children
+        self.order = order
+        self.offsets = offsets
+        self.urls = urls
+
+    @classmethod
+    def from_urls(cls, urls):
+        '''
+        Builds the trie of the url of every graph node, nodes without a url (empty) belong to the root
+        :param urls: the list of urls of the dense nodes, see IdMap.urls
+        :return the trie:
+        '''
+        # build the trie with dicts first, then number it in depth first order
+        tree, directory = {}, []
+        for url in urls:
+            node = tree
+            if url:
+                for label in url_directories(url):
+                    node = node.setdefault(label, {})
+            directory.append(node)
+        paths, parents, depths, children = [], [], [], []
+        numbers = {}
+        stack = [('', tree, -1, 0)]
+        while stack:
+            path, node, parent, depth = stack.pop()
+            number = len(paths)
+            numbers[id(node)] = number
+            paths.append(path)
+            parents.append(parent)
+            depths.append(depth)
+            labels = sorted(node)
+            children.append(labels)
+            for label in reversed(labels):
+                stack.append((path + '/' + label if depth else label, node[label], number, depth + 1))
+        ends = list(range(1, len(paths) + 1))
+        for number in range(len(paths) - 1, 0, -1):
+            ends[parents[number]] = max(ends[parents[number]], ends[number])
+        # the children are numbered in label order, so their numbers follow from the sorted labels
+        for number, labels in enumerate(children):
+            child, pairs = number + 1, []
+            for label in labels:
+                pairs.append((label, child))
+                child = ends[child]
+            children[number] = pairs
+        dirs = np.fromiter((numbers[id(node)] for node in directory), dtype=np.int64, count=len(directory))
+        order = np.argsort(dirs, kind='stable')
+        offsets = np.zeros(len(paths) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(dirs, minlength=len(paths)), out=offsets[1:])
+        return cls(paths, np.array(parents, dtype=np.int64), np.array(depths, dtype=np.int64),
+                   np.array(ends, dtype=np.int64), children, order, offsets, list(urls))
+
+    @classmethod
+    def from_ids(cls, ids):
+        '''
+        :param ids: an IdMap
+        :return the trie of the urls of its nodes:
+        '''
+        return cls.from_urls(ids.urls(np.arange(len(ids))))
+
+    def __len__(self):
+        return len(self.paths)
+
+    def directory(self):
+        '''
+        :return the trie node of the directory of every graph node:
+        '''
+        dirs = np.empty(len(self.order), dtype=np.int64)
+        dirs[self.order] = np.repeat(np.arange(len(self)), np.diff(self.offsets))
+        return dirs
+
+    def subtree(self, trie_node):
+        '''
+        :param trie_node:
+        :return the graph nodes in the directory of @param trie_node or below it:
+        '''
+        return self.order[self.offsets[trie_node]:self.offsets[self.ends[trie_node]]]
+
+    def find(self, path):
+        '''
+        :param path: a host or directory, e.g. http://www.utwente.nl/a
+        :return its trie node, -1 if it has no pages:
+        '''
+        node = 0
+        for label in url_directories(path + '/'):
+            node = dict(self.children[node]).get(label, -1)
+            if node < 0:
+                break
+        return node
+
+    def nodes(self, prefix):
+        '''
+        Returns the graph nodes whose url starts with @param prefix, like url.startswith(prefix) but
+        without looking at every url: the trie is followed down the directories of the prefix, whole
+        subtrees match once the prefix ends and only the pages along the way are compared one by one
+        :param prefix:
+        :return the sorted array of graph nodes:
+        '''
+        found, node = [], 0
+        if not prefix:
+            return np.sort(self.subtree(0))
+        while node >= 0:
+            # the pages directly in this directory, e.g. http://www.utwente.nl/in matches index.html
+            pages = self.order[self.offsets[node]:self.offsets[node + 1]]
+            found.append(np.array([page for page in pages.tolist() if self.urls[page].startswith(prefix)],
+                                  dtype=np.int64))
+            if node:
+                if len(prefix) <= len(self.paths[node]) or prefix[len(self.paths[node])] != '/':
+                    break
+                rest = prefix[len(self.paths[node]) + 1:]
+            else:
+                rest = prefix
+            children = self.children[node]
+            labels = [label for label, child in children]
+            # every child whose label starts with the rest of the prefix matches as a whole
+            position = bisect_left(labels, rest)
+            while position < len(labels) and labels[position].startswith(rest):
+                found.append(self.subtree(children[position][1]))
+                position += 1
+            # the prefix continues below at most one child
+            label = url_directories(rest)[0] if node == 0 else rest.split('/')[0]
+            position = bisect_left(labels, label)
+            matches = position < len(labels) and labels[position] == label and len(rest) > len(label)
+            node = children[position][1] if matches else -1
+        return np.unique(np.concatenate(found)) if found else np.zeros(0, dtype=np.int64)
+
+    def groups(self, depth):
+        '''
+        :param depth: 1 to group on host, 2 on the first directory, ...
+        :return the trie node of the directory (at most @param depth deep) of every graph node:
+        '''
+        ancestors = np.arange(len(self), dtype=np.int64)
+        while True:
+            deeper = self.depths[ancestors] > depth
+            if not deeper.any():
+                break
+            ancestors[deeper] = self.parents[ancestors[deeper]]
+        return ancestors[self.directory()]
+
+    def collapse(self, graph, depth):
+        '''
+        Collapses the graph to the graph between the hosts (depth 1) or directories of at most
+        @param depth deep, the weight of an edge is the number of links between the two groups
+        :param graph: a CSRGraph over the same dense nodes as the trie
+        :param depth:
+        :return the Quotient:
+        '''
+        groups = self.groups(depth)
+        used, groups = np.unique(groups, return_inverse=True)
+        sources, targets = groups[graph.edge_sources()], groups[graph.out_targets]
+        between = sources != targets
+        n = len(used)
+        keys, weights = np.unique(sources[between] * n + targets[between], return_counts=True)
+        # from_dense_edges sorts the edges on the same keys, so the weights line up with out_targets
+        labels = np.empty(n, dtype=object)
+        labels[:] = [self.paths[node] for node in used.tolist()]
+        quotient = CSRGraph.from_dense_edges(keys // n, keys % n, n, labels)
+        internal = np.bincount(sources[~between], minlength=n)
+        return Quotient(quotient, weights, internal, np.bincount(groups, minlength=n), used)
+
+
+class Quotient():
+    '''
+    The graph between groups of nodes (hosts or directories) of a UrlTrie. Its node_ids are the url
+    prefixes of the groups, weights is parallel to out_targets and counts the links of every edge.
+    '''
+
+    def __init__(self, graph, weights, internal, sizes, trie_nodes):
+        '''
+        :param graph: the CSRGraph between the groups
+        :param weights: the number of links of every edge of graph
+        :param internal: the number of links within every group
+        :param sizes: the number of nodes of every group
+        :param trie_nodes: the trie node of every group
+        '''
+        self.graph = graph
+        self.weights = weights
+        self.internal = internal
+        self.sizes = sizes
+        self.trie_nodes = trie_nodes
+
+    def __len__(self):
+        return self.graph.number_of_nodes()
+
+    def in_weight(self):
+        return np.bincount(self.graph.out_targets, weights=self.weights, minlength=len(self)).astype(np.int64)
+
+    def out_weight(self):
+        return np.bincount(self.graph.edge_sources(), weights=self.weights, minlength=len(self)).astype(np.int64)
@@ -0,0 +1,250 @@
+import random
+import time
+from threading import Event, Lock, Thread
+
+# the quota units the YouTube API charges per call
+SEARCH_COST = 100
+VIDEOS_COST = 1
+# the maximum number of ids of one videos().list call
+MAX_IDS_PER_CALL = 50
+
+
+class TokenBucket:
+
+    def __init__(self, rate, capacity):
+        """
+        Thread-safe token bucket rate limiter, shared by all walkers so that together they stay
+        under the quota.
+
+        :param rate: the number of tokens (quota units) added per second
+        :param capacity: the maximum number of tokens, the largest burst
+        """
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.last = time.monotonic()
+        self.lock = Lock()
+
+    def acquire(self, tokens=1, cancel=None):
+        """
+        Blocks until the tokens are available and takes them.
+
+        :param tokens: the number of tokens needed, at most the capacity
+        :param cancel: an Event which stops the waiting when it is set
+        :return: whether the tokens were taken, False if cancelled
+        """
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
+                self.last = now
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return True
+                wait = (tokens - self.tokens) / self.rate
+            if cancel is None:
+                time.sleep(wait)
+            elif cancel.wait(wait):
+                return False
+
+
+class Cancelled(Exception):
+    """
+    Raised by the meter of an engine when the crawl is cancelled while waiting for the rate limiter.
+    """
+    pass
+
+
+class CrawlEngine:
+
+    def __init__(self, client, walkers=4, rate=10.0, capacity=200, shared_frontier=False, errors=(), seed=None):
+        """
+        Runs several random walks over the YouTube recommendations at once, like create_own_data
+        does with one. The walkers share the fetched videos, a rate limiter and a cancellation Event.
+
+        :param client: a YouTubeCrawler or anything with its get_songs_info, search_recommended and meter,
+         the client calls the meter before every API call it makes
+        :param walkers: the number of walkers (threads)
+        :param rate: the quota units per second all walkers may use together
+        :param capacity: the quota units which may be used at once, at least SEARCH_COST
+        :param shared_frontier: whether the walkers choose their next video from all videos found by
+         any walker and not visited yet, instead of from their own recommendations only
+        :param errors: the exception types of a failed API call, a walker reports them and goes on
+        :param seed: makes the choices of the walkers repeatable
+        """
+        self.client = client
+        self.walkers = walkers
+        self.limiter = TokenBucket(rate, max(capacity, SEARCH_COST))
+        self.shared_frontier = shared_frontier
+        self.errors = tuple(errors)
+        self.seed = seed
+        self.stop = Event()
+        self.lock = Lock()
+        self.vid_dict = dict()
+        self.json_data = []
+        self.frontier = dict()
+        self.visited = set()
+        self.calls = {'search': 0, 'videos': 0}
+        self.quota = 0
+
+    def cancel(self):
+        """
+        Stops all walkers after their current call.
+        """
+        self.stop.set()
+
+    def meter(self, kind, cost):
+        """
+        Waits until the rate limiter allows an API call and counts it. The client calls it for
+        every call it actually makes, so answers from its cache cost no quota.
+
+        :param kind: search or videos, for the counters
+        :param cost: the quota units of the call
+        :raise Cancelled: if the crawl is cancelled while waiting
+        """
+        if not self.limiter.acquire(cost, self.stop):
+            raise Cancelled()
+        with self.lock:
+            self.calls[kind] += 1
+            self.quota += cost
+
+    def call(self, function, *args):
+        """
+        Calls the client, which waits for the meter before every API call.
+
+        :param function: the method of the client
+        :return: the result of the call, None if cancelled
+        """
+        try:
+            return function(*args)
+        except Cancelled:
+            return None
+
+    def store(self, video_id, title, data_item, min_views):
+        """
+        Adds a fetched video to the shared results.
+
+        :param video_id:
+        :param title:
+        :param data_item: the statistics and snippet of the video
+        :param min_views: video's with less views are not added
+        :return: whether the video is new and has enough views
+        """
+        views = int(data_item['statistics']['viewCount'])
+        if views < min_views:
+            return False
+        with self.lock:
+            self.json_data.append(data_item)
+            if video_id in self.vid_dict:
+                return False
+            self.vid_dict[video_id] = (views, title)
+            if video_id not in self.visited:
+                self.frontier[video_id] = title
+            return True
+
+    def choose(self, candidates, rng, random_choice):
+        """
+        Chooses the next video like create_own_data: randomly, or with 80% chance the most viewed one.
+
+        :param candidates: list of tuples of id's and titles
+        :param rng: the random generator of the walker
+        :param random_choice: whether to always choose randomly
+        :return: the chosen video, None if there are no candidates
+        """
+        if not candidates:
+            return None
+        if random_choice or rng.randint(0, 5) < 1:
+            return candidates[rng.randint(0, len(candidates) - 1)]
+        return max(candidates, key=lambda candidate: self.vid_dict[candidate[0]][0])
+
+    def next_video(self, candidates, rng, random_choice):
+        """
+        Chooses the next video of a walker and marks it visited. A walker without new
+        recommendations continues from the videos found by the others.
+
+        :param candidates: the new recommendations of the walker
+        :param rng: the random generator of the walker
+        :param random_choice:
+        :return: the chosen video, None if there is nothing left to visit
+        """
+        with self.lock:
+            if self.shared_frontier or not candidates:
+                candidates = sorted(self.frontier.items())
+            video = self.choose(candidates, rng, random_choice)
+            if video is not None:
+                self.visited.add(video[0])
+                self.frontier.pop(video[0], None)
+            return video
+
+    def walk(self, walker, start_video_id, num_hops, num_recommendations, min_views, random_choice):
+        """
+        One walker: hops from video to recommended video until num_hops, cancellation or a dead end.
+
+        :param walker: the number of the walker
+        :param start_video_id:
+        :param num_hops: number of video-search iterations to make
+        :param num_recommendations: number of recommendations used to choose from
+        :param min_views: video's with less views will be skipped
+        :param random_choice: see create_own_data
+        """
+        rng = random.Random(None if self.seed is None else self.seed + walker)
+        try:
+            song_info = self.call(self.client.get_songs_info, [start_video_id], "snippet,statistics")
+        except self.errors as e:
+            print("Walker " + str(walker) + ": an API error occurred: " + str(e))
+            return
+        if not song_info or start_video_id not in song_info:
+            return
+        curr_video = (start_video_id, song_info[start_video_id]['snippet']['title'])
+        with self.lock:
+            self.visited.add(curr_video[0])
+            self.vid_dict.setdefault(curr_video[0], (int(song_info[curr_video[0]]['statistics']['viewCount']),
+                                                     curr_video[1]))
+        for i in range(2, num_hops + 1):
+            if self.stop.is_set():
+                break
+            try:
+                results = self.call(self.client.search_recommended, curr_video[0], num_recommendations)
+                if results is None:
+                    break
+                data_items = self.call(self.client.get_songs_info, [result[0] for result in results],
+                                       "statistics,snippet")
+                if data_items is None:
+                    break
+                candidates = [result for result in results if result[0] in data_items
+                              and self.store(result[0], result[1], data_items[result[0]], min_views)]
+            except self.errors as e:
+                # like create_own_data the walker tries the same video again
+                print("Walker " + str(walker) + ": an API error occurred: " + str(e))
+                continue
+            curr_video = self.next_video(candidates, rng, random_choice)
+            if curr_video is None:
+                break
+
+    def run(self, start_video_ids, num_hops, num_recommendations, min_views, random_choice):
+        """
+        Runs the walkers until they are done or cancelled, the walkers take turns in
+        start_video_ids.
+
+        :param start_video_ids: the ids of the base videos
+        :param num_hops: number of video-search iterations per walker
+        :param num_recommendations: number of recommendations used to choose from
+        :param min_views: video's with less views will be skipped
+        :param random_choice: see create_own_data
+        :return: the fetched video's sorted to number of views
+        """
+        threads = []
+        self.client.meter = self.meter
+        try:
+            for walker in range(self.walkers):
+                thread = Thread(target=self.walk, args=(walker, start_video_ids[walker % len(start_video_ids)],
+                                                        num_hops, num_recommendations, min_views, random_choice))
+                thread.daemon = True
+                thread.start()
+                threads.append(thread)
+            for thread in threads:
+                thread.join()
+        finally:
+            self.client.meter = None
+        return sorted(self.vid_dict.items(), key=lambda x: x[1][0], reverse=True)
+
@@ -0,0 +1,308 @@
+import base64
+import hashlib
+import heapq
+import json
+import math
+import os
+from threading import Event
+from CrawlEngine import TokenBucket, Cancelled, SEARCH_COST
+
+# the orders in which the frontier is crawled
+POLICIES = ('bfs', 'most-viewed')
+
+
+class BloomFilter:
+
+    def __init__(self, capacity, error_rate=0.001, bits=None):
+        """
+        Compact set of video ids: a bit array in which every id sets a few bits. It never forgets
+        an id, but with error_rate chance it claims to contain an id it does not, once capacity
+        ids are added. About 1.8 bytes per id at an error rate of 0.001.
+
+        :param capacity: the expected number of ids
+        :param error_rate: the chance of a false positive at capacity ids
+        :param bits: the bit array of an earlier filter with the same capacity and error rate
+        """
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = int(math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, int(round(self.size / float(capacity) * math.log(2))))
+        self.bits = bytearray(bits) if bits is not None else bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def positions(self, video_id):
+        """
+        :param video_id:
+        :return: the bits of the id, by double hashing one digest
+        """
+        digest = hashlib.blake2b(video_id.encode('utf-8'), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    def add(self, video_id):
+        for position in self.positions(video_id):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, video_id):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self.positions(video_id))
+
+    def state(self):
+        """
+        :return: the filter as JSON, see from_state
+        """
+        return {'capacity': self.capacity, 'error_rate': self.error_rate, 'count': self.count,
+                'bits': base64.b64encode(bytes(self.bits)).decode('ascii')}
+
+    @staticmethod
+    def from_state(state):
+        bloom = BloomFilter(state['capacity'], state['error_rate'], base64.b64decode(state['bits']))
+        bloom.count = state['count']
+        return bloom
+
+
+class Frontier:
+
+    def __init__(self, policy='most-viewed', heap=None, counter=0):
+        """
+        The videos found but not crawled yet, as a priority queue: in the order they were found
+        (bfs) or the most viewed first (most-viewed).
+
+        :param policy: one of POLICIES
+        :param heap: the heap of an earlier frontier, see state
+        :param counter: the number of videos pushed on the earlier frontier
+        """
+        if policy not in POLICIES:
+            raise ValueError("Unknown policy: " + str(policy) + ", expected one of " + ", ".join(POLICIES))
+        self.policy = policy
+        self.heap = [tuple(entry) for entry in heap or []]
+        self.counter = counter
+
+    def push(self, video_id, title, views):
+        priority = -views if self.policy == 'most-viewed' else 0
+        heapq.heappush(self.heap, (priority, self.counter, video_id, title, views))
+        self.counter += 1
+
+    def peek(self):
+        """
+        :return: the next video as a tuple of id, title and views, it stays in the frontier
+        """
+        return self.heap[0][2:]
+
+    def pop(self):
+        """
+        :return: the next video, see peek
+        """
+        return heapq.heappop(self.heap)[2:]
+
+    def __len__(self):
+        return len(self.heap)
+
+    def state(self):
+        return {'policy': self.policy, 'heap': self.heap, 'counter': self.counter}
+
+    @staticmethod
+    def from_state(state):
+        return Frontier(state['policy'], state['heap'], state['counter'])
+
+
+class FrontierCrawler:
+
+    def __init__(self, client, directory, policy='most-viewed', capacity=1000000, num_recommendations=10,
+                 min_views=0, checkpoint_every=100, rate=10.0, errors=(), max_failures=10, backoff=1.0):
+        """
+        Crawls YouTube from a frontier instead of walking: every crawled video adds its unseen
+        recommendations to the frontier. The data of every found video is appended to
+        directory/videos.jsonl right away, and every checkpoint_every crawled videos the frontier,
+        the seen ids and the counters are written to directory/checkpoint.json, from where an
+        interrupted crawl resumes.
+
+        :param client: a YouTubeCrawler or anything with its get_songs_info, search_recommended and meter,
+         see CrawlEngine
+        :param directory: where the results and the checkpoint are written
+        :param policy: one of POLICIES
+        :param capacity: the expected number of seen videos, for the Bloom filter
+        :param num_recommendations: number of recommendations of every crawled video
+        :param min_views: video's with less views are not stored or crawled
+        :param checkpoint_every: the number of crawled videos between checkpoints
+        :param rate: the quota units per second, see CrawlEngine
+        :param errors: the exception types of a failed API call, the video is crawled again
+        :param max_failures: the crawl stops (resumable) after this many failed calls in a row
+        :param backoff: the seconds waited after a failed call, doubled for every next failure
+        """
+        self.client = client
+        self.directory = directory
+        self.num_recommendations = num_recommendations
+        self.min_views = min_views
+        self.checkpoint_every = checkpoint_every
+        self.limiter = TokenBucket(rate, SEARCH_COST)
+        self.errors = tuple(errors)
+        self.max_failures = max_failures
+        self.backoff = backoff
+        self.stop = Event()
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        state = self.load_checkpoint()
+        if state is None:
+            self.frontier = Frontier(policy)
+            self.seen = BloomFilter(capacity)
+            self.crawled = self.found = self.quota = 0
+            self.results_size = 0
+        else:
+            self.frontier = Frontier.from_state(state['frontier'])
+            self.seen = BloomFilter.from_state(state['seen'])
+            self.crawled, self.found, self.quota = state['crawled'], state['found'], state['quota']
+            self.results_size = state['results_size']
+        # the results written after the last checkpoint are written again
+        with open(self.results_location(), 'a') as results_file:
+            results_file.truncate(self.results_size)
+
+    def results_location(self):
+        return os.path.join(self.directory, 'videos.jsonl')
+
+    def checkpoint_location(self):
+        return os.path.join(self.directory, 'checkpoint.json')
+
+    def resumed(self):
+        """
+        :return: whether the crawl continues from a checkpoint
+        """
+        return self.crawled > 0 or len(self.frontier) > 0
+
+    def load_checkpoint(self):
+        """
+        :return: the state of the last checkpoint, None if there is none
+        """
+        try:
+            with open(self.checkpoint_location(), 'r') as checkpoint_file:
+                return json.load(checkpoint_file)
+        except (IOError, ValueError):
+            return None
+
+    def checkpoint(self):
+        """
+        Writes the state of the crawl, first under a temporary name so a crash never leaves half a checkpoint.
+        """
+        state = {'frontier': self.frontier.state(), 'seen': self.seen.state(), 'crawled': self.crawled,
+                 'found': self.found, 'quota': self.quota, 'results_size': self.results_size}
+        temporary = self.checkpoint_location() + '.tmp'
+        with open(temporary, 'w') as checkpoint_file:
+            json.dump(state, checkpoint_file)
+        os.replace(temporary, self.checkpoint_location())
+
+    def cancel(self):
+        """
+        Stops the crawl after the current video, it can be resumed from the checkpoint.
+        """
+        self.stop.set()
+
+    def meter(self, kind, cost):
+        """
+        See CrawlEngine.meter, only the quota is counted.
+        """
+        if not self.limiter.acquire(cost, self.stop):
+            raise Cancelled()
+        self.quota += cost
+
+    def call(self, function, *args):
+        """
+        :return: the result of the client call, None if cancelled
+        """
+        try:
+            return function(*args)
+        except Cancelled:
+            return None
+
+    def store(self, results_file, candidates, data_items, min_views):
+        """
+        Marks the candidates seen, writes and queues those with enough views.
+
+        :param results_file: the open results file
+        :param candidates: list of tuples of id's and titles, not seen before
+        :param data_items: the fetched data of the candidates by id
+        :param min_views: video's with less views are not written or queued
+        """
+        rows = []
+        for video_id, title in candidates:
+            self.seen.add(video_id)
+            data_item = data_items.get(video_id)
+            if data_item is None:
+                continue
+            views = int(data_item['statistics']['viewCount'])
+            if views < min_views:
+                continue
+            rows.append(json.dumps(data_item, sort_keys=True) + "\n")
+            self.frontier.push(video_id, title, views)
+            self.found += 1
+        results_file.write("".join(rows))
+        results_file.flush()
+        self.results_size = results_file.tell()
+
+    def crawl(self, start_video_ids, max_videos):
+        """
+        Crawls until max_videos videos are found, the frontier is empty, the crawl is cancelled or
+        too many calls failed. When resuming only the start videos which were not found yet (failed
+        or unavailable before) are fetched again.
+
+        :param start_video_ids: the ids of the base videos
+        :param max_videos: the number of videos to find, including those of earlier runs
+        :return: the number of videos found
+        """
+        failures = 0
+        start = [video_id for video_id in dict.fromkeys(start_video_ids) if video_id not in self.seen]
+        self.client.meter = self.meter
+        try:
+            with open(self.results_location(), 'a') as results_file:
+                while (start or len(self.frontier)) and self.found < max_videos and not self.stop.is_set():
+                    try:
+                        if start:
+                            data_items = self.call(self.client.get_songs_info, start, "snippet,statistics")
+                            if data_items is None:
+                                break
+                        else:
+                            # the video leaves the frontier once it is crawled, a failed one is tried again first
+                            video_id, title, views = self.frontier.peek()
+                            results = self.call(self.client.search_recommended, video_id, self.num_recommendations)
+                            candidates = [result for result in dict(results or []).items()
+                                          if result[0] not in self.seen]
+                            data_items = {}
+                            if candidates:
+                                data_items = self.call(self.client.get_songs_info,
+                                                       [result[0] for result in candidates], "statistics,snippet")
+                            if results is None or data_items is None:
+                                # cancelled while waiting for the rate limiter
+                                break
+                    except self.errors as e:
+                        failures += 1
+                        print("An API error occurred (" + str(failures) + " in a row): " + str(e))
+                        if failures >= self.max_failures or self.stop.wait(self.backoff * 2 ** (failures - 1)):
+                            break
+                        continue
+                    failures = 0
+                    if start:
+                        # like create_own_data the start videos are crawled whatever their views, the
+                        # unavailable ones stay unseen so a next run tries them again
+                        self.store(results_file, [(video_id, data_items[video_id]['snippet']['title'])
+                                                  for video_id in start if video_id in data_items], data_items, 0)
+                        start = []
+                        continue
+                    self.frontier.pop()
+                    self.store(results_file, candidates, data_items, self.min_views)
+                    self.crawled += 1
+                    if self.crawled % self.checkpoint_every == 0:
+                        self.checkpoint()
+        finally:
+            self.client.meter = None
+        self.checkpoint()
+        return self.found
+
+
+def load_results(directory):
+    """
+    Reads the data of all videos found by a FrontierCrawler, like the json file of create_own_data.
+
+    :param directory: the directory of the crawl
+    :return: list of the data (JSON) of the videos
+    """
+    with open(os.path.join(directory, 'videos.jsonl'), 'r') as results_file:
+        return [json.loads(line) for line in results_file if line.strip()]
@@ -0,0 +1,167 @@
+import json
+import math
+import sqlite3
+import time
+from threading import Lock
+from CrawlEngine import SEARCH_COST, VIDEOS_COST, MAX_IDS_PER_CALL
+
+# seconds an answer stays valid per kind: search results and the parts of a video
+DEFAULT_TTLS = {'search': 24 * 3600, 'statistics': 3600, 'snippet': 30 * 24 * 3600}
+DEFAULT_TTL = 24 * 3600
+
+
+class ResponseCache:
+
+    def __init__(self, location, ttls=None, max_entries=100000, clock=time.time):
+        """
+        Persistent cache of YouTube API answers in an SQLite file. Search results are kept per
+        video and number of results, videos per id and part, so that every part can have its own
+        time to live. When it holds more than max_entries the least recently used are removed.
+        The hits, misses and the quota units spent and saved are counted per endpoint over all runs.
+
+        :param location: the SQLite file
+        :param ttls: dict of seconds to live per kind (search or a part like statistics), see DEFAULT_TTLS
+        :param max_entries: the maximum number of cached answers
+        :param clock: returns the current time in seconds
+        """
+        self.ttls = dict(DEFAULT_TTLS)
+        self.ttls.update(ttls or {})
+        self.max_entries = max_entries
+        self.clock = clock
+        self.lock = Lock()
+        # the walkers of a CrawlEngine share the connection
+        self.connection = sqlite3.connect(location, check_same_thread=False)
+        self.connection.execute("CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, kind TEXT, value TEXT, "
+                                "created REAL, used REAL)")
+        self.connection.execute("CREATE INDEX IF NOT EXISTS entries_used ON entries (used)")
+        self.connection.execute("CREATE TABLE IF NOT EXISTS stats (endpoint TEXT PRIMARY KEY, hits INTEGER, "
+                                "misses INTEGER, spent INTEGER, saved INTEGER)")
+        self.connection.commit()
+
+    def ttl(self, kind):
+        return self.ttls.get(kind, DEFAULT_TTL)
+
+    def get(self, kind, key):
+        """
+        Gets an answer which is not expired yet and marks it as used.
+
+        :param kind: search or a part of a video
+        :param key: the parameters of the answer
+        :return: the answer, None if it is not cached or expired
+        """
+        key = kind + ":" + key
+        now = self.clock()
+        with self.lock:
+            row = self.connection.execute("SELECT value, created FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None or now - row[1] > self.ttl(kind):
+                return None
+            self.connection.execute("UPDATE entries SET used = ? WHERE key = ?", (now, key))
+        return json.loads(row[0])
+
+    def put(self, answers):
+        """
+        Stores answers in one transaction, the least recently used answers are removed when the
+        cache is full.
+
+        :param answers: list of tuples of the kind (search or a part of a video), the parameters
+         and the answer (JSON)
+        """
+        now = self.clock()
+        with self.lock:
+            self.connection.executemany("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)",
+                                        [(kind + ":" + key, kind, json.dumps(value), now, now)
+                                         for kind, key, value in answers])
+            size = self.connection.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            if size > self.max_entries:
+                self.connection.execute("DELETE FROM entries WHERE key IN (SELECT key FROM entries "
+                                        "ORDER BY used LIMIT ?)", (size - self.max_entries,))
+            self.connection.commit()
+
+    def record(self, endpoint, hits, misses, spent, saved):
+        """
+        Adds to the counters of an endpoint.
+
+        :param endpoint: search or videos
+        :param hits: the answers which came from the cache
+        :param misses: the answers which were fetched
+        :param spent: the quota units of the calls made
+        :param saved: the quota units of the calls the cache made unnecessary
+        """
+        with self.lock:
+            self.connection.execute("INSERT OR IGNORE INTO stats VALUES (?, 0, 0, 0, 0)", (endpoint,))
+            self.connection.execute("UPDATE stats SET hits = hits + ?, misses = misses + ?, spent = spent + ?, "
+                                    "saved = saved + ? WHERE endpoint = ?", (hits, misses, spent, saved, endpoint))
+            self.connection.commit()
+
+    def stats(self):
+        """
+        :return: dict of the hits, misses and quota units spent and saved per endpoint
+        """
+        with self.lock:
+            rows = self.connection.execute("SELECT endpoint, hits, misses, spent, saved FROM stats").fetchall()
+        return dict((row[0], {'hits': row[1], 'misses': row[2], 'spent': row[3], 'saved': row[4]}) for row in rows)
+
+    def search(self, video_id, max_results, fetch):
+        """
+        Gets the recommended songs of a video from the cache, or with fetch.
+
+        :param video_id: the id of the base video
+        :param max_results: the requested number of recommendations
+        :param fetch: called with video_id and max_results when the answer is not cached
+        :return: the recommended songs as a tuple list of id's and titles
+        """
+        key = video_id + ":" + str(max_results)
+        videos = self.get('search', key)
+        if videos is not None:
+            self.record('search', 1, 0, 0, SEARCH_COST)
+            return [tuple(video) for video in videos]
+        videos = fetch(video_id, max_results)
+        self.put([('search', key, videos)])
+        self.record('search', 0, 1, SEARCH_COST, 0)
+        return videos
+
+    def videos(self, video_ids, parts, fetch):
+        """
+        Gets the requested parts of songs from the cache, the songs of which any part is missing
+        or expired are fetched (all their parts, in as few calls as fetch makes).
+
+        :param video_ids: the ids of the videos, without duplicates
+        :param parts: the requested parts, comma separated
+        :param fetch: called with the missing ids and parts, returns a dict of data by id
+        :return: a dict of the resulting data (JSON) by video id, unavailable videos are left out
+        """
+        songs, missing = dict(), []
+        parts = [part.strip() for part in parts.split(",")]
+        for video_id in video_ids:
+            song = {'kind': 'youtube#video', 'id': video_id}
+            for part in parts:
+                value = self.get(part, video_id)
+                if value is None:
+                    missing.append(video_id)
+                    break
+                song[part] = value
+            else:
+                songs[video_id] = song
+        fetched = fetch(missing, ",".join(parts)) if missing else dict()
+        self.put([(part, video_id, item[part]) for video_id, item in fetched.items() for part in parts if part in item])
+        songs.update(fetched)
+        calls = int(math.ceil(len(missing) / float(MAX_IDS_PER_CALL)))
+        saved = int(math.ceil(len(video_ids) / float(MAX_IDS_PER_CALL))) - calls
+        self.record('videos', len(video_ids) - len(missing), len(missing), calls * VIDEOS_COST, saved * VIDEOS_COST)
+        return songs
+
+    def report(self):
+        """
+        :return: the counters as text, with the hit rate per endpoint
+        """
+        lines = []
+        for endpoint, counts in sorted(self.stats().items()):
+            total = counts['hits'] + counts['misses']
+            lines.append(endpoint + ": " + str(counts['hits']) + " hits, " + str(counts['misses']) + " misses ("
+                         + str(round(100.0 * counts['hits'] / total, 1) if total else 0.0) + "% hits), quota spent "
+                         + str(counts['spent']) + ", saved " + str(counts['saved']))
+        return "\n".join(lines)
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
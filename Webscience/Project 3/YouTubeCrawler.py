@@ -3,8 +3,11 @@ from apiclient.errors import HttpError
 from oauth2client.tools import argparser
 import matplotlib.pyplot as plt
 import random
-from threading import Thread
+from threading import Thread, Event
 import json
+from CrawlEngine import CrawlEngine, MAX_IDS_PER_CALL, SEARCH_COST, VIDEOS_COST
+from FrontierCrawl import FrontierCrawler, load_results
+from ResponseCache import ResponseCache
 
 DEVELOPER_KEY = "DL}dV|GIMwtMpF3F0jMpmEO;bunFJU}PqEWYvf\\"
 YOUTUBE_READONLY_SCOPE = "https://www.googleapis.com/youtube/v3/activities"
@@ -15,16 +18,31 @@ YOUTUBE_API_VERSION = "v3"
 class YouTubeCrawler:
 
     youtube_api = None
+    # called with the kind and quota units before every API call, set by the engine which crawls
+    meter = None
 
-    def __init__(self, n):
+    def __init__(self, n, cache=None):
         """
         Initializes the Youtube API connection.
 
         :param n: the cyclic encryption key
+        :param cache: a ResponseCache for the answers of the API, None to always use the API
         """
         self.youtube_api = build(YOUTUBE_API_SERVICE_NAME, YOUTUBE_API_VERSION,
                              developerKey=self.very_safe(DEVELOPER_KEY, n))
+        self.cache = cache
 
+    def execute(self, kind, request):
+        """
+        Executes an API request, once the meter allows it.
+
+        :param kind: search or videos
+        :param request: the request of the API
+        :return: the response (JSON)
+        """
+        if self.meter is not None:
+            self.meter(kind, SEARCH_COST if kind == 'search' else VIDEOS_COST)
+        return request.execute()
 
     def get_song_info(self, video_id, parts):
         """
@@ -34,12 +52,46 @@ class YouTubeCrawler:
         :param parts: the requested parts (snippet, id etc)
         :return: the resulting data (JSON)
         """
-        search_response = self.youtube_api.videos().list(
+        if self.cache is not None:
+            return self.get_songs_info([video_id], parts)[video_id]
+        search_response = self.execute('videos', self.youtube_api.videos().list(
             part=parts,
             id=video_id
-        ).execute()
+        ))
         return search_response['items'][0]
 
+    def get_songs_info(self, video_ids, parts):
+        """
+        Gets the requested parts of several songs using as few API calls as possible,
+        every call asks for up to MAX_IDS_PER_CALL comma separated ids.
+
+        :param video_ids: the ids of the videos on YouTube, duplicates are fetched once
+        :param parts: the requested parts (snippet, id etc)
+        :return: a dict of the resulting data (JSON) by video id, unavailable videos are left out
+        """
+        video_ids = list(dict.fromkeys(video_ids))
+        if self.cache is not None:
+            return self.cache.videos(video_ids, parts, self.fetch_songs_info)
+        return self.fetch_songs_info(video_ids, parts)
+
+    def fetch_songs_info(self, video_ids, parts):
+        """
+        Gets the requested parts of several songs from the API, see get_songs_info.
+
+        :param video_ids: the ids of the videos on YouTube, without duplicates
+        :param parts: the requested parts (snippet, id etc)
+        :return: a dict of the resulting data (JSON) by video id
+        """
+        songs = dict()
+        for start in range(0, len(video_ids), MAX_IDS_PER_CALL):
+            search_response = self.execute('videos', self.youtube_api.videos().list(
+                part=parts,
+                id=",".join(video_ids[start:start + MAX_IDS_PER_CALL])
+            ))
+            for item in search_response.get("items", []):
+                songs[item['id']] = item
+        return songs
+
     def search_recommended(self, start_video_id, max_results):
         """
         Gets the recommended songs of the base video using the API.
@@ -48,12 +100,24 @@ class YouTubeCrawler:
         :param max_results: the requested number of recommendations
         :return: the recommended songs as a tuple list of id's and titles
         """
-        search_response = self.youtube_api.search().list(
+        if self.cache is not None:
+            return self.cache.search(start_video_id, max_results, self.fetch_recommended)
+        return self.fetch_recommended(start_video_id, max_results)
+
+    def fetch_recommended(self, start_video_id, max_results):
+        """
+        Gets the recommended songs of the base video from the API, see search_recommended.
+
+        :param start_video_id: the id of the base video
+        :param max_results: the requested number of recommendations
+        :return: the recommended songs as a tuple list of id's and titles
+        """
+        search_response = self.execute('search', self.youtube_api.search().list(
             part="snippet",
             type="video",
             relatedToVideoId=start_video_id,
             maxResults=max_results
-        ).execute()
+        ))
         videos = []
         for search_result in search_response.get("items", []):
             if search_result["id"]["kind"] == "youtube#video":
@@ -75,13 +139,27 @@ class YouTubeCrawler:
         return crypt
 
 
-def wait_for_input():
+def wait_for_input(stop):
     """
-    Blocking function which waits for any input.
+    Blocking function which waits for any input and then signals the crawl to stop.
 
+    :param stop: the function which stops the crawl, e.g. the set of an Event
     :return: the input
     """
-    return input('')
+    line = input('')
+    stop()
+    return line
+
+
+def start_stop_thread(stop):
+    """
+    Starts the daemon thread which stops the crawl on any input.
+
+    :param stop: see wait_for_input
+    """
+    stop_thread = Thread(target=wait_for_input, args=(stop,))
+    stop_thread.daemon = True
+    stop_thread.start()
 
 
 def investigate_view_power_law(video_data):
@@ -105,6 +183,34 @@ def investigate_view_power_law(video_data):
     plt.xlabel('Total number of views')
     plt.show()
 
+
+def keep_recommendations(results, data_items, min_views, vid_dict, data):
+    """
+    Stores the fetched recommendations with enough views and returns those seen for the first time,
+    the ones create_own_data chooses the next video from.
+
+    :param results: the recommended songs as a tuple list of id's and titles
+    :param data_items: the fetched data of the recommendations by id, unavailable videos are left out
+    :param min_views: video's with less views will be skipped
+    :param vid_dict: the views and title of every video seen so far by id, new video's are added
+    :param data: list to which the data of every recommendation with enough views is appended
+    :return: the new recommendations with enough views, in the order of results
+    """
+    kept = []
+    for result in results:
+        if result[0] not in data_items:
+            continue
+        data_item = data_items[result[0]]
+        views = int(data_item['statistics']['viewCount'])
+        if views < min_views:
+            continue
+        data.append(data_item)
+        if result[0] not in vid_dict:
+            vid_dict[result[0]] = (views, result[1])
+            kept.append(result)
+    return kept
+
+
 def create_own_data(youtube_api, start_video_id, num_hops, num_recommendations, min_views, random_choice):
     """
     Crawls YouTube starting with the specified behavior from the start video and writes
@@ -120,14 +226,13 @@ def create_own_data(youtube_api, start_video_id, num_hops, num_recommendations,
     :return: the fetched video's sorted to number of views
     """
 
-    stop_thread = Thread(target = wait_for_input, args=())
-    stop_thread.setDaemon(True)
-    stop_thread.start()
+    stop = Event()
+    start_stop_thread(stop.set)
     random.seed()
 
     json_data = []
     vid_dict = dict()
-    song_info = yt.get_song_info(start_video_id, "snippet,statistics")
+    song_info = youtube_api.get_song_info(start_video_id, "snippet,statistics")
     curr_video = (start_video_id, song_info['snippet']['title'])
     print("YouTube crawler started - type any key to stop")
     print("Start video (1): " + str(curr_video[1]) + " (" + str(curr_video[0]) + ")")
@@ -136,29 +241,20 @@ def create_own_data(youtube_api, start_video_id, num_hops, num_recommendations,
     for i in range(2, num_hops + 1):
         try:
             # get recommended video's
-            results = yt.search_recommended(curr_video[0], num_recommendations)
+            results = youtube_api.search_recommended(curr_video[0], num_recommendations)
             print("Recommended videos:")
             for j in range(0, len(results)):
                 print(str(j + 1) + ": " + str(results[j][1]) + " (" + str(results[j][0]) + ")")
             views = 0
             data = []
 
-            # analyse recommended video's
-            for result in results:
-                data_item = yt.get_song_info(result[0], "statistics,snippet")
-                views = int(data_item['statistics']['viewCount'])
-                if views >= min_views:
-                    json_data.append(data_item)
-                    data.append(data_item)
-                    if result[0] not in vid_dict:
-                        vid_dict[result[0]] = (views, result[1])
-                    else:
-                        results.remove(result)
-                else:
-                    results.remove(result)
-
-            # choose next video
-            if random_choice or random.randint(0, 5) < 1:
+            # analyse recommended video's, fetched with one call
+            data_items = youtube_api.get_songs_info([result[0] for result in results], "statistics,snippet")
+            results = keep_recommendations(results, data_items, min_views, vid_dict, data)
+            json_data.extend(data)
+
+            # choose next video, stays at the current one when no recommendation is new
+            if results and (random_choice or random.randint(0, 5) < 1):
                 curr_video = results[random.randint(0, len(results) - 1)]
             else:
                 best_views = 0
@@ -172,7 +268,7 @@ def create_own_data(youtube_api, start_video_id, num_hops, num_recommendations,
                         print(vid_dict)
 
             # print chosen or last video
-            done = not stop_thread.is_alive()
+            done = stop.is_set()
             if i == num_hops or done:
                 print("\nFinal chosen video (" + str(i) + "): " + str(curr_video[1]) + " (" + str(curr_video[0]) + ")")
                 if done:
@@ -182,10 +278,80 @@ def create_own_data(youtube_api, start_video_id, num_hops, num_recommendations,
         except HttpError as e:
             print("An HTTP error %d occurred:\n%s" % (e.resp.status, e.content))
 
-    # prints all fetched (chosen or recommended) videos
+    sorted_results = sorted(vid_dict.items(), key=lambda x: x[1][0], reverse=True)
+    report_results(sorted_results, json_data)
+    return sorted_results
+
+
+def create_own_data_concurrently(youtube_api, start_video_ids, num_walkers, num_hops, num_recommendations, min_views,
+                                 random_choice, shared_frontier=False, rate=10.0):
+    """
+    Crawls YouTube like create_own_data, but with several walkers at once which share the
+    fetched video's and stay together under the quota rate.
+
+    :param youtube_api: the Youtube API connection.
+    :param start_video_ids: the ids of the base videos, the walkers take turns in them
+    :param num_walkers: the number of walkers
+    :param num_hops: number of video-search iterations per walker
+    :param num_recommendations: number of recommendations used to choose from
+    :param min_views: video's with less views will be skipped
+    :param random_choice: see create_own_data
+    :param shared_frontier: whether the walkers choose from the unvisited video's found by all walkers
+    :param rate: the quota units per second of all walkers together
+    :return: the fetched video's sorted to number of views
+    """
+    engine = CrawlEngine(youtube_api, num_walkers, rate, shared_frontier=shared_frontier, errors=(HttpError,))
+    start_stop_thread(engine.cancel)
+    print("YouTube crawler started with " + str(num_walkers) + " walkers - type any key to stop")
+    sorted_results = engine.run(start_video_ids, num_hops, num_recommendations, min_views, random_choice)
+    print("\nAPI calls: " + str(engine.calls) + ", quota used: " + str(engine.quota))
+    report_results(sorted_results, engine.json_data)
+    return sorted_results
+
+
+def create_own_data_from_frontier(youtube_api, start_video_ids, max_videos, num_recommendations, min_views,
+                                  policy="most-viewed", directory="crawl", checkpoint_every=100, rate=10.0):
+    """
+    Crawls YouTube breadth first or most viewed first instead of walking, until max_videos video's
+    are found. The progress is checkpointed in directory, running it again resumes the crawl.
+
+    :param youtube_api: the Youtube API connection.
+    :param start_video_ids: the ids of the base videos, when resuming only those not found yet
+    :param max_videos: the number of video's to find, over all runs
+    :param num_recommendations: number of recommendations of every crawled video
+    :param min_views: video's with less views will be skipped
+    :param policy: bfs or most-viewed, see FrontierCrawl.POLICIES
+    :param directory: where the found video's and the checkpoint are written
+    :param checkpoint_every: the number of crawled video's between checkpoints
+    :param rate: the quota units per second
+    :return: the found video's sorted to number of views
+    """
+    crawler = FrontierCrawler(youtube_api, directory, policy, capacity=max(10 * max_videos, 100000),
+                              num_recommendations=num_recommendations, min_views=min_views,
+                              checkpoint_every=checkpoint_every, rate=rate, errors=(HttpError,))
+    if crawler.resumed():
+        print("Resuming the crawl in " + directory + ": " + str(crawler.found) + " video's found, "
+              + str(len(crawler.frontier)) + " in the frontier")
+    start_stop_thread(crawler.cancel)
+    print("YouTube frontier crawl started - type any key to stop")
+    crawler.crawl(start_video_ids, max_videos)
+    print("\nCrawled: " + str(crawler.crawled) + ", found: " + str(crawler.found) + ", quota used: "
+          + str(crawler.quota))
+    json_data = load_results(directory)
+    sorted_results = sorted(((item['id'], (int(item['statistics']['viewCount']), item['snippet']['title']))
+                             for item in json_data), key=lambda x: x[1][0], reverse=True)
+    report_results(sorted_results, json_data)
+    return sorted_results
+
+
+def report_results(sorted_results, json_data):
+    """
+    Prints all fetched (chosen or recommended) video's, writes the json file and plots the view distribution.
+
+    :param sorted_results: the fetched video's sorted to number of views
+    :param json_data: the data of the fetched video's
+    """
     print("\nAll fetched video's sorted to view-count:")
-    vals = vid_dict.items()
-    sorted_results = sorted(vals, key=lambda x: x[1][0], reverse=True)
     for i, item in enumerate(sorted_results):
         print(str(i) + ": " + str(item))
 
@@ -196,8 +362,11 @@ def create_own_data(youtube_api, start_video_id, num_hops, num_recommendations,
     # Plots the view distribution to observe view power laws
     investigate_view_power_law(sorted_results)
 
-    return sorted_results
 
-# Exercise 5
-yt = YouTubeCrawler(-3)
-create_own_data(yt, "e-ORhEE9VVg", 250, 10, 20000, True)
\ No newline at end of file
+if __name__ == '__main__':
+    # Exercise 5
+    cache = ResponseCache("cache.sqlite")
+    yt = YouTubeCrawler(-3, cache)
+    create_own_data(yt, "e-ORhEE9VVg", 250, 10, 20000, True)
+    print("\nAPI cache:\n" + cache.report())
+    cache.close()
\ No newline at end of file
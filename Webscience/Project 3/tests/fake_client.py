@@ -0,0 +1,91 @@
+import random
+import time
+from threading import Lock
+from CrawlEngine import SEARCH_COST, VIDEOS_COST, MAX_IDS_PER_CALL
+
+
+class FakeClient:
+
+    def __init__(self, num_videos=1000, seed=0, latency=0.0, failure_rate=0.0, failing=()):
+        """
+        Offline stand-in for YouTubeCrawler to test the engine with: a fixed random graph of
+        recommendations between num_videos videos with power law distributed view counts.
+
+        :param num_videos:
+        :param seed:
+        :param latency: seconds every call takes
+        :param failure_rate: the chance that a call raises a FakeError
+        :param failing: the numbers of the calls which raise a FakeError, counted from 1 over both kinds
+        """
+        rng = random.Random(seed)
+        self.ids = ["v" + str(index) for index in range(num_videos)]
+        self.views = dict((video_id, int(1000000 / (index + 1) ** 1.2)) for index, video_id
+                          in enumerate(rng.sample(self.ids, num_videos)))
+        self.related = dict((video_id, rng.sample(self.ids, min(50, num_videos))) for video_id in self.ids)
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.failing = set(failing)
+        self.rng = rng
+        self.lock = Lock()
+        self.calls = {'search': 0, 'videos': 0}
+        self.meter = None
+
+    def request(self, kind):
+        if self.meter is not None:
+            self.meter(kind, SEARCH_COST if kind == 'search' else VIDEOS_COST)
+        with self.lock:
+            self.calls[kind] += 1
+            failed = self.rng.random() < self.failure_rate or sum(self.calls.values()) in self.failing
+        if self.latency:
+            time.sleep(self.latency)
+        if failed:
+            raise FakeError("fake " + kind + " call failed")
+
+    def get_songs_info(self, video_ids, parts):
+        """
+        :param video_ids: the ids of videos, one call per MAX_IDS_PER_CALL ids
+        :param parts: ignored, snippet and statistics are always returned
+        :return: a dict of the data of the known videos by id
+        """
+        for start in range(0, len(video_ids), MAX_IDS_PER_CALL):
+            self.request('videos')
+        return dict((video_id, {'id': video_id, 'snippet': {'title': "Video " + video_id},
+                                'statistics': {'viewCount': str(self.views[video_id])}})
+                    for video_id in video_ids if video_id in self.views)
+
+    def search_recommended(self, start_video_id, max_results):
+        """
+        :param start_video_id:
+        :param max_results:
+        :return: the recommended videos as a tuple list of id's and titles
+        """
+        self.request('search')
+        return [(video_id, "Video " + video_id) for video_id in self.related.get(start_video_id, [])[:max_results]]
+
+
+class CachedClient:
+
+    def __init__(self, client, cache):
+        """
+        A FakeClient behind a ResponseCache, like a YouTubeCrawler with a cache.
+        """
+        self.client = client
+        self.cache = cache
+
+    @property
+    def meter(self):
+        return self.client.meter
+
+    @meter.setter
+    def meter(self, meter):
+        self.client.meter = meter
+
+    def get_songs_info(self, video_ids, parts):
+        return self.cache.videos(list(dict.fromkeys(video_ids)), parts, self.client.get_songs_info)
+
+    def search_recommended(self, start_video_id, max_results):
+        return self.cache.search(start_video_id, max_results, self.client.search_recommended)
+
+
+class FakeError(Exception):
+    pass
@@ -0,0 +1,71 @@
+import threading
+import time
+import pytest
+from CrawlEngine import CrawlEngine, TokenBucket, SEARCH_COST
+from fake_client import CachedClient, FakeClient, FakeError
+from ResponseCache import ResponseCache
+
+
+def test_cached_answers_cost_no_quota(tmp_path):
+    fake = FakeClient(200, seed=3)
+    client = CachedClient(fake, ResponseCache(str(tmp_path / 'cache.sqlite')))
+    first = CrawlEngine(client, walkers=1, rate=1e9, seed=5)
+    videos = first.run(['v0'], 10, 10, 0, False)
+    assert first.calls == fake.calls
+    assert first.quota == 100 * fake.calls['search'] + fake.calls['videos']
+    assert fake.meter is None
+
+    # the same walk again, answered by the cache
+    calls = dict(fake.calls)
+    second = CrawlEngine(client, walkers=1, rate=1e9, seed=5)
+    assert second.run(['v0'], 10, 10, 0, False) == videos
+    assert fake.calls == calls
+    assert second.calls == {'search': 0, 'videos': 0} and second.quota == 0
+
+
+def test_token_bucket_limits_the_rate():
+    bucket = TokenBucket(200, 20)
+    started = time.monotonic()
+    for index in range(6):
+        assert bucket.acquire(10)
+    # the first 20 tokens are the burst, the other 40 come at 200 per second
+    assert time.monotonic() - started >= 0.18
+
+
+def test_engine_stays_under_the_rate():
+    fake = FakeClient(200, seed=1)
+    engine = CrawlEngine(fake, walkers=4, rate=5000, capacity=SEARCH_COST, seed=2)
+    started = time.monotonic()
+    engine.run(['v0', 'v1'], 6, 10, 0, False)
+    assert engine.calls == fake.calls
+    assert time.monotonic() - started >= (engine.quota - SEARCH_COST) / 5000.0 * 0.9
+
+
+def test_cancel_stops_the_waiting_walkers():
+    engine = CrawlEngine(FakeClient(200, seed=1), walkers=3, rate=1, capacity=SEARCH_COST, seed=2)
+    timer = threading.Timer(0.2, engine.cancel)
+    timer.start()
+    started = time.monotonic()
+    engine.run(['v0', 'v1', 'v2'], 100, 10, 0, False)
+    timer.join()
+    # the walkers used the burst and then waited for the limiter until the cancel
+    assert time.monotonic() - started < 5
+    assert engine.quota <= SEARCH_COST
+    bucket = TokenBucket(1, 10)
+    assert bucket.acquire(10)
+    assert not bucket.acquire(10, engine.stop)
+
+
+@pytest.mark.parametrize('failing', [[2], [3], [2, 3, 4, 5]])
+def test_walker_tries_a_failed_video_again(failing):
+    # every failed search or videos call costs a hop, after which the walker continues from the same video
+    engine = CrawlEngine(FakeClient(200, seed=1, failing=failing), walkers=1, rate=1e9, errors=(FakeError,), seed=2)
+    reference = CrawlEngine(FakeClient(200, seed=1), walkers=1, rate=1e9, seed=2)
+    assert engine.run(['v0'], 8, 10, 0, False) == reference.run(['v0'], 8 - len(failing), 10, 0, False)
+
+
+def test_walker_stops_when_its_start_video_fails():
+    engine = CrawlEngine(FakeClient(200, seed=1, failing=[1]), walkers=2, rate=1e9, errors=(FakeError,), seed=2)
+    videos = engine.run(['v0', 'v1'], 5, 10, 0, False)
+    assert 'v0' not in engine.visited
+    assert 'v1' in engine.visited and len(videos) > 1
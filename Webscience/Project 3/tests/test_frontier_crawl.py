@@ -0,0 +1,118 @@
+import json
+import pytest
+from fake_client import CachedClient, FakeClient, FakeError
+from FrontierCrawl import BloomFilter, Frontier, FrontierCrawler, load_results
+from ResponseCache import ResponseCache
+
+
+def test_bloom_filter_never_forgets():
+    bloom = BloomFilter(2000, 0.01)
+    for index in range(2000):
+        bloom.add('v' + str(index))
+    assert all('v' + str(index) in bloom for index in range(2000))
+    false_positives = sum('w' + str(index) in bloom for index in range(10000))
+    assert false_positives < 300
+    restored = BloomFilter.from_state(json.loads(json.dumps(bloom.state())))
+    assert restored.count == 2000 and all('v' + str(index) in restored for index in range(2000))
+
+
+def test_frontier_policies():
+    for policy, expected in (('bfs', ['a', 'b', 'c']), ('most-viewed', ['b', 'c', 'a'])):
+        frontier = Frontier(policy)
+        for video_id, views in (('a', 1), ('b', 30), ('c', 20)):
+            frontier.push(video_id, 'Video ' + video_id, views)
+        frontier = Frontier.from_state(json.loads(json.dumps(frontier.state())))
+        assert [frontier.pop()[0] for index in range(3)] == expected
+    with pytest.raises(ValueError):
+        Frontier('dfs')
+
+
+def test_resumed_crawl_finds_the_same_videos(tmp_path):
+    whole = FrontierCrawler(FakeClient(500, seed=6), str(tmp_path / 'whole'), rate=1e9, min_views=100)
+    whole.crawl(['v0', 'v1'], 150)
+    # an interrupted crawl: stopped after 60 videos, the results written after the checkpoint are lost
+    parts = FrontierCrawler(FakeClient(500, seed=6), str(tmp_path / 'parts'), rate=1e9, min_views=100,
+                            checkpoint_every=3)
+    parts.crawl(['v0', 'v1'], 60)
+    with open(str(tmp_path / 'parts' / 'videos.jsonl'), 'a') as results_file:
+        results_file.write('{"half": ')
+    resumed = FrontierCrawler(FakeClient(500, seed=6), str(tmp_path / 'parts'), rate=1e9, min_views=100)
+    assert resumed.crawl(['v0', 'v1'], 150) == whole.found
+    assert load_results(str(tmp_path / 'parts')) == load_results(str(tmp_path / 'whole'))
+    assert all(int(item['statistics']['viewCount']) >= 100 for item in load_results(str(tmp_path / 'whole'))[2:])
+
+
+def test_crawl_stops_after_too_many_failures(tmp_path):
+    crawler = FrontierCrawler(FakeClient(100, seed=7, failing=[2, 3, 4]), str(tmp_path), rate=1e9,
+                              errors=(FakeError,), max_failures=3, backoff=0.0)
+    found = crawler.crawl(['v0'], 50)
+    assert found == 1 and crawler.crawled == 0
+    # the failed video is still in the frontier and is crawled on resume
+    resumed = FrontierCrawler(FakeClient(100, seed=7), str(tmp_path), rate=1e9)
+    assert resumed.resumed() and resumed.crawl(['v0'], 50) >= 50
+
+
+def test_cancelled_frontier_crawl_resumes(tmp_path):
+    fake = FakeClient(300, seed=4)
+    crawler = FrontierCrawler(fake, str(tmp_path), rate=1e9)
+    store, stored = crawler.store, []
+
+    # cancels after the start videos and two crawled videos are stored
+    def store_and_cancel(*args):
+        store(*args)
+        stored.append(args)
+        if len(stored) == 3:
+            crawler.cancel()
+
+    crawler.store = store_and_cancel
+    found = crawler.crawl(['v0'], 100)
+    assert crawler.crawled == 2 and found < 100
+    resumed = FrontierCrawler(fake, str(tmp_path), rate=1e9)
+    assert resumed.resumed() and resumed.found == found
+    assert resumed.crawl(['v0'], 100) >= 100
+    assert len(load_results(str(tmp_path))) == resumed.found
+
+
+def test_failed_start_videos_are_fetched_again(tmp_path):
+    # the first call (the start videos) fails, it is retried like any other call
+    crawler = FrontierCrawler(FakeClient(100, seed=8, failing=[1]), str(tmp_path / 'retried'), rate=1e9,
+                              errors=(FakeError,), backoff=0.0)
+    assert crawler.crawl(['v0', 'v1'], 30) >= 30
+    reference = FrontierCrawler(FakeClient(100, seed=8), str(tmp_path / 'reference'), rate=1e9)
+    reference.crawl(['v0', 'v1'], 30)
+    assert load_results(str(tmp_path / 'retried')) == load_results(str(tmp_path / 'reference'))
+
+    # every try fails: the crawl stops with a checkpoint, the start videos are not seen yet
+    failing = FrontierCrawler(FakeClient(100, seed=8, failing=[1, 2, 3]), str(tmp_path / 'failing'), rate=1e9,
+                              errors=(FakeError,), max_failures=3, backoff=0.0)
+    assert failing.crawl(['v0', 'v1'], 30) == 0
+    assert 'v0' not in failing.seen
+    resumed = FrontierCrawler(FakeClient(100, seed=8), str(tmp_path / 'failing'), rate=1e9)
+    assert resumed.crawl(['v0', 'v1'], 30) >= 30
+    assert load_results(str(tmp_path / 'failing')) == load_results(str(tmp_path / 'reference'))
+
+
+def test_unavailable_start_videos_are_fetched_again(tmp_path):
+    fake = FakeClient(100, seed=9)
+    crawler = FrontierCrawler(fake, str(tmp_path), rate=1e9, checkpoint_every=1)
+    assert crawler.crawl(['gone', 'v0'], 1) == 1
+    assert 'gone' not in crawler.seen and 'v0' in crawler.seen
+    calls = fake.calls['videos']
+    # the video became available
+    fake.views['gone'] = 5
+    resumed = FrontierCrawler(fake, str(tmp_path), rate=1e9)
+    resumed.crawl(['gone', 'v0'], 2)
+    assert 'gone' in resumed.seen and fake.calls['videos'] > calls
+    assert [item['id'] for item in load_results(str(tmp_path))][:2] == ['v0', 'gone']
+
+
+def test_frontier_cached_answers_cost_no_quota(tmp_path):
+    fake = FakeClient(200, seed=3)
+    client = CachedClient(fake, ResponseCache(str(tmp_path / 'cache.sqlite')))
+    first = FrontierCrawler(client, str(tmp_path / 'first'), rate=1e9)
+    first.crawl(['v0'], 50)
+    assert first.quota == 100 * fake.calls['search'] + fake.calls['videos'] > 0
+
+    second = FrontierCrawler(client, str(tmp_path / 'second'), rate=1e9)
+    assert second.crawl(['v0'], 50) == first.found
+    assert second.quota == 0
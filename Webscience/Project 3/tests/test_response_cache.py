@@ -0,0 +1,72 @@
+from CrawlEngine import SEARCH_COST
+from ResponseCache import ResponseCache
+
+
+class Clock:
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class Fetcher:
+
+    def __init__(self):
+        self.calls = []
+
+    def videos(self, video_ids, parts):
+        self.calls.append(list(video_ids))
+        return dict((video_id, {'kind': 'youtube#video', 'id': video_id, 'snippet': {'title': 'Video ' + video_id},
+                                'statistics': {'viewCount': str(len(self.calls))}})
+                    for video_id in video_ids if not video_id.startswith('gone'))
+
+    def search(self, video_id, max_results):
+        self.calls.append(video_id)
+        return [(video_id + str(index), 'Video') for index in range(max_results)]
+
+
+def test_answers_are_cached_until_they_expire(tmp_path):
+    clock, fetcher = Clock(), Fetcher()
+    cache = ResponseCache(str(tmp_path / 'cache.sqlite'), ttls={'statistics': 60}, clock=clock)
+    first = cache.videos(['a', 'b', 'gone'], 'snippet,statistics', fetcher.videos)
+    assert sorted(first) == ['a', 'b']
+    second = cache.videos(['a', 'b', 'c'], 'snippet,statistics', fetcher.videos)
+    # unavailable videos are asked again, cached ones are not
+    assert fetcher.calls == [['a', 'b', 'gone'], ['c']]
+    assert second['a'] == first['a']
+    clock.now += 61
+    cache.videos(['a'], 'snippet', fetcher.videos)
+    assert len(fetcher.calls) == 2
+    # the statistics expired, all parts of the video are fetched again
+    assert cache.videos(['a'], 'snippet,statistics', fetcher.videos)['a']['statistics']['viewCount'] == '3'
+    assert cache.search('a', 5, fetcher.search) == cache.search('a', 5, fetcher.search)
+    assert fetcher.calls[3:] == ['a']
+
+
+def test_least_recently_used_answers_are_removed(tmp_path):
+    clock, fetcher = Clock(), Fetcher()
+    cache = ResponseCache(str(tmp_path / 'cache.sqlite'), max_entries=3, clock=clock)
+    for video_id in ('a', 'b', 'c'):
+        clock.now += 1
+        cache.search(video_id, 2, fetcher.search)
+    clock.now += 1
+    cache.search('a', 2, fetcher.search)
+    clock.now += 1
+    cache.search('d', 2, fetcher.search)
+    assert cache.get('search', 'b:2') is None
+    assert cache.get('search', 'a:2') is not None and cache.get('search', 'c:2') is not None
+
+
+def test_counters_survive_a_reopen(tmp_path):
+    fetcher = Fetcher()
+    cache = ResponseCache(str(tmp_path / 'cache.sqlite'))
+    cache.search('a', 3, fetcher.search)
+    cache.search('a', 3, fetcher.search)
+    cache.videos(['x', 'y'], 'statistics', fetcher.videos)
+    cache.videos(['x', 'z'], 'statistics', fetcher.videos)
+    cache.close()
+    stats = ResponseCache(str(tmp_path / 'cache.sqlite')).stats()
+    assert stats['search'] == {'hits': 1, 'misses': 1, 'spent': SEARCH_COST, 'saved': SEARCH_COST}
+    assert stats['videos'] == {'hits': 1, 'misses': 3, 'spent': 2, 'saved': 0}
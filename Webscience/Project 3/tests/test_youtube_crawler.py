@@ -0,0 +1,29 @@
+import pytest
+
+pytest.importorskip('apiclient')
+pytest.importorskip('oauth2client')
+pytest.importorskip('matplotlib')
+from YouTubeCrawler import keep_recommendations
+
+
+def item(views):
+    return {'statistics': {'viewCount': str(views)}}
+
+
+def test_keep_recommendations_in_a_new_list():
+    results = [('seen', 'S'), ('few', 'F'), ('gone', 'G'), ('a', 'A'), ('b', 'B'), ('a', 'A')]
+    results_before = list(results)
+    data_items = {'seen': item(9), 'few': item(1), 'a': item(9), 'b': item(7)}
+    vid_dict = {'seen': (9, 'S')}
+    data = []
+    assert keep_recommendations(results, data_items, 5, vid_dict, data) == [('a', 'A'), ('b', 'B')]
+    assert results == results_before
+    assert vid_dict == {'seen': (9, 'S'), 'a': (9, 'A'), 'b': (7, 'B')}
+    # every recommendation with enough views is stored, like before the filtering
+    assert data == [item(9), item(9), item(7), item(9)]
+
+
+def test_keep_no_recommendations():
+    vid_dict = {'a': (9, 'A')}
+    assert keep_recommendations([('a', 'A'), ('b', 'B')], {'a': item(9), 'b': item(1)}, 5, vid_dict, []) == []
+    assert vid_dict == {'a': (9, 'A')}